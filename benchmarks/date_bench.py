@@ -0,0 +1,137 @@
+import argparse
+import json
+import random
+import statistics
+import time
+from datetime import date, datetime, timedelta
+from dateutil import parser as date_parser
+import collector.date_utils as date_utils
+
+"""
+날짜 변환 벤치마크
+수집기에서 쓰던 변환(strptime / dateutil)과 collector.date_utils의 변환을 같은 입력으로 비교한다.
+수집 데이터처럼 같은 날짜가 반복되는 입력(--unique 개의 서로 다른 날짜를 --size 개로 반복)을 만들고,
+date_utils는 캐시를 비운 상태(cold)와 채워진 상태(warm)를 따로 잰다. 네트워크는 사용하지 않는다.
+
+python -m benchmarks.date_bench --size 100000 --unique 2000 --repeat 5
+"""
+
+
+def _old_year(value) -> str:
+    return datetime.strptime(str(value), "%Y").strftime("%Y")
+
+
+def _old_dotted(value) -> str:
+    return datetime.strptime(value, "%Y.%m.%d").strftime("%Y-%m-%d")
+
+
+def _old_compact(value) -> str:
+    return datetime.strptime(value, "%Y%m%d").strftime("%Y-%m-%d")
+
+
+def _old_parse(value) -> str:
+    return date_parser.parse(value).strftime("%Y-%m-%d")
+
+
+def _old_news(value) -> str:
+    s = value.strip().replace("오전", "AM").replace("오후", "PM")
+    for fmt in ("%Y.%m.%d. %p %I:%M", "%Y.%m.%d %p %I:%M"):
+        try:
+            return datetime.strptime(s, fmt).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    raise ValueError(f"지원하지 않는 형식입니다: {value!r}")
+
+
+def _news_text(d: date, rng: random.Random) -> str:
+    return f"{d:%Y.%m.%d}. {rng.choice(['오전', '오후'])} {rng.randint(1, 12)}:{rng.randint(0, 59):02d}"
+
+
+# 변환 이름 -> (입력 생성, 기존 변환, date_utils 변환)
+BENCH_CONVERTERS = {
+    "year": (lambda d, rng: f"{d:%Y}", _old_year, date_utils.to_year),
+    "dotted": (lambda d, rng: f"{d:%Y.%m.%d}", _old_dotted, date_utils.dotted_to_iso),
+    "compact": (lambda d, rng: f"{d:%Y%m%d}", _old_compact, date_utils.compact_to_iso),
+    "parse": (lambda d, rng: rng.choice([f"{d:%Y-%m-%d}", f"{d:%Y.%m.%d}", f"{d:%Y%m%d}"]),
+              _old_parse, date_utils.parse_date),
+    "news": (_news_text, _old_news, date_utils.news_date_to_iso),
+}
+
+
+def make_values(make, size: int, unique: int, seed: int) -> list:
+    rng = random.Random(seed)
+    start = date(2000, 1, 1)
+    pool = [make(start + timedelta(days=rng.randrange(9000)), rng) for _ in range(unique)]
+    return [rng.choice(pool) for _ in range(size)]
+
+
+def clear_caches():
+    for func in (date_utils._to_year, date_utils.dotted_to_iso, date_utils.compact_to_iso,
+                 date_utils.parse_date, date_utils.news_date_to_iso):
+        func.cache_clear()
+
+
+def timed(func, repeat: int, before=None) -> float:
+    times = []
+    for _ in range(repeat):
+        if before:
+            before()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def run(size: int, unique: int, repeat: int, seed: int) -> dict:
+    report = {}
+    for name, (make, old, new) in BENCH_CONVERTERS.items():
+        values = make_values(make, size, unique, seed)
+        records = [{"date": value} for value in values]
+
+        # 결과가 기존 변환과 같은지 먼저 확인
+        mismatch = sum(1 for value in set(values) if old(value) != new(value))
+
+        old_sec = timed(lambda: [old(v) for v in values], repeat)
+        cold_sec = timed(lambda: [new(v) for v in values], repeat, before=clear_caches)
+        warm_sec = timed(lambda: [new(v) for v in values], repeat)
+        batch_sec = timed(lambda: date_utils.convert_dates([dict(r) for r in records], {"date": new}), repeat,
+                          before=clear_caches)
+        report[name] = {
+            "mismatch": mismatch,
+            "old_ms": round(old_sec * 1000, 2),
+            "cold_ms": round(cold_sec * 1000, 2),
+            "warm_ms": round(warm_sec * 1000, 2),
+            "batch_ms": round(batch_sec * 1000, 2),
+            "speedup": round(old_sec / (cold_sec or 1e-9), 1),
+        }
+    return report
+
+
+def print_report(report: dict, size: int, unique: int):
+    print(f"\n[날짜 변환 {size}건, 서로 다른 값 {unique}개]")
+    print(f"{'converter':<12}{'mismatch':>10}{'old ms':>10}{'cold ms':>10}{'warm ms':>10}{'batch ms':>10}"
+          f"{'speedup':>10}")
+    for name, stat in report.items():
+        print(f"{name:<12}{stat['mismatch']:>10}{stat['old_ms']:>10}{stat['cold_ms']:>10}{stat['warm_ms']:>10}"
+              f"{stat['batch_ms']:>10}{stat['speedup']:>9}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="날짜 변환 벤치마크")
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--unique", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="결과를 저장할 json 파일 경로")
+    args = parser.parse_args()
+
+    report = run(args.size, args.unique, args.repeat, args.seed)
+    print_report(report, args.size, args.unique)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
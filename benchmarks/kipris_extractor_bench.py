@@ -0,0 +1,228 @@
+import argparse
+import glob
+import json
+import os
+import statistics
+import time
+import tracemalloc
+import collector.kipris_extractor.kipris_patent_extractor as patent_extractor
+import collector.kipris_extractor.kipris_utility_extractor as utility_extractor
+import collector.kipris_extractor.kipris_design_extractor as design_extractor
+import collector.kipris_extractor.kipris_trademark_extractor as trademark_extractor
+from collector.kipris_extractor.kipris_snapshot import load_snapshot
+from collector.kipris_extractor.kipris_utils import By, get_section_title, title_contains
+
+"""
+KIPRIS 상세정보 추출 함수 벤치마크
+저장된 #mainResultDetail HTML 스냅샷({category}_{출원번호}.html, KIPRIS_SNAPSHOT_DIR로 수집)에 대해
+섹션 추출 함수별 소요 시간과 메모리 할당량을 측정한다. 네트워크는 사용하지 않는다.
+기본 스냅샷은 benchmarks/snapshots의 카테고리별 샘플(개인정보를 지운 상세정보 HTML)이다.
+
+백엔드
+snapshot : BeautifulSoup 어댑터(SnapshotElement)
+selenium : 로컬 파일(file://)로 연 스냅샷을 WebDriver로 추출 (캐시된 chromedriver 필요)
+both : 두 백엔드를 모두 측정하고, 같은 섹션의 추출 결과가 다르면 출력
+
+python -m benchmarks.kipris_extractor_bench --snapshots <dir> --backend both --repeat 5
+"""
+
+# category -> [(섹션 키, 섹션 제목 키워드, 추출 함수)]
+# 추출 함수가 (info_div, title)을 받으면 섹션 제목도 함께 넘긴다
+BENCH_EXTRACTORS = {
+    "patent": [
+        ("bibliography", ("서지정보",), patent_extractor.extract_patent_bibliography),
+        ("people", ("인명정보",), patent_extractor.extract_patent_people_info),
+        ("citations", ("인용/피인용", "인용", "피인용"), patent_extractor.extract_citations),
+        ("family", ("패밀리정보",), patent_extractor.extract_family_info),
+        ("rnd", ("국가연구개발사업",), patent_extractor.extract_national_rnd),
+    ],
+    "utility": [
+        ("bibliography", ("서지정보",), utility_extractor.extract_patent_bibliography),
+        ("people", ("인명정보",), utility_extractor.extract_patent_people_info),
+        ("citations", ("인용/피인용", "인용", "피인용"), utility_extractor.extract_citations),
+        ("family", ("패밀리정보",), utility_extractor.extract_family_info),
+        ("rnd", ("국가연구개발사업",), utility_extractor.extract_national_rnd),
+    ],
+    "design": [
+        ("bibliography", ("서지정보",), design_extractor.extract_design_bibliography),
+        ("people", ("인명정보", "창작자", "대리인"), design_extractor.extract_design_people_info),
+    ],
+    "trademark": [
+        ("bibliography", ("서지정보",), trademark_extractor.extract_trademark_bibliography),
+        ("people", ("인명정보",), trademark_extractor.extract_trademark_people_info),
+        ("vienna", ("도형분류비엔나코드",), trademark_extractor.extract_trademark_vienna),
+    ],
+}
+
+# 추출 함수 중 섹션 제목을 두 번째 인자로 받는 함수
+TITLE_EXTRACTORS = {design_extractor.extract_design_people_info}
+
+
+def find_snapshots(snapshot_dir: str) -> list[tuple[str, str]]:
+    snapshots = []
+    for path in sorted(glob.glob(os.path.join(snapshot_dir, "*.html"))):
+        category = os.path.basename(path).split("_", 1)[0]
+        if category in BENCH_EXTRACTORS:
+            snapshots.append((category, path))
+    return snapshots
+
+
+# 상세정보 루트에서 (추출 함수 이름, 섹션 제목, 섹션 요소, 추출 함수) 목록
+def match_sections(category: str, root) -> list:
+    matched = []
+    for section in root.find_elements(By.CLASS_NAME, "tab-section-01"):
+        title = get_section_title(section)
+        if not title:
+            continue
+        for key, keywords, extractor in BENCH_EXTRACTORS[category]:
+            if title_contains(title, *keywords):
+                matched.append((f"{category}.{extractor.__name__}", title, section, extractor))
+                break
+    return matched
+
+
+# 추출 한 번의 (소요 시간, 할당 바이트, 최대 메모리)
+def measure(extractor, section, title: str) -> tuple[float, int, int]:
+    args = (section, title) if extractor in TITLE_EXTRACTORS else (section,)
+    tracemalloc.reset_peak()
+    before, _ = tracemalloc.get_traced_memory()
+    start = time.perf_counter()
+    extractor(*args)
+    elapsed = time.perf_counter() - start
+    after, peak = tracemalloc.get_traced_memory()
+    return elapsed, max(after - before, 0), max(peak - before, 0)
+
+
+# 스냅샷 하나의 (파일 이름, 추출 함수 이름, 섹션 제목) -> 추출 결과
+def extract_snapshot(category: str, root, file_name: str) -> dict:
+    outputs = {}
+    for name, title, section, extractor in match_sections(category, root):
+        args = (section, title) if extractor in TITLE_EXTRACTORS else (section,)
+        try:
+            outputs[(file_name, name, title)] = extractor(*args)
+        except Exception as e:
+            outputs[(file_name, name, title)] = f"error : {e}"
+    return outputs
+
+
+# outputs가 있으면 스냅샷마다 추출 결과를 한 번 저장 (백엔드 간 결과 비교용)
+def run_backend(backend: str, snapshots: list, load_root, repeat: int, outputs: dict | None = None) -> dict:
+    results = {}
+    tracemalloc.start()
+    try:
+        for category, path in snapshots:
+            root = load_root(path)
+            if outputs is not None:
+                outputs.update(extract_snapshot(category, root, os.path.basename(path)))
+            for name, title, section, extractor in match_sections(category, root):
+                stat = results.setdefault(name, {"times": [], "alloc": [], "peak": [], "errors": 0})
+                for _ in range(repeat):
+                    try:
+                        elapsed, alloc, peak = measure(extractor, section, title)
+                    except Exception as e:
+                        stat["errors"] += 1
+                        print(f"[{backend}] {name} {os.path.basename(path)} : {e}")
+                        continue
+                    stat["times"].append(elapsed)
+                    stat["alloc"].append(alloc)
+                    stat["peak"].append(peak)
+    finally:
+        tracemalloc.stop()
+
+    summary = {}
+    for name, stat in results.items():
+        times = stat["times"] or [0.0]
+        summary[name] = {
+            "runs": len(stat["times"]),
+            "errors": stat["errors"],
+            "mean_ms": round(statistics.mean(times) * 1000, 3),
+            "p50_ms": round(statistics.median(times) * 1000, 3),
+            "max_ms": round(max(times) * 1000, 3),
+            "alloc_kb": round(statistics.mean(stat["alloc"] or [0]) / 1024, 1),
+            "peak_kb": round(statistics.mean(stat["peak"] or [0]) / 1024, 1),
+        }
+    return summary
+
+
+def run_selenium(snapshots: list, repeat: int, outputs: dict | None = None) -> dict | None:
+    from collector.kipris_extractor.kipris_browser_pool import (launch_browser, quit_browser, claim_profile_slot,
+                                                                release_profile_slot)
+    # 실행 중인 수집기가 쓰는 프로필과 겹치지 않도록 빈 슬롯 사용
+    slot, lock_file = claim_profile_slot()
+    try:
+        driver = launch_browser("patent", slot=slot)
+    except Exception as e:
+        release_profile_slot(lock_file)
+        print(f"[selenium] 브라우저를 열 수 없어 건너뜀 : {e}")
+        return None
+
+    def load_root(path: str):
+        driver.get("file://" + os.path.abspath(path))
+        return driver.find_element(By.ID, "mainResultDetail")
+
+    try:
+        return run_backend("selenium", snapshots, load_root, repeat, outputs)
+    finally:
+        quit_browser(driver)
+        release_profile_slot(lock_file)
+
+
+def print_summary(backend: str, summary: dict):
+    print(f"\n[{backend}]")
+    print(f"{'extractor':<55}{'runs':>6}{'err':>5}{'mean ms':>10}{'p50 ms':>10}{'max ms':>10}"
+          f"{'alloc KB':>10}{'peak KB':>10}")
+    for name, stat in sorted(summary.items()):
+        print(f"{name:<55}{stat['runs']:>6}{stat['errors']:>5}{stat['mean_ms']:>10}{stat['p50_ms']:>10}"
+              f"{stat['max_ms']:>10}{stat['alloc_kb']:>10}{stat['peak_kb']:>10}")
+
+
+def print_comparison(snapshot: dict, selenium: dict):
+    print("\n[selenium / snapshot]")
+    for name in sorted(set(snapshot) & set(selenium)):
+        base = snapshot[name]["mean_ms"] or 0.001
+        print(f"{name:<55}{selenium[name]['mean_ms'] / base:>10.1f}x")
+
+
+# 같은 스냅샷 섹션의 추출 결과가 백엔드마다 다른 항목 출력, 다른 항목 수 반환
+def print_parity(snapshot: dict, selenium: dict) -> int:
+    mismatches = [key for key in sorted(set(snapshot) | set(selenium)) if snapshot.get(key) != selenium.get(key)]
+    print(f"\n[selenium / snapshot 추출 결과] 섹션 {len(set(snapshot) | set(selenium))}개, 다름 {len(mismatches)}개")
+    for key in mismatches:
+        print(f"{' '.join(key)}\n  snapshot : {snapshot.get(key)}\n  selenium : {selenium.get(key)}")
+    return len(mismatches)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="KIPRIS 상세정보 추출 함수 벤치마크")
+    parser.add_argument("--snapshots", default=os.getenv("KIPRIS_SNAPSHOT_DIR", "benchmarks/snapshots"))
+    parser.add_argument("--backend", choices=["snapshot", "selenium", "both"], default="snapshot")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="결과를 저장할 json 파일 경로")
+    args = parser.parse_args()
+
+    snapshots = find_snapshots(args.snapshots)
+    if not snapshots:
+        print(f"스냅샷이 없습니다 : {args.snapshots} (KIPRIS_SNAPSHOT_DIR을 설정하고 수집하면 저장됨)")
+        return
+
+    report = {}
+    outputs = {"snapshot": {}, "selenium": {}}
+    if args.backend in ("snapshot", "both"):
+        report["snapshot"] = run_backend("snapshot", snapshots, load_snapshot, args.repeat, outputs["snapshot"])
+        print_summary("snapshot", report["snapshot"])
+    if args.backend in ("selenium", "both"):
+        selenium = run_selenium(snapshots, args.repeat, outputs["selenium"])
+        if selenium is not None:
+            report["selenium"] = selenium
+            print_summary("selenium", selenium)
+    if "snapshot" in report and "selenium" in report:
+        print_comparison(report["snapshot"], report["selenium"])
+        report["mismatches"] = print_parity(outputs["snapshot"], outputs["selenium"])
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import os
+import io
+import re
+import json
+import gzip
+import hashlib
+import threading
+import requests
+from datetime import date
+
+"""
+외부 API 원본 응답 보관/재생 (NTIS, 네이버 데이터랩)
+응답 본문은 gzip으로 압축해서 내용 해시(sha256)로 한 번만 저장하고,
+(source, service, 요청 파라미터, 날짜)마다 어떤 본문이었는지 참조 파일을 남긴다.
+
+API_ARCHIVE_DIR/objects/{해시 앞 2자리}/{해시}.gz : 응답 본문
+API_ARCHIVE_DIR/refs/{source}/{날짜}/{요청 키}.ref : 응답 본문 해시
+
+API_ARCHIVE_DIR을 설정한 경우에만 보관한다 (기본값 없음).
+API_REPLAY=1이면 네트워크를 사용하지 않고 보관된 응답으로 변환/적재를 다시 실행한다.
+NTIS/네이버 트렌드 수집기는 재생할 때 전체 기업을 대상으로 중복 중단 없이 다시 변환해서 기존 문서를 교체하고,
+수집 기록(check log, 체크포인트)은 남기지 않는다.
+API_REPLAY_DATE가 없으면 요청마다 가장 최근 날짜의 응답을 사용한다.
+"""
+
+# 빈 값이면 보관하지 않음 (재생도 API_ARCHIVE_DIR이 있어야 함)
+ARCHIVE_DIR = os.getenv("API_ARCHIVE_DIR", "")
+REPLAY = os.getenv("API_REPLAY", "0") == "1"
+REPLAY_DATE = os.getenv("API_REPLAY_DATE")
+
+# 요청 키에서 제외하는 인증 파라미터
+SECRET_PARAMS = {"apprvKey", "ServiceKey"}
+
+_dates_lock = threading.Lock()
+# source -> 보관된 날짜 목록 (최신순)
+_archive_dates = {}
+
+
+class ArchiveMissError(Exception):
+    pass
+
+
+# 요청 키 : 인증 파라미터를 뺀 파라미터를 정렬한 json의 sha256
+def get_request_key(service: str, params: dict) -> str:
+    params = {k: v for k, v in params.items() if k not in SECRET_PARAMS}
+    raw = json.dumps([service, params], ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _object_path(digest: str) -> str:
+    return os.path.join(ARCHIVE_DIR, "objects", digest[:2], f"{digest}.gz")
+
+
+def _ref_path(source: str, archive_date: str, key: str) -> str:
+    return os.path.join(ARCHIVE_DIR, "refs", source, archive_date, f"{key}.ref")
+
+
+# 파일을 임시 이름으로 쓴 뒤 교체 (동시에 같은 파일을 써도 깨지지 않음)
+def _write_file(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+# 응답 본문 보관 (같은 본문은 한 번만 저장)
+def archive_response(source: str, service: str, params: dict, content: bytes):
+    if not ARCHIVE_DIR or REPLAY:
+        return
+    try:
+        digest = hashlib.sha256(content).hexdigest()
+        object_path = _object_path(digest)
+        if not os.path.exists(object_path):
+            _write_file(object_path, gzip.compress(content))
+        key = get_request_key(service, params)
+        _write_file(_ref_path(source, date.today().isoformat(), key), digest.encode("ascii"))
+    except Exception as e:
+        print("archive_response : ", e)
+
+
+# source의 보관 날짜 목록 (최신순, API_REPLAY_DATE 이후 날짜는 제외)
+def get_archive_dates(source: str) -> list:
+    if not ARCHIVE_DIR:
+        return []
+    with _dates_lock:
+        if source not in _archive_dates:
+            source_dir = os.path.join(ARCHIVE_DIR, "refs", source)
+            dates = sorted(os.listdir(source_dir), reverse=True) if os.path.isdir(source_dir) else []
+            dates = [d for d in dates if re.fullmatch(r"\d{4}-\d{2}-\d{2}", d)]
+            if REPLAY_DATE:
+                dates = [d for d in dates if d <= REPLAY_DATE]
+            _archive_dates[source] = dates
+        return _archive_dates[source]
+
+
+# 재생 기준 날짜 : API_REPLAY_DATE, 없으면 가장 최근 보관 날짜
+def get_replay_date(source: str) -> str | None:
+    dates = get_archive_dates(source)
+    return dates[0] if dates else REPLAY_DATE
+
+
+# 보관된 응답 본문 (없으면 ArchiveMissError)
+def load_archived_response(source: str, service: str, params: dict) -> bytes:
+    key = get_request_key(service, params)
+    for archive_date in get_archive_dates(source):
+        ref_path = _ref_path(source, archive_date, key)
+        if os.path.exists(ref_path):
+            with open(ref_path, "r", encoding="ascii") as f:
+                digest = f.read().strip()
+            with gzip.open(_object_path(digest), "rb") as f:
+                return f.read()
+    raise ArchiveMissError(f"{source} {service} 보관된 응답 없음 : {params}")
+
+
+# 보관된 본문으로 만든 응답 (content / json() / raw 스트림 모두 사용 가능)
+def make_replay_response(content: bytes) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response._content = content
+    response.raw = io.BytesIO(content)
+    response.encoding = "utf-8"
+    return response
@@ -0,0 +1,127 @@
+import re
+import functools
+from datetime import date, datetime
+from dateutil import parser
+
+"""
+수집기 공통 날짜 변환
+자주 나오는 형식은 미리 컴파일한 정규식으로 바로 변환하고(strptime/dateutil을 거치지 않음),
+같은 값은 lru_cache로 한 번만 변환한다. 형식이 맞지 않는 값은 기존과 같이 strptime/dateutil로 처리하므로
+결과와 오류(ValueError)는 이전 변환과 같다.
+
+to_year : '2021' -> '2021'
+dotted_to_iso : '2021.3.5' -> '2021-03-05' (%Y.%m.%d)
+compact_to_iso : '20210305' -> '2021-03-05' (%Y%m%d)
+parse_date : 형식이 일정하지 않은 날짜 -> 'YYYY-MM-DD' (dateutil parser.parse)
+news_date_to_iso : '2021.03.05. 오후 3:12' -> '2021-03-05'
+convert_dates : 레코드 목록의 날짜 필드를 서로 다른 값마다 한 번씩만 변환
+"""
+
+CACHE_SIZE = 4096
+
+# 연도는 1000년 이상만 (1000년 미만은 strftime('%Y')가 플랫폼마다 달라서 기존 변환으로 처리)
+YEAR_RE = re.compile(r"[1-9]\d{3}")
+DOTTED_RE = re.compile(r"([1-9]\d{3})\.(\d{1,2})\.(\d{1,2})")
+COMPACT_RE = re.compile(r"([1-9]\d{3})(\d{2})(\d{2})")
+# 구분자(-, ., /)가 있는 날짜 + 선택적인 시각
+SEPARATED_RE = re.compile(r"([1-9]\d{3})([-./])(\d{1,2})\2(\d{1,2})\.?(?:[ T](\d{1,2}):(\d{2})(?::(\d{2})(?:\.\d+)?)?)?")
+NEWS_RE = re.compile(r"([1-9]\d{3})\.(\d{1,2})\.(\d{1,2})\.? (?:오전|오후|AM|PM) (\d{1,2}):(\d{2})")
+
+
+# 유효한 날짜인지 확인하고 'YYYY-MM-DD'로 (유효하지 않으면 ValueError)
+def _iso(year: str, month: str, day: str) -> str:
+    return date(int(year), int(month), int(day)).isoformat()
+
+
+def _valid_time(hour: str | None, minute: str | None, second: str | None) -> bool:
+    return (hour is None or int(hour) < 24) and (minute is None or int(minute) < 60) \
+        and (second is None or int(second) < 60)
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def _to_year(value: str) -> str:
+    if YEAR_RE.fullmatch(value):
+        return value
+    return datetime.strptime(value, "%Y").strftime("%Y")
+
+
+def to_year(value) -> str:
+    return _to_year(str(value))
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def dotted_to_iso(value: str) -> str:
+    match = DOTTED_RE.fullmatch(value)
+    if match:
+        return _iso(*match.groups())
+    return datetime.strptime(value, "%Y.%m.%d").strftime("%Y-%m-%d")
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def compact_to_iso(value: str) -> str:
+    match = COMPACT_RE.fullmatch(value)
+    if match:
+        return _iso(*match.groups())
+    return datetime.strptime(value, "%Y%m%d").strftime("%Y-%m-%d")
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def parse_date(value: str) -> str:
+    text = value.strip()
+    match = COMPACT_RE.fullmatch(text)
+    if match:
+        return _iso(*match.groups())
+    match = SEPARATED_RE.fullmatch(text)
+    # 시각이 범위를 벗어나면 dateutil과 같은 ValueError가 나도록 dateutil로 처리
+    if match and _valid_time(*match.groups()[4:]):
+        return _iso(match.group(1), match.group(3), match.group(4))
+    return parser.parse(value).strftime("%Y-%m-%d")
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def news_date_to_iso(value: str) -> str:
+    s = value.strip()
+    match = NEWS_RE.fullmatch(s)
+    if match and 1 <= int(match.group(4)) <= 12 and int(match.group(5)) < 60:
+        return _iso(*match.groups()[:3])
+
+    # '오전'/'오후' -> 'AM'/'PM' 변환, 날짜 뒤에 '.'이 있거나 없을 수 있으니 둘 다 시도
+    s = s.replace("오전", "AM").replace("오후", "PM")
+    for fmt in ("%Y.%m.%d. %p %I:%M", "%Y.%m.%d %p %I:%M"):
+        try:
+            return datetime.strptime(s, fmt).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    raise ValueError(f"지원하지 않는 형식입니다: {value!r}")
+
+
+DATE_CONVERTERS = {
+    "year": to_year,
+    "dotted": dotted_to_iso,
+    "compact": compact_to_iso,
+    "parse": parse_date,
+    "news": news_date_to_iso,
+}
+
+
+# records의 fields({필드: 변환 이름 또는 함수})를 변환해서 덮어씀
+# 필드마다 서로 다른 값만 한 번씩 변환하고, 빈 값은 None
+# errors="raise"이면 변환 실패 시 ValueError, "none"이면 실패한 값은 None
+def convert_dates(records: list, fields: dict, errors: str = "raise") -> list:
+    for field, converter in fields.items():
+        convert = DATE_CONVERTERS[converter] if isinstance(converter, str) else converter
+        converted = {}
+        for value in {record.get(field) for record in records}:
+            if not value:
+                converted[value] = None
+                continue
+            try:
+                converted[value] = convert(value)
+            except ValueError:
+                if errors == "raise":
+                    raise
+                converted[value] = None
+        for record in records:
+            if field in record:
+                record[field] = converted[record[field]]
+    return records
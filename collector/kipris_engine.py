@@ -0,0 +1,628 @@
+from collector.kipris_extractor.kipris_utils import *
+from collector.kipris_extractor.kipris_browser_pool import *
+from collector.kipris_extractor.kipris_tabs import *
+from collector.kipris_extractor.kipris_openapi import *
+from collector.alter import send_naver_alert
+from db.es import *
+from db.mysql import *
+from tqdm import tqdm
+from datetime import timedelta
+import importlib
+import threading
+import json
+import sys
+
+"""
+KIPRIS 공통 수집 엔진
+특허/실용신안/디자인/상표 수집기는 카테고리별 CATEGORY_SPEC만 정의하고
+브라우저, 중복 확인, 적재, 수집 지표는 이 엔진에서 공유한다.
+레코드는 카드 단위로 흘려보내고 페이지마다 적재하므로 메모리는 한 페이지 분량으로 제한된다.
+KIPRIS_BACKEND=api이면 브라우저 없이 KIPRIS Plus Open API로 서지정보를 수집한다.
+
+CATEGORY_SPEC
+category : 카테고리 이름 (patent, utility, design, trademark)
+data_type : mysql 로그용 데이터 타입 (KIPRIS_PATENT ...)
+es_data_type : elasticsearch DataType (kipris_patent ...)
+tab : 검색 탭 / 건수 id (patent, design, trademark)
+label : 출력용 이름
+search : search(driver, biz_no) 상세검색 실행 함수
+an_locator : 결과 카드에서 출원번호를 찾는 locator
+extract : extract(card) 상세정보 추출 함수
+insert : insert(es, records, biz_no) 적재 함수
+"""
+
+CATEGORIES = ["patent", "utility", "design", "trademark"]
+
+COMPANY_LIST_PATH = os.getenv("KIPRIS_COMPANY_LIST", r"/home/bax/fncsp/db/final_results.json")
+
+# 페이지 적재 버퍼 최대 건수
+PAGE_SIZE = 30
+
+# category -> 수집 지표
+RUN_METRICS = {}
+
+
+# 카테고리 수집기 모듈(collector.kipris_{category})의 CATEGORY_SPEC 로드
+def get_category_spec(category: str) -> dict:
+    module = importlib.import_module(f"collector.kipris_{category}")
+    return module.CATEGORY_SPEC
+
+
+def load_companies() -> list:
+    # try:
+    #     companies = get_cmp_list("KIPRIS_PATENT")
+    # except Exception as e:
+    #     insert_error_log("Get Cmp List", "KIPRIS_PATENT", f"기업 목록 조회 실패: {e}", "")
+    #     raise
+    with open(COMPANY_LIST_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+_metrics_lock = threading.Lock()
+
+
+def add_metric(category: str, name: str, value: int = 1):
+    with _metrics_lock:
+        metrics = RUN_METRICS.setdefault(category, {"companies": 0, "records": 0, "empty": 0, "skipped": 0,
+                                                    "duplicates": 0, "errors": 0})
+        metrics[name] += value
+
+
+def print_run_summary():
+    for category, metrics in RUN_METRICS.items():
+        print(f"[KIPRIS] {category} : 기업 {metrics['companies']}개, {metrics['records']}건 수집, "
+              f"검색결과 없음 {metrics['empty']}, 없음 캐시로 건너뜀 {metrics['skipped']}, 중복 중단 {metrics['duplicates']}, 오류 {metrics['errors']}")
+    print_wait_summary()
+    print_driver_summary()
+
+
+# 체크포인트에 기록하는 정렬 기준 (sort_by_application_an)
+# 페이지당 건수가 바뀌면 페이지 번호가 달라지므로 실제 적용된 건수도 함께 기록
+SORT_KEY = "출원번호"
+SORT_ORDER = f"{SORT_KEY}:{RESULTS_PER_PAGE}"
+
+
+def get_page_sort_order(page_size: int) -> str:
+    return f"{SORT_KEY}:{page_size}"
+
+
+# 현재 백엔드의 정렬 기준 (API는 페이지 크기/정렬이 달라 화면 수집의 체크포인트를 쓰지 않음)
+def get_sort_order() -> str:
+    return API_SORT_ORDER if KIPRIS_BACKEND == "api" else SORT_ORDER
+
+
+# 페이지 경계 표시 : iter_company_records가 한 페이지를 끝낼 때마다 yield
+# page_no : 끝난 페이지 번호, last_an : 그 페이지에서 마지막으로 처리한 출원번호
+# sort_order : 체크포인트에 기록할 정렬 기준 (실제 페이지당 건수 포함, None이면 get_sort_order())
+class PageEnd:
+    def __init__(self, page_no: int, last_an: str | None, sort_order: str | None = None):
+        self.page_no = page_no
+        self.last_an = last_an
+        self.sort_order = sort_order or get_sort_order()
+
+
+# 레코드를 페이지 단위로 모아 적재하는 버퍼
+# 메모리에는 최대 max_buffer건만 유지하고, 적재된 건수는 count에 누적
+class PageWriter:
+    def __init__(self, es, spec: dict, biz_no: str, max_buffer: int = PAGE_SIZE):
+        self.es = es
+        self.spec = spec
+        self.biz_no = biz_no
+        self.max_buffer = max_buffer
+        self.buffer = []
+        self.count = 0
+
+    def add(self, record: dict):
+        self.buffer.append(record)
+        if len(self.buffer) >= self.max_buffer:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        self.spec["insert"](self.es, self.buffer, self.biz_no)
+        self.count += len(self.buffer)
+        self.buffer = []
+
+
+# 이전 실행의 체크포인트 (정렬 기준이 다르면 무시)
+# 페이지당 건수만 다르면 유지하고, iter_company_records에서 페이지 번호 대신 1페이지부터 다시 확인
+def load_checkpoint(spec: dict, biz_no: str) -> dict | None:
+    checkpoint = get_checkpoint(spec["data_type"], biz_no)
+    if checkpoint and checkpoint["SORT_ORDER"].split(":")[0] != get_sort_order().split(":")[0]:
+        delete_checkpoint(spec["data_type"], biz_no)
+        return None
+    return checkpoint
+
+
+# 기업의 적재된 출원번호를 한 번에 조회해서 카드마다 elasticsearch를 조회하지 않음
+# an_dates : 기업 단위로 미리 조회한 {출원번호: SearchDate} (없으면 여기서 조회)
+# 반환 : (이전 실행까지 적재된 출원번호, 중단된 실행에서 적재된 출원번호)
+def load_known_ans(es, spec: dict, biz_no: str, checkpoint: dict | None = None,
+                   an_dates: dict | None = None) -> tuple[set, set]:
+    if an_dates is None:
+        an_dates = get_application_an_dates(es, spec["es_data_type"], biz_no)
+    if checkpoint:
+        started_at = checkpoint["STARTED_AT"].strftime("%Y-%m-%d %H:%M:%S.%f")
+        known_ans = {an for an, search_date in an_dates.items() if search_date < started_at}
+        return known_ans, set(an_dates) - known_ans
+    return set(an_dates), set()
+
+
+# 검색결과 없음 캐시 사용 여부 (KIPRIS_FORCE_REFRESH=1이면 캐시와 상관없이 모든 기업을 다시 검색)
+EMPTY_CACHE = os.getenv("KIPRIS_EMPTY_CACHE", "1") == "1"
+FORCE_REFRESH = os.getenv("KIPRIS_FORCE_REFRESH", "0") == "1"
+# 결과가 없던 기업을 다시 확인하는 간격(일) : 연속으로 없을 때마다 두 배, 최대 EMPTY_RECHECK_MAX_DAYS
+EMPTY_RECHECK_DAYS = float(os.getenv("KIPRIS_EMPTY_RECHECK_DAYS", "1"))
+EMPTY_RECHECK_MAX_DAYS = float(os.getenv("KIPRIS_EMPTY_RECHECK_MAX_DAYS", "30"))
+
+# data_type -> {BIZ_NO: kipris_empty_cache row} (data_type마다 처음 사용할 때 한 번 조회)
+EMPTY_RESULTS = {}
+_empty_lock = threading.Lock()
+
+
+def get_empty_result(spec: dict, biz_no: str) -> dict | None:
+    if not EMPTY_CACHE:
+        return None
+    with _empty_lock:
+        if spec["data_type"] not in EMPTY_RESULTS:
+            EMPTY_RESULTS[spec["data_type"]] = get_empty_results(spec["data_type"])
+        return EMPTY_RESULTS[spec["data_type"]].get(biz_no)
+
+
+# 결과가 없던 기업이고 다시 확인할 때가 되지 않았으면 True (검색하지 않고 건너뜀)
+def is_empty_cached(spec: dict, biz_no: str) -> bool:
+    if FORCE_REFRESH:
+        return False
+    row = get_empty_result(spec, biz_no)
+    return row is not None and row["NEXT_CHECK_AT"] > datetime.now()
+
+
+# 검색 결과 없음 기록 : 연속 횟수를 늘리고 다음 확인 시각을 간격만큼 미룸
+def record_empty_result(spec: dict, biz_no: str):
+    if not EMPTY_CACHE:
+        return
+    row = get_empty_result(spec, biz_no)
+    miss_count = row["MISS_COUNT"] + 1 if row else 1
+    days = min(EMPTY_RECHECK_DAYS * 2 ** (miss_count - 1), EMPTY_RECHECK_MAX_DAYS)
+    now = datetime.now()
+    row = {"BIZ_NO": biz_no, "MISS_COUNT": miss_count, "LAST_CHECKED_AT": now, "NEXT_CHECK_AT": now + timedelta(days=days)}
+    with _empty_lock:
+        EMPTY_RESULTS[spec["data_type"]][biz_no] = row
+    save_empty_result(spec["data_type"], biz_no, miss_count, now, row["NEXT_CHECK_AT"])
+
+
+# 검색 결과가 생긴 기업은 캐시에서 삭제
+def clear_empty_result(spec: dict, biz_no: str):
+    if get_empty_result(spec, biz_no) is None:
+        return
+    with _empty_lock:
+        EMPTY_RESULTS[spec["data_type"]].pop(biz_no, None)
+    delete_empty_result(spec["data_type"], biz_no)
+
+
+# 이전 실행에서도 결과가 없어서 Data: None 문서가 이미 적재된 기업
+def has_empty_placeholder(spec: dict, biz_no: str) -> bool:
+    row = get_empty_result(spec, biz_no)
+    return row is not None and row["MISS_COUNT"] > 1
+
+
+# KIPRIS Plus Open API로 한 기업의 한 카테고리 서지정보를 yield (API 페이지가 끝나면 PageEnd)
+# 화면 수집과 같이 최신순으로 받아서 이미 적재된 출원번호를 만나면 DuplicateError
+def iter_api_company_records(es, spec: dict, biz_no: str, comp_name: str, checkpoint: dict | None = None,
+                             an_dates: dict | None = None):
+    clean_comp_name = re.sub(r'\(.*?\)', '', comp_name)
+    known_ans, resumed_ans = load_known_ans(es, spec, biz_no, checkpoint, an_dates)
+    start_page = checkpoint["PAGE_NO"] if checkpoint else 1
+
+    current_page = None
+    an = None
+    for page_no, record in iter_api_records(spec["category"], biz_no, start_page):
+        if current_page is not None and page_no != current_page:
+            yield PageEnd(current_page, an)
+        current_page = page_no
+        an = record["ApplicationNumber"].strip()
+        if an in resumed_ans:
+            continue
+        if an in known_ans:
+            raise DuplicateError
+        yield record
+
+    if current_page is None:
+        if not checkpoint:
+            print(f"{clean_comp_name}({biz_no}) - {spec['label']} : 검색 결과 없음")
+            add_metric(spec["category"], "empty")
+            record_empty_result(spec, biz_no)
+        return
+    clear_empty_result(spec, biz_no)
+    yield PageEnd(current_page, an)
+
+
+# 한 기업의 한 카테고리 검색 결과를 카드 단위로 yield (페이지가 끝나면 PageEnd)
+# 이미 적재된 출원번호를 만나면 DuplicateError
+# checkpoint가 있으면 마지막으로 적재한 페이지 다음부터 이어서 수집하고,
+# 중단된 실행에서 적재한 출원번호(STARTED_AT 이후 적재)는 중복 중단 대신 건너뛴다
+# page_range : (시작 페이지, 끝 페이지) 결과 목록의 일부 페이지만 수집 (목록 이동 모드)
+# on_total : on_total(total, total_pages, page_size) 페이지당 건수 확인 직후 호출,
+#            페이지 번호를 반환하면 그 페이지까지만 수집 (예외를 내면 수집하지 않고 중단)
+def iter_company_records(driver: WebDriver, es, spec: dict, biz_no: str, comp_name: str,
+                         checkpoint: dict | None = None, an_dates: dict | None = None,
+                         page_range: tuple | None = None, on_total=None):
+    if KIPRIS_BACKEND == "api":
+        yield from iter_api_company_records(es, spec, biz_no, comp_name, checkpoint, an_dates)
+        return
+
+    clean_comp_name = re.sub(r'\(.*?\)', '', comp_name)
+    if KIPRIS_BACKEND == "xhr":
+        clear_captured_records(driver)
+    driver.get(f"{SEARCH_URL}?tab={spec['tab']}")
+    wait_for_search_page(driver)
+
+    spec["search"](driver, biz_no)
+    total = get_total_num(driver, spec["tab"])
+
+    if total == 0:
+        print(f"{clean_comp_name}({biz_no}) - {spec['label']} : 검색 결과 없음")
+        add_metric(spec["category"], "empty")
+        record_empty_result(spec, biz_no)
+        return
+    clear_empty_result(spec, biz_no)
+
+    # 페이지당 건수를 최대로 설정하고 정렬과 함께 한 번만 다시 검색
+    # 1페이지 카드 수와 맞지 않으면 기본 건수로 계산 (페이지 수를 작게 계산해서 뒤 페이지를 빠뜨리지 않도록)
+    page_size = set_results_per_page(driver)
+    sort_by_application_an(driver)
+    page_size = verify_results_per_page(driver, page_size, total)
+    page_sort_order = get_page_sort_order(page_size)
+    total_pages = get_page_count(total, page_size)
+
+    end_page = total_pages
+    if page_range:
+        end_page = min(page_range[1], total_pages)
+    if on_total:
+        limit = on_total(total, total_pages, page_size)
+        if limit:
+            end_page = min(end_page, limit)
+
+    known_ans, resumed_ans = load_known_ans(es, spec, biz_no, checkpoint, an_dates)
+
+    def is_dup(an: str) -> bool:
+        return an.strip() in known_ans
+
+    def is_resumed(an: str) -> bool:
+        return an.strip() in resumed_ans
+
+    # 서지정보만 수집하면 XHR 백엔드는 응답 레코드로 상세화면 추출을 대신함
+    payload_only = sections_within(PAYLOAD_SECTIONS)
+
+    if NAVIGATION_MODE == "direct":
+        # 출원번호를 먼저 모두 수집한 뒤 상세정보를 출원번호로 직접 연다 (KIPRIS_TABS > 1이면 여러 탭에서 동시에 로드)
+        entries, dup = harvest_application_numbers(driver, total_pages, spec["an_locator"], is_dup, is_resumed)
+        ans = [an for an, _ in entries]
+        failed = []
+        for idx, (an, record) in enumerate(iter_records_by_an(driver, spec["tab"], ans, spec["extract"])):
+            if record is None:
+                failed.append(an)
+            else:
+                yield record
+            # 결과 페이지의 마지막 출원번호까지 처리했으면 그 페이지 번호로 페이지 경계 표시
+            page_no = entries[idx][1]
+            if idx + 1 == len(entries) or entries[idx + 1][1] != page_no:
+                yield PageEnd(page_no, an, page_sort_order)
+        if failed:
+            insert_error_log("Open detail by an", spec["data_type"],
+                             f"{comp_name}({biz_no}) 상세정보 열기 실패 : {failed}", "")
+        if dup:
+            raise DuplicateError
+        return
+
+    current_page = 1
+    if page_range:
+        go_to_page(driver, page_range[0], current_page)
+        current_page = page_range[0]
+    elif checkpoint and checkpoint["SORT_ORDER"] != page_sort_order:
+        # 페이지당 건수가 달라 페이지 번호를 쓸 수 없음 : 1페이지부터 확인하고 적재된 카드는 is_resumed로 건너뜀
+        print(f"{clean_comp_name}({biz_no}) - {spec['label']} : 페이지당 건수가 달라 1페이지부터 이어서 수집")
+    elif checkpoint:
+        # 마지막으로 적재한 페이지로 이동 (페이지 안의 적재된 카드는 is_resumed로 건너뜀)
+        resume_page = min(checkpoint["PAGE_NO"], total_pages)
+        print(f"{clean_comp_name}({biz_no}) - {spec['label']} : {resume_page}페이지부터 이어서 수집")
+        go_to_page(driver, resume_page, current_page)
+        current_page = resume_page
+
+    while current_page <= end_page:
+        # 페이지의 출원번호/제목/상태/일자를 한 번에 읽고, 처리할 카드만 WebDriver로 다룬다
+        metas = harvest_page_metadata(driver, spec["an_locator"])
+        result_cards = None
+        an = None
+
+        for meta in metas:
+            an = meta["an"]
+            print(an)
+            if is_resumed(an):
+                continue
+            # 중복 확인
+            if is_dup(an):
+                raise DuplicateError
+
+            if result_cards is None:
+                has_result_flag, result_cards = has_result(driver)
+            card = result_cards[meta["index"]]
+            yield extract_record(
+                driver, spec["tab"], an,
+                lambda: open_card(driver, card),
+                lambda: spec["extract"](card),
+                payload_only
+            )
+        yield PageEnd(current_page, an, page_sort_order)
+        if current_page < end_page:
+            go_to_page(driver, current_page + 1, current_page)
+
+        current_page += 1
+
+
+# 기업 처리 완료 기록 (마지막 페이지까지 적재한 뒤에만 호출)
+# 수집 결과가 없으면 Data: None 문서를 적재 (이어서 수집한 경우는 이전 실행에서 적재한 건이 있으므로 제외)
+# 이전 실행에서도 결과가 없었으면 Data: None 문서가 이미 있으므로 다시 적재하지 않음
+def complete_company(es, spec: dict, biz_no: str, comp_name: str, writer: PageWriter, now: datetime,
+                     resumed: bool = False):
+    writer.flush()
+    if writer.count == 0 and not resumed and not has_empty_placeholder(spec, biz_no):
+        spec["insert"](es, [], biz_no)
+    delete_checkpoint(spec["data_type"], biz_no)
+    insert_check_log(biz_no, spec["data_type"], now)
+    insert_cmp_data_log(biz_no, spec["data_type"], writer.count, now)
+    add_metric(spec["category"], "records", writer.count)
+    print(f"{comp_name} - {writer.count}건 저장 완료")
+
+
+# 한 기업의 한 카테고리 처리
+# 레코드는 페이지마다 적재하고 체크포인트를 남기므로 중간에 실패해도 다음 실행에서 이어서 수집한다
+def process_company(driver: WebDriver, es, spec: dict, company: dict):
+    biz_no = ""
+    comp_name = ""
+    writer = None
+    now = datetime.now()
+
+    try:
+        biz_no = company["BIZ_NO"]
+        comp_name = company["CMP_NM"]
+        if is_empty_cached(spec, biz_no):
+            add_metric(spec["category"], "skipped")
+            return
+        add_metric(spec["category"], "companies")
+        writer = PageWriter(es, spec, biz_no)
+        checkpoint = load_checkpoint(spec, biz_no)
+        started_at = checkpoint["STARTED_AT"] if checkpoint else now
+
+        try:
+            for record in iter_company_records(driver, es, spec, biz_no, comp_name, checkpoint):
+                if isinstance(record, PageEnd):
+                    # 페이지 적재 후 체크포인트 저장 (브라우저가 죽으면 이 페이지부터 재개)
+                    writer.flush()
+                    save_checkpoint(spec["data_type"], biz_no, record.sort_order, record.page_no, record.last_an, started_at)
+                else:
+                    writer.add(record)
+        except DuplicateError:
+            tqdm.write(f"{comp_name} : 중복")
+            add_metric(spec["category"], "duplicates")
+            if writer.count == 0 and not writer.buffer and not checkpoint:
+                return
+
+        try:
+            complete_company(es, spec, biz_no, comp_name, writer, now, resumed=checkpoint is not None)
+        except Exception as e:
+            error_detail = traceback.format_exc()
+            insert_error_log("Insert data", spec["data_type"], f"데이터 삽입 실패({biz_no}) : {e}", error_detail)
+    except DataInsertError:
+        raise
+    except Exception as e:
+        add_metric(spec["category"], "errors")
+        error_detail = traceback.format_exc()
+        insert_error_log("Process company", spec["data_type"], f"{comp_name}({biz_no}) 기업 처리중 오류 발생 : {e}",
+                         error_detail)
+        # 현재 페이지에서 이미 추출한 레코드도 보존 (기업 완료 기록은 남기지 않음)
+        if writer and writer.buffer:
+            try:
+                writer.flush()
+            except Exception:
+                pass
+
+
+# 동시에 사용하는 브라우저 수 (2 이상이면 kipris_scheduler로 실행)
+KIPRIS_WORKERS = int(os.getenv("KIPRIS_WORKERS", "1"))
+
+# 여러 카테고리를 기업 단위로 묶어서 처리할지 여부
+COMPANY_SWEEP = os.getenv("KIPRIS_COMPANY_SWEEP", "1") == "1"
+
+# 기업 단위 수집 시 버퍼 최대 건수 (넘으면 중간 적재)
+SWEEP_BUFFER = int(os.getenv("KIPRIS_SWEEP_BUFFER", "500"))
+
+
+# 한 기업의 모든 카테고리 레코드를 모아 한 번의 bulk로 적재하는 버퍼
+# 페이지 체크포인트는 해당 페이지의 레코드가 적재된 뒤에만 저장한다
+class CompanyWriter:
+    def __init__(self, es, biz_no: str, max_buffer: int = SWEEP_BUFFER):
+        self.es = es
+        self.biz_no = biz_no
+        self.max_buffer = max_buffer
+        self.actions = []
+        self.pending_checkpoints = []
+        # data_type -> 추가된 건수
+        self.counts = {}
+
+    def add(self, spec: dict, record: dict):
+        self.actions.extend(build_source_actions(spec["es_data_type"], [record], self.biz_no))
+        self.counts[spec["data_type"]] = self.counts.get(spec["data_type"], 0) + 1
+        if len(self.actions) >= self.max_buffer:
+            self.flush()
+
+    # 수집 결과가 없는 카테고리의 Data: None 문서
+    def add_placeholder(self, spec: dict):
+        self.actions.extend(build_source_actions(spec["es_data_type"], None, self.biz_no))
+
+    def mark_page(self, spec: dict, page_end: PageEnd, started_at: datetime):
+        self.pending_checkpoints.append((spec, page_end, started_at))
+
+    def count(self, spec: dict) -> int:
+        return self.counts.get(spec["data_type"], 0)
+
+    def flush(self):
+        insert_source_actions(self.es, self.actions)
+        self.actions = []
+        for spec, page_end, started_at in self.pending_checkpoints:
+            save_checkpoint(spec["data_type"], self.biz_no, page_end.sort_order, page_end.page_no, page_end.last_an,
+                            started_at)
+        self.pending_checkpoints = []
+
+
+# 브라우저가 죽었으면 예비 브라우저로 교체해서 반환 (다음 실행 시 체크포인트부터 재개)
+def ensure_browser(pool, driver: WebDriver) -> WebDriver:
+    if pool and not is_browser_alive(driver):
+        tqdm.write("브라우저 세션 종료 감지 : 예비 브라우저로 교체")
+        return pool.replace(driver)
+    return driver
+
+
+# 한 기업의 모든 카테고리를 같은 브라우저에서 연속 처리
+# 출원번호 중복 확인용 조회는 기업당 한 번, 적재는 기업이 끝날 때 한 번(버퍼가 차면 중간 적재)
+# 카테고리마다 브라우저 상태를 확인해서 죽었으면 pool의 예비 브라우저로 교체하고, 마지막에 사용한 브라우저를 반환
+def process_company_sweep(driver: WebDriver, es, specs: list, company: dict, pool=None) -> WebDriver:
+    biz_no = company["BIZ_NO"]
+    comp_name = company["CMP_NM"]
+    now = datetime.now()
+    writer = CompanyWriter(es, biz_no)
+
+    # 결과가 없던 카테고리 중 다시 확인할 때가 되지 않은 카테고리는 건너뜀
+    skipped = [spec for spec in specs if is_empty_cached(spec, biz_no)]
+    for spec in skipped:
+        add_metric(spec["category"], "skipped")
+    specs = [spec for spec in specs if spec not in skipped]
+    if not specs:
+        return driver
+
+    try:
+        company_an_dates = get_company_an_dates(es, [spec["es_data_type"] for spec in specs], biz_no)
+    except Exception as e:
+        insert_error_log("Get company application numbers", "KIPRIS", f"{comp_name}({biz_no}) 출원번호 조회 실패 : {e}",
+                         traceback.format_exc())
+        return driver
+
+    # (spec, 이어서 수집 여부) : 마지막 페이지까지 처리한 카테고리
+    completed = []
+    for spec in specs:
+        add_metric(spec["category"], "companies")
+        checkpoint = None
+        try:
+            checkpoint = load_checkpoint(spec, biz_no)
+            started_at = checkpoint["STARTED_AT"] if checkpoint else now
+            try:
+                records = iter_company_records(driver, es, spec, biz_no, comp_name, checkpoint,
+                                               company_an_dates[spec["es_data_type"]])
+                for record in records:
+                    if isinstance(record, PageEnd):
+                        writer.mark_page(spec, record, started_at)
+                    else:
+                        writer.add(spec, record)
+            except DuplicateError:
+                tqdm.write(f"{comp_name} - {spec['label']} : 중복")
+                add_metric(spec["category"], "duplicates")
+                if writer.count(spec) == 0 and not checkpoint:
+                    continue
+            completed.append((spec, checkpoint is not None))
+        except DataInsertError:
+            raise
+        except Exception as e:
+            add_metric(spec["category"], "errors")
+            insert_error_log("Process company", spec["data_type"], f"{comp_name}({biz_no}) 기업 처리중 오류 발생 : {e}",
+                             traceback.format_exc())
+        # 이 카테고리에서 브라우저가 죽었으면 다음 카테고리 전에 교체
+        driver = ensure_browser(pool, driver)
+
+    try:
+        for spec, resumed in completed:
+            if writer.count(spec) == 0 and not resumed and not has_empty_placeholder(spec, biz_no):
+                writer.add_placeholder(spec)
+        # 실패한 카테고리에서 이미 추출한 레코드도 함께 적재 (완료 기록은 남기지 않음)
+        writer.flush()
+    except Exception as e:
+        insert_error_log("Insert data", "KIPRIS", f"데이터 삽입 실패({biz_no}) : {e}", traceback.format_exc())
+        return driver
+
+    for spec, resumed in completed:
+        count = writer.count(spec)
+        delete_checkpoint(spec["data_type"], biz_no)
+        insert_check_log(biz_no, spec["data_type"], now)
+        insert_cmp_data_log(biz_no, spec["data_type"], count, now)
+        add_metric(spec["category"], "records", count)
+        print(f"{comp_name} - {spec['label']} {count}건 저장 완료")
+    return driver
+
+
+# categories의 수집을 하나의 브라우저 세션에서 실행
+# 기업 단위로 모든 카테고리를 연속 처리하므로 카테고리마다 브라우저/ES 연결을 새로 만들지 않는다
+# 카테고리가 여러 개이면 기업 단위로 중복 확인 조회와 적재를 한 번에 처리 (KIPRIS_COMPANY_SWEEP=0이면 카테고리별)
+# sections : 추출할 상세정보 섹션 (set_selected_sections 참고, None이면 KIPRIS_SECTIONS 환경변수)
+def run_kipris(categories: list, sections: str | None = None):
+    if sections:
+        set_selected_sections(sections)
+    if KIPRIS_WORKERS > 1:
+        # 여러 브라우저로 큰 기업을 페이지 범위로 나눠 병렬 처리 (collector.kipris_scheduler)
+        scheduler = importlib.import_module("collector.kipris_scheduler")
+        return scheduler.run_kipris_scheduled(categories)
+    specs = [get_category_spec(category) for category in categories]
+    data_type = specs[0]["data_type"] if len(specs) == 1 else "KIPRIS"
+    es = None
+    pool = None
+
+    try:
+        # ES 연결, 기업 목록 로드와 겹치도록 브라우저를 먼저 백그라운드에서 기동 (API 백엔드는 브라우저 없음)
+        if KIPRIS_BACKEND != "api":
+            pool = BrowserPool(specs[0]["tab"], lean=LEAN_BROWSER, capture_network=KIPRIS_BACKEND == "xhr")
+            pool.prewarm()
+        try:
+            # elasticsearch 연결
+            es = get_es_conn()
+        except Exception as e:
+            error_detail = traceback.format_exc()
+            insert_error_log("Elasticsearch connection", data_type, f"Elasticsearch 연결 실패 : {e}", error_detail)
+            raise
+
+        companies = load_companies()
+        desc = "kipris_" + "_".join(categories) + " 수집"
+        driver = pool.acquire() if pool else None
+
+        sweep = len(specs) > 1 and COMPANY_SWEEP
+
+        for company in tqdm(companies, desc=desc, unit="회사"):
+            # 카테고리마다 브라우저가 죽었으면 예비 브라우저로 교체 (다음 실행 시 체크포인트부터 재개)
+            if sweep:
+                driver = process_company_sweep(driver, es, specs, company, pool)
+            else:
+                for spec in specs:
+                    process_company(driver, es, spec, company)
+                    driver = ensure_browser(pool, driver)
+    except Exception as e:
+        insert_error_log("Open Browser", data_type, "Cannot Open Browser", traceback.format_exc())
+    finally:
+        print_run_summary()
+        print_startup_summary()
+        if pool:
+            pool.close()
+        if es:
+            es.close()
+
+
+# python -m collector.kipris_engine [patent utility design trademark]
+if __name__ == "__main__":
+    categories = sys.argv[1:] or CATEGORIES
+    email = os.getenv("EMAIL")
+    password = os.getenv("PASSWORD")
+    exit_message = "N/A"
+    try:
+        run_kipris(categories)
+        exit_message = "프로그램 정상 종료"
+    except Exception as e:
+        exit_message = f"프로그램 예외 종료 : {e}"
+    finally:
+        send_naver_alert(email, email, password, f"KIPRIS({', '.join(categories)}) 프로그램 종료 됨 : {exit_message}")
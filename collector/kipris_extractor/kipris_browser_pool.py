@@ -0,0 +1,256 @@
+import os
+import fcntl
+import shutil
+import subprocess
+import threading
+import time
+from queue import Queue, Empty
+from selenium.common.exceptions import SessionNotCreatedException
+from undetected_chromedriver.patcher import Patcher
+from collector.kipris_extractor.kipris_utils import *
+
+"""
+KIPRIS 브라우저 사전 기동 / 재사용 풀
+- 패치된 chromedriver 바이너리를 설치된 Chrome 메이저 버전별로 캐시해서 매 실행마다 다운로드/패치하지 않음
+  (Chrome이 자동 업데이트되면 새 버전의 드라이버를 패치하고, 세션 생성이 실패하면 캐시를 지우고 다시 패치)
+- 슬롯별 브라우저 프로필을 재사용 (디스크 캐시, 쿠키 유지)
+  슬롯은 프로필 잠금 파일(flock)로 잡으므로 여러 수집기 프로세스가 같은 프로필을 동시에 쓰지 않고,
+  종료한 브라우저의 슬롯은 다음 브라우저가 다시 사용
+- 기업 목록을 읽기 전에 브라우저를 미리 띄워 두고, 예비 브라우저를 항상 준비해서
+  브라우저가 죽었을 때 교체 대기 시간이 거의 없도록 함
+"""
+
+CACHE_DIR = os.getenv("KIPRIS_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "fncsp"))
+# 실제 경로는 {DRIVER_PATH}-{Chrome 메이저 버전}
+DRIVER_PATH = os.getenv("KIPRIS_DRIVER_PATH", os.path.join(CACHE_DIR, "chromedriver"))
+PROFILE_DIR = os.getenv("KIPRIS_PROFILE_DIR", os.path.join(CACHE_DIR, "profiles"))
+
+# 사용 중인 브라우저 외에 미리 띄워 둘 예비 브라우저 수
+POOL_SPARES = int(os.getenv("KIPRIS_POOL_SPARES", "1"))
+
+# 기동 시간 기록 : cold(드라이버 패치 포함), warm(캐시된 드라이버 사용), acquire(브라우저를 받기까지 대기)
+STARTUP_TIMINGS = {}
+
+_driver_lock = threading.Lock()
+# 확인한 Chrome 메이저 버전 (None이면 아직 확인하지 않음)
+_chrome_major = None
+
+
+def record_startup(name: str, seconds: float):
+    STARTUP_TIMINGS.setdefault(name, []).append(seconds)
+
+
+def print_startup_summary():
+    for name, timings in STARTUP_TIMINGS.items():
+        print(f"[BROWSER] {name} : {len(timings)}회, 평균 {sum(timings) / len(timings):.3f}초, "
+              f"최대 {max(timings):.3f}초")
+
+
+# 설치된 Chrome의 메이저 버전 (확인하지 못하면 0 : Patcher가 최신 드라이버를 받음)
+def get_chrome_major_version() -> int:
+    try:
+        output = subprocess.run([uc.find_chrome_executable(), "--version"],
+                                capture_output=True, text=True, timeout=10).stdout
+        match = re.search(r"(\d+)\.\d+\.\d+", output)
+        return int(match.group(1)) if match else 0
+    except Exception as e:
+        print("get_chrome_major_version : ", e)
+        return 0
+
+
+# 패치된 chromedriver 경로 반환, Chrome 메이저 버전의 캐시가 없으면 한 번만 다운로드/패치해서 저장
+# refresh : Chrome 버전을 다시 확인하고 캐시된 드라이버를 지운 뒤 다시 패치 (세션 생성 실패 시)
+# 두 번째 반환값은 이번 호출에서 새로 패치했는지 여부(cold)
+def get_cached_driver_path(refresh: bool = False) -> tuple[str, bool]:
+    global _chrome_major
+    with _driver_lock:
+        if refresh or _chrome_major is None:
+            _chrome_major = get_chrome_major_version()
+        driver_path = f"{DRIVER_PATH}-{_chrome_major}"
+        if refresh and os.path.exists(driver_path):
+            os.remove(driver_path)
+        if os.path.exists(driver_path) and Patcher(executable_path=driver_path).is_binary_patched():
+            return driver_path, False
+
+        os.makedirs(os.path.dirname(driver_path), exist_ok=True)
+        patcher = Patcher(version_main=_chrome_major)
+        patcher.auto()
+        shutil.copy2(patcher.executable_path, driver_path)
+        return driver_path, True
+
+
+# 다른 브라우저(다른 프로세스 포함)가 쓰지 않는 가장 작은 프로필 슬롯을 잡음
+# 반환 : (슬롯 번호, 잠금 파일) 잠금 파일을 닫으면 슬롯이 풀림 (프로세스가 죽어도 자동으로 풀림)
+def claim_profile_slot() -> tuple:
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    slot = 0
+    while True:
+        lock_file = open(os.path.join(PROFILE_DIR, f"slot{slot}.lock"), "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return slot, lock_file
+        except BlockingIOError:
+            lock_file.close()
+            slot += 1
+
+
+def release_profile_slot(lock_file):
+    try:
+        lock_file.close()
+    except Exception as e:
+        print("release_profile_slot : ", e)
+
+
+# 캐시된 드라이버와 슬롯 전용 프로필로 브라우저 기동
+# 세션 생성이 실패하면 (Chrome이 업데이트되어 드라이버 버전이 맞지 않음) 드라이버를 다시 패치해서 한 번 더 시도
+def launch_browser(category: str, slot: int, lean: bool = False, capture_network: bool = False) -> WebDriver:
+    start = time.perf_counter()
+
+    def _open(driver_path: str) -> WebDriver:
+        # 동시에 여러 브라우저를 띄우므로 디버깅 포트는 자동 할당, 프로필은 슬롯별로 분리
+        return open_browser(
+            category, lean=lean, capture_network=capture_network,
+            driver_executable_path=driver_path,
+            user_data_dir=os.path.join(PROFILE_DIR, f"slot{slot}"),
+            debug_port=None,
+        )
+
+    driver_path, cold = get_cached_driver_path()
+    try:
+        driver = _open(driver_path)
+    except SessionNotCreatedException as e:
+        print(f"launch_browser : 세션 생성 실패, chromedriver를 다시 패치 ({driver_path}) : ", e)
+        driver_path, cold = get_cached_driver_path(refresh=True)
+        driver = _open(driver_path)
+    record_startup("cold" if cold else "warm", time.perf_counter() - start)
+    return driver
+
+
+# 브라우저 세션이 살아있는지 확인 (크래시/세션 종료 감지)
+def is_browser_alive(driver: WebDriver) -> bool:
+    try:
+        driver.execute_script("return 1;")
+        return True
+    except Exception:
+        return False
+
+
+def quit_browser(driver: WebDriver):
+    try:
+        driver.quit()
+    except Exception as e:
+        print("quit_browser : ", e)
+
+
+class BrowserPool:
+    def __init__(self, category: str, size: int = 1, spares: int = POOL_SPARES,
+                 lean: bool = False, capture_network: bool = False):
+        self.category = category
+        self.size = size
+        self.spares = spares
+        self.lean = lean
+        self.capture_network = capture_network
+        self.ready = Queue()
+        self.in_use = set()
+        self.pending = 0
+        # 브라우저 -> 프로필 슬롯 잠금 파일
+        self._slot_locks = {}
+        self._lock = threading.Lock()
+
+    def _launch(self):
+        driver = None
+        lock_file = None
+        try:
+            slot, lock_file = claim_profile_slot()
+            driver = launch_browser(self.category, slot, self.lean, self.capture_network)
+            with self._lock:
+                self._slot_locks[driver] = lock_file
+        except Exception as e:
+            print("BrowserPool launch : ", e)
+            if lock_file:
+                release_profile_slot(lock_file)
+        finally:
+            with self._lock:
+                self.pending -= 1
+            self.ready.put(driver)
+
+    # 브라우저를 종료하고 프로필 슬롯을 풀어서 다음 브라우저가 재사용
+    def _quit(self, driver: WebDriver):
+        quit_browser(driver)
+        with self._lock:
+            lock_file = self._slot_locks.pop(driver, None)
+        if lock_file:
+            release_profile_slot(lock_file)
+
+    def _launch_async(self, count: int):
+        with self._lock:
+            self.pending += count
+        for _ in range(count):
+            threading.Thread(target=self._launch, daemon=True).start()
+
+    # 준비됐거나 기동 중인 예비 브라우저가 spares개가 되도록 채움
+    def _refill(self):
+        with self._lock:
+            missing = self.spares - (self.ready.qsize() + self.pending)
+        if missing > 0:
+            self._launch_async(missing)
+
+    # 기업 목록을 읽기 전에 호출 : 사용할 브라우저 + 예비 브라우저를 백그라운드에서 기동
+    def prewarm(self):
+        self._launch_async(self.size + self.spares)
+
+    # 준비된 브라우저를 꺼내고 예비 브라우저를 다시 채움
+    def acquire(self, timeout: float = 120) -> WebDriver:
+        start = time.perf_counter()
+        deadline = start + timeout
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                raise Exception("BrowserPool : 브라우저를 기동하지 못함")
+            if self.ready.empty() and self.pending == 0:
+                self._launch_async(1)
+            try:
+                driver = self.ready.get(timeout=remaining)
+            except Empty:
+                raise Exception("BrowserPool : 브라우저를 기동하지 못함")
+            if driver is not None and is_browser_alive(driver):
+                break
+            # 기동 실패 또는 대기 중에 죽은 브라우저는 버림
+            if driver is not None:
+                self._quit(driver)
+
+        record_startup("acquire", time.perf_counter() - start)
+        with self._lock:
+            self.in_use.add(driver)
+        self._refill()
+        return driver
+
+    def release(self, driver: WebDriver):
+        with self._lock:
+            self.in_use.discard(driver)
+        if is_browser_alive(driver):
+            self.ready.put(driver)
+        else:
+            self._quit(driver)
+            self._refill()
+
+    # 죽은 브라우저를 버리고 예비 브라우저로 즉시 교체
+    def replace(self, driver: WebDriver) -> WebDriver:
+        with self._lock:
+            self.in_use.discard(driver)
+        self._quit(driver)
+        return self.acquire()
+
+    def close(self):
+        with self._lock:
+            drivers = list(self.in_use)
+            self.in_use.clear()
+        while True:
+            try:
+                driver = self.ready.get_nowait()
+            except Empty:
+                break
+            if driver is not None:
+                drivers.append(driver)
+        for driver in drivers:
+            self._quit(driver)
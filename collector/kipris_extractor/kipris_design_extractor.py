@@ -50,7 +50,7 @@ def extract_design_bibliography(info_div):
                 td_list = td_text.split("(")
                 date_str = td_list[1]
                 cleand = date_str.strip("()")
-                date = datetime.strptime(cleand, "%Y.%m.%d").strftime("%Y-%m-%d")
+                date = dotted_to_iso(cleand)
                 bib[field_name[0]] = td_list[0]
                 bib[field_name[1]] = date
             else:
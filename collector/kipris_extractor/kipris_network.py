@@ -0,0 +1,313 @@
+import os
+import re
+import json
+from selenium.webdriver.remote.webdriver import WebDriver
+from collector.kipris_extractor.kipris_snapshot import archive_detail_snapshot, archive_payload_snapshot
+from collector.kipris_extractor.kipris_trace import trace_card
+
+"""
+KIPRIS 화면의 백그라운드 요청(XHR) JSON 응답을 CDP Network 이벤트로 수집해서
+서지정보 필드로 매핑하는 함수들
+응답에는 서지정보만 있으므로 서지정보만 수집하는 실행(KIPRIS_SECTIONS=bibliography)에서만
+상세화면을 열지 않고 응답으로 레코드를 만든다. 그 외 섹션이 선택되었거나 응답을 인식하지 못하면
+상세화면을 열어 DOM으로 추출하고, 캡처된 응답은 DOM에서 비어 있는 서지정보 필드를 채우는 데만 사용한다.
+
+응답 필드명(PAYLOAD_FIELD_MAPPING)이 실제 응답과 맞는지는 카테고리마다 처음 XHR_VERIFY_CARDS건을
+DOM 추출 결과와 비교해서 확인하고, 하나라도 다르면 그 카테고리는 실행이 끝날 때까지 DOM으로 추출한다.
+KIPRIS_SNAPSHOT_DIR이 설정되면 매핑된 응답 항목을 {category}_{출원번호}.json으로 저장한다.
+"""
+
+# dom : 상세화면 DOM 추출, xhr : 서지정보만 수집하면 XHR 응답으로 레코드 생성 (그 외 DOM 추출 + 빈 필드 보완)
+# api : 브라우저 없이 KIPRIS Plus Open API 사용 (kipris_openapi)
+KIPRIS_BACKEND = os.getenv("KIPRIS_BACKEND", "dom")
+
+# 응답 레코드만으로 상세화면 DOM 추출을 대신할 때 DOM과 비교해서 확인할 카드 수 (카테고리별)
+XHR_VERIFY_CARDS = int(os.getenv("KIPRIS_XHR_VERIFY_CARDS", "3"))
+
+# 응답으로 채울 수 있는 상세정보 섹션 키 (이 섹션만 선택된 실행에서 상세화면을 열지 않음)
+PAYLOAD_SECTIONS = {"bibliography"}
+
+# 응답 필드명 -> 적재 필드명 (patent 매핑은 실용신안에도 사용)
+PAYLOAD_FIELD_MAPPING = {
+    "patent": {
+        "applicationNumber": "ApplicationNumber",
+        "applicationDate": "ApplicationDate",
+        "registerNumber": "RegisterNumber",
+        "registerDate": "RegisterDate",
+        "openNumber": "OpenNumber",
+        "openDate": "OpenDate",
+        "registerStatus": "RegisterStatus",
+        "inventionTitle": "InventionTitle",
+        "applicantName": "ApplicantName",
+        "ipcNumber": "IPCNumber",
+        "cpcNumber": "CPCNumber",
+        "examinationCount": "ExaminationCount",
+        "astrtCont": "AstrtCont",
+    },
+    "design": {
+        "applicationNumber": "ApplicationNumber",
+        "applicationDate": "ApplicationDate",
+        "registrationNumber": "RegisterNumber",
+        "registrationDate": "RegisterDate",
+        "openNumber": "OpenNumber",
+        "openDate": "OpenDate",
+        "applicationStatus": "RegisterStatus",
+        "articleName": "InventionTitle",
+        "applicantName": "Applicant",
+        "designMainClassification": "DesignClass",
+        "internationalClassification": "LocarnoClass",
+    },
+    "trademark": {
+        "applicationNumber": "ApplicationNumber",
+        "applicationDate": "ApplicationDate",
+        "registrationNumber": "RegisterNumber",
+        "registrationDate": "RegisterDate",
+        "publicationNumber": "AppIPubINumber",
+        "publicationDate": "AppIPubIDate",
+        "applicationStatus": "RegisterStatus",
+        "title": "InventionTitle",
+        "applicantName": "Applicant",
+        "classificationCode": "Classification",
+    },
+}
+
+# 서지정보 섹션만 추출할 때 DOM 추출이 채우는 필드 (상세화면 명칭 포함)
+# 응답 레코드로 상세화면을 대신하면 이 필드만 적재
+BIBLIOGRAPHY_FIELDS = {
+    "patent": ["InventionTitle", "ApplicationNumber", "ApplicationDate", "RegisterNumber", "RegisterDate",
+               "OpenNumber", "OpenDate", "RegisterStatus", "ApplicantName", "IPCNumber", "CPCNumber",
+               "ExaminationCount", "AstrtCont"],
+    "design": ["InventionTitle", "ApplicationNumber", "ApplicationDate", "RegisterNumber", "RegisterDate",
+               "OpenNumber", "OpenDate", "RegisterStatus", "DesignClass", "LocarnoClass"],
+    "trademark": ["InventionTitle", "ApplicationNumber", "ApplicationDate", "RegisterNumber", "RegisterDate",
+                  "AppIPubINumber", "AppIPubIDate", "RegisterStatus", "Classification"],
+}
+
+# 이 필드가 모두 채워져야 인식된 응답으로 판단
+REQUIRED_FIELDS = ["ApplicationNumber", "ApplicationDate", "RegisterStatus", "InventionTitle"]
+
+# "|" 또는 ","로 구분된 값을 리스트로 변환할 필드
+LIST_FIELDS = {"ApplicantName", "IPCNumber", "CPCNumber", "Applicant"}
+
+# 정수로 변환할 필드
+INT_FIELDS = {"ExaminationCount"}
+
+# (브라우저 세션, category) -> {출원번호: 매핑된 레코드}
+# 기업마다 clear_captured_records로 비움 (다른 기업의 응답이 쌓이지 않도록)
+CAPTURED_RECORDS = {}
+
+# category -> DOM 추출과 일치한 카드 수, 다른 카드가 나오면 False (이후 DOM으로 추출)
+PAYLOAD_VERIFIED = {}
+
+
+# Chrome 생성 전 옵션에 performance 로그 수집 설정
+def enable_performance_log(opts):
+    opts.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+
+# 브라우저 생성 후 Network 이벤트 수집 시작
+def start_network_capture(driver: WebDriver):
+    try:
+        driver.execute_cdp_cmd("Network.enable", {
+            "maxTotalBufferSize": 50 * 1024 * 1024,
+            "maxResourceBufferSize": 10 * 1024 * 1024,
+        })
+    except Exception as e:
+        print("start_network_capture : ", e)
+
+
+# 지금까지 쌓인 performance 로그에서 JSON 응답 본문을 꺼낸다
+def drain_json_payloads(driver: WebDriver) -> list:
+    payloads = []
+    try:
+        logs = driver.get_log("performance")
+    except Exception as e:
+        print("drain_json_payloads : ", e)
+        return payloads
+
+    for entry in logs:
+        try:
+            message = json.loads(entry["message"])["message"]
+        except Exception:
+            continue
+        if message.get("method") != "Network.responseReceived":
+            continue
+
+        response = message["params"]["response"]
+        if "json" not in (response.get("mimeType") or ""):
+            continue
+        try:
+            body = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": message["params"]["requestId"]})
+            payloads.append(json.loads(body.get("body") or "null"))
+        except Exception:
+            # 이미 버퍼에서 빠졌거나 JSON이 아닌 응답
+            continue
+    return payloads
+
+
+def _normalize_an(an) -> str:
+    return re.sub(r"\D", "", str(an or ""))
+
+
+def _normalize_date(value):
+    digits = re.sub(r"\D", "", str(value or ""))
+    if len(digits) != 8:
+        return None
+    return f"{digits[:4]}-{digits[4:6]}-{digits[6:]}"
+
+
+# 응답 JSON 안의 dict들을 재귀적으로 순회
+def _iter_dicts(node):
+    if isinstance(node, dict):
+        yield node
+        for value in node.values():
+            yield from _iter_dicts(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from _iter_dicts(value)
+
+
+# IPC는 상세화면 추출과 같은 형태로 ("G06F 17/30(2006.01)" -> "G06F17/30")
+def _normalize_ipc(value: str) -> str:
+    return re.sub(r'\(.*?\)', '', value).replace(' ', '')
+
+
+# 응답 dict 하나를 적재 필드로 매핑, 알 수 없는 형태이면 None
+# required : 이 필드가 모두 채워져야 매핑 결과를 반환 (기본 REQUIRED_FIELDS)
+def map_payload_item(category: str, item: dict, required: list | None = None) -> dict | None:
+    mapping = PAYLOAD_FIELD_MAPPING.get(category, {})
+    if "applicationNumber" not in item:
+        return None
+
+    record = {}
+    for key, field_name in mapping.items():
+        value = item.get(key)
+        if value in (None, ""):
+            continue
+        if field_name.endswith("Date"):
+            value = _normalize_date(value)
+        elif field_name in LIST_FIELDS and isinstance(value, str):
+            value = [v.strip() for v in re.split(r"[|,]", value) if v.strip()]
+        elif field_name in INT_FIELDS:
+            try:
+                value = int(value)
+            except (TypeError, ValueError):
+                continue
+        if field_name in ("IPCNumber", "CPCNumber") and isinstance(value, list):
+            value = [_normalize_ipc(v) for v in value]
+        record[field_name] = value
+
+    if not all(record.get(field) for field in (REQUIRED_FIELDS if required is None else required)):
+        return None
+    return record
+
+
+# driver의 캡처 캐시를 비움 (쌓인 performance 로그도 함께 버림)
+def clear_captured_records(driver: WebDriver):
+    session_id = getattr(driver, "session_id", None)
+    for key in [key for key in CAPTURED_RECORDS if key[0] == session_id]:
+        del CAPTURED_RECORDS[key]
+    drain_json_payloads(driver)
+
+
+# 새로 들어온 응답을 매핑해서 캐시에 넣고, 해당 출원번호 레코드를 꺼낸다
+def get_captured_record(driver: WebDriver, category: str, an: str) -> dict | None:
+    cache = CAPTURED_RECORDS.setdefault((getattr(driver, "session_id", None), category), {})
+    for payload in drain_json_payloads(driver):
+        for item in _iter_dicts(payload):
+            record = map_payload_item(category, item)
+            if record:
+                cache[_normalize_an(record["ApplicationNumber"])] = record
+                archive_payload_snapshot(category, record["ApplicationNumber"], item)
+    return cache.pop(_normalize_an(an), None)
+
+
+# DOM에서 비어 있는 서지정보 필드만 캡처된 응답 값으로 채움 (DOM 값이 있으면 그대로 사용)
+def fill_bibliography(record: dict, captured: dict | None) -> dict:
+    if not captured:
+        return record
+    for field_name, value in captured.items():
+        if record.get(field_name) in (None, "", []):
+            record[field_name] = value
+    return record
+
+
+# 응답 레코드에서 서지정보 섹션 필드만 (DOM 추출과 같은 모양)
+def payload_record(category: str, captured: dict) -> dict:
+    return {field: captured[field] for field in BIBLIOGRAPHY_FIELDS.get(category, []) if field in captured}
+
+
+# 응답 매핑이 카테고리의 서지정보 필드를 모두 채울 수 있는지
+def payload_covers(category: str) -> bool:
+    fields = BIBLIOGRAPHY_FIELDS.get(category)
+    return bool(fields) and set(fields) <= set(PAYLOAD_FIELD_MAPPING.get(category, {}).values())
+
+
+def _empty(value) -> bool:
+    return value in (None, "", [])
+
+
+# 응답 레코드와 DOM 추출 결과가 다른 서지정보 필드 목록 (빈 값은 없는 값과 같게 봄)
+def payload_mismatches(category: str, dom_record: dict, captured: dict) -> list:
+    mismatches = []
+    for field in BIBLIOGRAPHY_FIELDS.get(category, []):
+        dom_value, payload_value = dom_record.get(field), captured.get(field)
+        if _empty(dom_value) and _empty(payload_value):
+            continue
+        if dom_value != payload_value:
+            mismatches.append(field)
+    return mismatches
+
+
+# 처음 XHR_VERIFY_CARDS건은 DOM 추출 결과와 비교, 하나라도 다르면 이 카테고리는 응답 레코드를 쓰지 않음
+def verify_payload(category: str, an: str, dom_record: dict, captured: dict):
+    if PAYLOAD_VERIFIED.get(category, 0) is False:
+        return
+    mismatches = payload_mismatches(category, dom_record, captured)
+    if mismatches:
+        PAYLOAD_VERIFIED[category] = False
+        print(f"[XHR] {category} {an} : 응답과 DOM 값이 다른 필드 {mismatches}, 이후 DOM으로 추출")
+        return
+    PAYLOAD_VERIFIED[category] = PAYLOAD_VERIFIED.get(category, 0) + 1
+
+
+def payload_verified(category: str) -> bool:
+    state = PAYLOAD_VERIFIED.get(category, 0)
+    return state is not False and state >= XHR_VERIFY_CARDS
+
+
+# XHR 백엔드에서 서지정보만 수집하면 응답 레코드를 바로 반환하고 (상세화면을 열지 않음),
+# 그 외에는 상세화면을 열어 DOM에서 추출한 뒤 캡처된 응답으로 빈 서지정보 필드를 보완
+# open_detail : 상세화면을 여는 함수, dom_extract : DOM 추출 함수
+# payload_only : 선택된 섹션이 모두 PAYLOAD_SECTIONS 안에 있는지 (sections_within(PAYLOAD_SECTIONS))
+# 카드 한 건에 쓰인 WebDriver 명령과 시간은 카드 단위로 계측 (trace_card)
+def extract_record(driver: WebDriver, category: str, an: str, open_detail, dom_extract,
+                   payload_only: bool = False) -> dict:
+    with trace_card(category, an):
+        return _extract_record(driver, category, an, open_detail, dom_extract, payload_only)
+
+
+def _extract_record(driver: WebDriver, category: str, an: str, open_detail, dom_extract,
+                    payload_only: bool = False) -> dict:
+    if KIPRIS_BACKEND != "xhr":
+        open_detail()
+        archive_detail_snapshot(driver, category, an)
+        return dom_extract()
+
+    use_payload = payload_only and payload_covers(category)
+
+    # 결과 리스트 응답에 있으면 그 값을, 없으면 상세화면 응답의 값을 사용
+    captured = get_captured_record(driver, category, an)
+    if use_payload and captured is not None and payload_verified(category):
+        return payload_record(category, captured)
+
+    open_detail()
+    if captured is None:
+        captured = get_captured_record(driver, category, an)
+    archive_detail_snapshot(driver, category, an)
+    record = dom_extract()
+    if use_payload and captured is not None:
+        verify_payload(category, an, record, captured)
+        # 응답 레코드로 만든 카드와 같은 필드만 적재되도록 서지정보 필드로만 보완
+        captured = payload_record(category, captured)
+    return fill_bibliography(record, captured)
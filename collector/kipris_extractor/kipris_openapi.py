@@ -0,0 +1,135 @@
+import os
+import xml.etree.ElementTree as ET
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from collector.kipris_extractor.kipris_network import *
+
+"""
+KIPRIS Plus Open API(REST/XML) 수집 함수들
+브라우저 없이 출원인(사업자번호)으로 서지정보를 페이지 단위로 받아오고,
+응답 XML은 item 단위로 iterparse해서 한 건씩 흘려보낸다.
+필드명은 상세화면 추출(kipris_*_extractor) / XHR 매핑(PAYLOAD_FIELD_MAPPING)과 같다.
+"""
+
+# 로컬 대체 서버로 바꿀 수 있도록 환경변수로 설정
+KIPRIS_API_URL = os.getenv("KIPRIS_API_URL", "http://plus.kipris.or.kr/kipo-api/kipi")
+KIPRIS_API_KEY = os.getenv("KIPRIS_API_KEY")
+
+# 한 번에 요청하는 건수 (KIPRIS Plus 최대 500)
+API_PAGE_SIZE = int(os.getenv("KIPRIS_API_PAGE_SIZE", "500"))
+API_TIMEOUT = 30
+
+# 체크포인트 정렬 기준 : 출원일자 내림차순 (화면 수집의 체크포인트와 섞이지 않도록 구분)
+API_SORT_ORDER = "API:출원일자"
+
+# category -> 서비스 경로, 출원인 파라미터명, 고정 파라미터, 필드 매핑(PAYLOAD_FIELD_MAPPING 키)
+API_SERVICES = {
+    "patent": {
+        "path": "patUtiModInfoSearchSevice/getAdvancedSearch",
+        "applicant_param": "applicant",
+        "params": {"patent": "true", "utility": "false"},
+        "mapping": "patent",
+    },
+    "utility": {
+        "path": "patUtiModInfoSearchSevice/getAdvancedSearch",
+        "applicant_param": "applicant",
+        "params": {"patent": "false", "utility": "true"},
+        "mapping": "patent",
+    },
+    "design": {
+        "path": "designInfoSearchService/getAdvancedSearch",
+        "applicant_param": "applicantName",
+        "params": {},
+        "mapping": "design",
+    },
+    "trademark": {
+        "path": "trademarkInfoSearchService/getAdvancedSearch",
+        "applicant_param": "applicantName",
+        "params": {},
+        "mapping": "trademark",
+    },
+}
+
+# 출원번호만 있으면 적재 (API는 상태/명칭이 비어 있는 건도 그대로 내려줌)
+API_REQUIRED_FIELDS = ["ApplicationNumber"]
+
+_session = None
+
+
+# 연결을 재사용하는 세션 (429/5xx는 어댑터에서 백오프 재시도)
+def get_api_session() -> requests.Session:
+    global _session
+    if _session is None:
+        retry = Retry(total=5, backoff_factor=1, status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=("GET",), respect_retry_after_header=True)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+        _session = requests.Session()
+        _session.mount("http://", adapter)
+        _session.mount("https://", adapter)
+    return _session
+
+
+class KiprisApiError(Exception):
+    pass
+
+
+def _item_to_dict(elem: ET.Element) -> dict:
+    return {child.tag: (child.text or "").strip() for child in elem}
+
+
+# 한 페이지를 요청해서 item을 하나씩 yield, 끝나면 meta에 totalCount를 채운다
+def iter_api_page(category: str, applicant: str, page_no: int, meta: dict):
+    service = API_SERVICES[category]
+    params = {
+        service["applicant_param"]: applicant,
+        "pageNo": page_no,
+        "numOfRows": API_PAGE_SIZE,
+        "sortSpec": "AD",
+        "descSort": "true",
+        "ServiceKey": KIPRIS_API_KEY,
+        **service["params"],
+    }
+    url = f"{KIPRIS_API_URL.rstrip('/')}/{service['path']}"
+
+    with get_api_session().get(url, params=params, timeout=API_TIMEOUT, stream=True) as response:
+        response.raise_for_status()
+        response.raw.decode_content = True
+
+        for event, elem in ET.iterparse(response.raw, events=("end",)):
+            if elem.tag == "item":
+                yield _item_to_dict(elem)
+                elem.clear()
+            elif elem.tag == "totalCount":
+                meta["total"] = int(elem.text or 0)
+            elif elem.tag == "resultCode":
+                meta["result_code"] = (elem.text or "").strip()
+            elif elem.tag == "resultMsg":
+                meta["result_msg"] = (elem.text or "").strip()
+
+    # 정상 응답 코드는 "00" (코드가 없으면 정상으로 간주)
+    if meta.get("result_code") not in (None, "", "00"):
+        raise KiprisApiError(f"{category} {page_no}페이지 : {meta.get('result_code')} {meta.get('result_msg')}")
+
+
+# 출원인의 서지정보를 출원일자 최신순으로 (page_no, record) 단위로 yield
+# start_page : 체크포인트에서 이어서 수집할 페이지
+def iter_api_records(category: str, applicant: str, start_page: int = 1):
+    mapping = API_SERVICES[category]["mapping"]
+    page_no = start_page
+    while True:
+        meta = {}
+        count = 0
+        for item in iter_api_page(category, applicant, page_no, meta):
+            count += 1
+            record = map_payload_item(mapping, item, API_REQUIRED_FIELDS)
+            if record is None:
+                print(f"iter_api_records {category} : 출원번호 없는 항목 제외 {item}")
+                continue
+            yield page_no, record
+
+        total = meta.get("total", 0)
+        if count == 0 or page_no * API_PAGE_SIZE >= total:
+            return
+        page_no += 1
+
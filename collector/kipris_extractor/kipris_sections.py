@@ -0,0 +1,89 @@
+import traceback
+from collector.kipris_extractor.kipris_utils import *
+from db.mysql import insert_error_log
+
+"""
+상세정보 섹션 디스패치
+수집기는 섹션 테이블(섹션 키, 제목 키워드, 추출 함수)만 선언하고,
+섹션 제목 -> 추출 함수 매칭은 키워드를 미리 정규화해 둔 SectionDispatcher가 담당한다.
+한 번 매칭한 제목은 dict에 저장해서 카드마다 다시 비교하지 않고,
+테이블에 없는 섹션 제목은 실행 중 한 번만 출력한다.
+
+섹션 테이블 항목
+key : 섹션 키 (KIPRIS_SECTIONS 선택 단위)
+keywords : 제목 키워드
+match : contains(제목에 키워드 포함, 기본) 또는 exact(제목이 키워드와 같음)
+extract : 추출 함수
+pass_title : True면 extract(section, title)로 호출
+repeatable : True면 같은 키의 섹션이 여러 개 (처리해도 완료로 보지 않음)
+"""
+
+
+class SectionDispatcher:
+    # name : 오류 로그용 이름, data_type : mysql 로그용 데이터 타입
+    # skip_repeats : 두 번째로 나온 섹션은 건너뛸 제목
+    def __init__(self, name: str, data_type: str, table: list, skip_repeats: tuple = ()):
+        self.name = name
+        self.data_type = data_type
+        self.entries = []
+        for entry in table:
+            entry = dict(entry)
+            entry["keywords"] = tuple(normalize_title(k) for k in entry["keywords"])
+            entry.setdefault("match", "contains")
+            self.entries.append(entry)
+        self.keys = {entry["key"] for entry in self.entries}
+        self.skip_repeats = {normalize_title(t) for t in skip_repeats}
+        # 정규화된 제목 -> 항목 (매칭되지 않으면 None)
+        self._resolved = {}
+        self._unknown = set()
+
+    def _match(self, title: str) -> dict | None:
+        for entry in self.entries:
+            if entry["match"] == "exact":
+                if title in entry["keywords"]:
+                    return entry
+            elif any(k in title for k in entry["keywords"]):
+                return entry
+        return None
+
+    # 정규화된 제목에 해당하는 항목 (테이블 순서대로 처음 매칭된 항목)
+    def resolve(self, title: str) -> dict | None:
+        try:
+            return self._resolved[title]
+        except KeyError:
+            entry = self._resolved[title] = self._match(title)
+            if entry is None and title not in self._unknown:
+                self._unknown.add(title)
+                print(f"[SECTION] {self.name} : 처리하지 않는 섹션 '{title}'")
+            return entry
+
+    # 상세정보 섹션들을 순서대로 추출해서 info_dict에 채움
+    def extract(self, section_blocks: list, info_dict: dict) -> dict:
+        done = set()
+        title_count = {}
+        for section_block in section_blocks:
+            # 선택된 섹션을 모두 추출했으면 나머지 섹션은 읽지 않음
+            if sections_done(done, self.keys):
+                break
+            title = ""
+            try:
+                title = get_section_title(section_block)
+                if not title:
+                    continue
+
+                title_count[title] = title_count.get(title, 0) + 1
+                if title in self.skip_repeats and title_count[title] == 2:
+                    continue
+
+                entry = self.resolve(title)
+                if entry is None:
+                    continue
+                if section_selected(entry["key"]):
+                    args = (section_block, title) if entry.get("pass_title") else (section_block,)
+                    info_dict.update(run_extractor(title, entry["extract"], *args))
+                if not entry.get("repeatable"):
+                    done.add(entry["key"])
+            except Exception as e:
+                error_detail = traceback.format_exc()
+                insert_error_log(self.name, self.data_type, f"{title} 처리중 에러 발생 : {e}", error_detail)
+        return info_dict
@@ -0,0 +1,140 @@
+import os
+import re
+import json
+from bs4 import BeautifulSoup, NavigableString, Tag
+from selenium.common.exceptions import NoSuchElementException, InvalidSelectorException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webdriver import WebDriver
+
+"""
+저장된 상세정보(#mainResultDetail) HTML 스냅샷 관련 함수들
+- KIPRIS_SNAPSHOT_DIR이 설정되면 수집 중 상세정보 HTML을 {category}_{출원번호}.html로 저장
+- XHR 백엔드에서 매핑된 응답 항목은 {category}_{출원번호}.json으로 저장 (응답 매핑 확인용)
+- SnapshotElement : 저장된 HTML을 WebElement처럼 다루는 BeautifulSoup 어댑터
+  (추출 함수가 쓰는 find_element(s), text, get_attribute만 지원)
+"""
+
+SNAPSHOT_DIR = os.getenv("KIPRIS_SNAPSHOT_DIR")
+
+# innerText에서 줄을 바꾸는 태그
+BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "dd", "details", "div", "dl", "dt", "fieldset", "figcaption",
+    "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li", "main", "nav", "ol",
+    "p", "pre", "section", "summary", "table", "tbody", "thead", "tfoot", "tr", "ul",
+}
+# innerText에 포함하지 않는 태그
+HIDDEN_TAGS = {"script", "style", "noscript", "template"}
+
+
+# 현재 열려 있는 상세정보 HTML을 저장 (KIPRIS_SNAPSHOT_DIR이 없으면 저장하지 않음)
+def archive_detail_snapshot(driver: WebDriver, category: str, an: str):
+    if not SNAPSHOT_DIR:
+        return
+    try:
+        html = driver.execute_script(
+            "const el = document.getElementById('mainResultDetail'); return el ? el.outerHTML : null;"
+        )
+        if not html:
+            return
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        file_name = f"{category}_{re.sub(r'[^0-9A-Za-z]', '', an)}.html"
+        with open(os.path.join(SNAPSHOT_DIR, file_name), "w", encoding="utf-8") as f:
+            f.write(html)
+    except Exception as e:
+        print("archive_detail_snapshot : ", e)
+
+
+# 매핑된 XHR 응답 항목을 저장 (KIPRIS_SNAPSHOT_DIR이 없으면 저장하지 않음)
+def archive_payload_snapshot(category: str, an: str, item: dict):
+    if not SNAPSHOT_DIR:
+        return
+    try:
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        file_name = f"{category}_{re.sub(r'[^0-9A-Za-z]', '', an)}.json"
+        with open(os.path.join(SNAPSHOT_DIR, file_name), "w", encoding="utf-8") as f:
+            json.dump(item, f, ensure_ascii=False, indent=2)
+    except Exception as e:
+        print("archive_payload_snapshot : ", e)
+
+
+def _inner_text(node, parts: list):
+    for child in node.children:
+        if isinstance(child, NavigableString):
+            if type(child) is NavigableString:
+                parts.append(re.sub(r"\s+", " ", child))
+            continue
+        if not isinstance(child, Tag) or child.name in HIDDEN_TAGS:
+            continue
+        if child.name == "br":
+            parts.append("\n")
+            continue
+        block = child.name in BLOCK_TAGS
+        if block:
+            parts.append("\n")
+        _inner_text(child, parts)
+        if child.name in ("td", "th"):
+            parts.append("\t")
+        if block:
+            parts.append("\n")
+
+
+class SnapshotElement:
+    def __init__(self, tag: Tag):
+        self._tag = tag
+
+    @property
+    def tag_name(self) -> str:
+        return self._tag.name
+
+    # 렌더링된 innerText에 가깝게 : 블록 태그는 줄바꿈, 줄마다 앞뒤 공백 제거
+    @property
+    def text(self) -> str:
+        parts = []
+        _inner_text(self._tag, parts)
+        lines = [" ".join(line.split()) for line in "".join(parts).split("\n")]
+        return "\n".join(line for line in lines if line)
+
+    def get_attribute(self, name: str) -> str | None:
+        if name == "innerText":
+            return self.text
+        if name == "textContent":
+            return self._tag.get_text()
+        if name == "innerHTML":
+            return self._tag.decode_contents()
+        if name == "outerHTML":
+            return str(self._tag)
+        value = self._tag.get(name)
+        if isinstance(value, list):
+            return " ".join(value)
+        return value
+
+    def is_displayed(self) -> bool:
+        return True
+
+    def find_elements(self, by: str = By.ID, value: str | None = None) -> list:
+        if by == By.CSS_SELECTOR:
+            tags = self._tag.select(value)
+        elif by == By.TAG_NAME:
+            tags = self._tag.find_all(value)
+        elif by == By.CLASS_NAME:
+            tags = self._tag.find_all(class_=value)
+        elif by == By.ID:
+            tags = self._tag.find_all(id=value)
+        elif by == By.NAME:
+            tags = self._tag.find_all(attrs={"name": value})
+        else:
+            raise InvalidSelectorException(f"SnapshotElement에서 지원하지 않는 locator : {by}")
+        return [SnapshotElement(tag) for tag in tags]
+
+    def find_element(self, by: str = By.ID, value: str | None = None) -> "SnapshotElement":
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(f"{by}={value}")
+        return elements[0]
+
+
+# 스냅샷 파일을 읽어 #mainResultDetail 요소 반환 (없으면 문서 전체)
+def load_snapshot(path: str) -> SnapshotElement:
+    with open(path, "r", encoding="utf-8") as f:
+        soup = BeautifulSoup(f.read(), "html.parser")
+    return SnapshotElement(soup.find(id="mainResultDetail") or soup)
@@ -0,0 +1,189 @@
+import os
+import time
+from collections import deque
+from collector.kipris_extractor.kipris_utils import *
+
+"""
+한 브라우저에서 여러 탭으로 상세정보를 파이프라인 처리하는 함수들
+탭마다 출원번호 하나를 맡아 (검색화면 로드 -> 출원번호 검색 -> 상세정보 열기 -> 추출) 단계를 진행하고,
+한 탭을 추출하는 동안 다른 탭들의 페이지/XHR 로딩이 계속 진행된다.
+결과는 출원번호 목록 순서대로 다시 정렬해서 내보낸다.
+앞 순서의 출원번호가 재시도 중이면 뒤 순서 결과가 쌓이므로, 내보내지 못한 결과가 TAB_BUFFER건을 넘으면
+새 출원번호를 탭에 배정하지 않고 기다린다.
+"""
+
+# 브라우저당 탭 수 (1이면 파이프라인을 쓰지 않고 한 건씩 처리)
+TAB_COUNT = int(os.getenv("KIPRIS_TABS", "1"))
+
+# 내보낼 순서보다 이만큼 앞선 출원번호는 배정하지 않음 (순서 정렬 대기 결과의 최대 건수)
+TAB_BUFFER = int(os.getenv("KIPRIS_TAB_BUFFER", "30"))
+
+# 한 단계가 이 시간 안에 준비되지 않으면 실패로 보고 재시도
+STAGE_TIMEOUT = WAIT_TIMEOUT
+
+# 탭 단계
+STAGE_START = "start"
+STAGE_SEARCH_PAGE = "search_page"
+STAGE_SEARCHING = "searching"
+STAGE_DETAIL = "detail"
+
+
+# 새 탭을 열고 훅/리소스 차단/네트워크 캡처를 탭 단위로 다시 설정 (CDP 설정은 탭마다 적용됨)
+def open_tab(driver: WebDriver) -> str:
+    driver.switch_to.new_window("tab")
+    register_ready_hooks(driver)
+    if LEAN_BROWSER:
+        block_heavy_resources(driver)
+    if KIPRIS_BACKEND == "xhr":
+        start_network_capture(driver)
+    return driver.current_window_handle
+
+
+def _set_stage(task: dict, stage: str):
+    task["stage"] = stage
+    task["since"] = time.perf_counter()
+
+
+# 현재 탭(task)의 단계를 한 칸 진행 (준비가 안 됐으면 바로 반환)
+# 추출까지 끝나면 레코드를 반환, 단계 시간 초과 시 예외
+def step_tab(driver: WebDriver, tab: str, task: dict, extract) -> dict | None:
+    stage = task["stage"]
+
+    if stage == STAGE_START:
+        # 이전 문서에 표시를 남겨서 새 문서가 로드되기 전의 화면을 준비 완료로 오인하지 않음
+        driver.execute_script("window.__kiprisStale = true; window.location.href = arguments[0];",
+                              f"{SEARCH_URL}?tab={tab}")
+        _set_stage(task, STAGE_SEARCH_PAGE)
+        return None
+
+    if time.perf_counter() - task["since"] > STAGE_TIMEOUT:
+        raise Exception(f"{stage} 단계 시간 초과")
+
+    if stage == STAGE_SEARCH_PAGE:
+        if driver.execute_script("return !!window.__kiprisStale;"):
+            return None
+        if not driver.find_elements(By.ID, "modalSearchDetail") or not is_page_idle(driver):
+            return None
+        search_box = driver.find_element(By.CSS_SELECTOR, MAIN_SEARCH_INPUT)
+        driver.execute_script("arguments[0].value = arguments[1];", search_box, f"AN=[{task['an'].strip()}]")
+        search_box.send_keys(Keys.ENTER)
+        _set_stage(task, STAGE_SEARCHING)
+        return None
+
+    if stage == STAGE_SEARCHING:
+        if not is_page_idle(driver):
+            return None
+        count = driver.find_element(By.ID, f"{tab}TotalCount").text.strip().replace(",", "")
+        if not count.isdigit():
+            return None
+        if int(count) == 0:
+            raise Exception(f"출원번호 검색 결과 없음 : {task['an']}")
+        buttons = driver.find_elements(By.CSS_SELECTOR, "#resultSection article.result-item button.link.under")
+        if not buttons:
+            return None
+        js_click(driver, buttons[0])
+        _set_stage(task, STAGE_DETAIL)
+        return None
+
+    if stage == STAGE_DETAIL:
+        if not driver.find_elements(By.CSS_SELECTOR, "#mainResultDetail .tab-section-01") or not is_page_idle(driver):
+            return None
+        # 상세정보는 이미 열려 있으므로 open_detail은 아무것도 하지 않음
+        return extract_record(driver, tab, task["an"], lambda: None, lambda: extract(driver))
+
+    raise Exception(f"알 수 없는 단계 : {stage}")
+
+
+# 출원번호 목록을 tab_count개 탭에 나눠 파이프라인으로 처리하고 (an, record)를 목록 순서대로 yield
+# 실패한 출원번호는 retries회 재시도 후 record=None
+def iter_records_in_tabs(driver: WebDriver, tab: str, ans: list, extract, tab_count: int = TAB_COUNT,
+                         retries: int = DETAIL_RETRY):
+    if not ans:
+        return
+
+    origin = driver.current_window_handle
+    handles = [origin]
+    queue = deque(enumerate(ans))
+    tasks = {}
+    results = {}
+    # 결과가 쌓여서 배정을 멈춘 탭
+    idle = []
+    next_index = 0
+
+    def assign(handle: str):
+        if not queue:
+            tasks.pop(handle, None)
+            return
+        if queue[0][0] - next_index >= TAB_BUFFER:
+            # 앞 순서 결과가 나올 때까지 대기 (앞 순서 출원번호는 다른 탭에서 처리 중)
+            tasks.pop(handle, None)
+            idle.append(handle)
+            return
+        index, an = queue.popleft()
+        tasks[handle] = {"index": index, "an": an, "attempt": 0}
+        _set_stage(tasks[handle], STAGE_START)
+
+    try:
+        for _ in range(min(tab_count, len(ans)) - 1):
+            handles.append(open_tab(driver))
+        for handle in handles:
+            assign(handle)
+
+        while tasks:
+            progressed = False
+            for handle in list(tasks):
+                task = tasks[handle]
+                stage = task["stage"]
+                driver.switch_to.window(handle)
+                try:
+                    record = step_tab(driver, tab, task, extract)
+                except Exception as e:
+                    print(f"iter_records_in_tabs {task['an']} ({task['attempt'] + 1}/{retries + 1}) : ", e)
+                    task["attempt"] += 1
+                    if task["attempt"] > retries:
+                        results[task["index"]] = None
+                        assign(handle)
+                    else:
+                        _set_stage(task, STAGE_START)
+                    progressed = True
+                    continue
+
+                if record is not None:
+                    results[task["index"]] = record
+                    assign(handle)
+                    progressed = True
+                elif task["stage"] != stage:
+                    progressed = True
+
+            # 앞 순서의 결과가 모두 모였으면 순서대로 내보냄
+            while next_index in results:
+                yield ans[next_index], results.pop(next_index)
+                next_index += 1
+            # 결과를 내보냈으면 대기 중인 탭에 다시 배정
+            for handle in [idle.pop() for _ in range(len(idle))]:
+                assign(handle)
+
+            if not progressed:
+                time.sleep(POLL_FREQUENCY)
+
+        while next_index in results:
+            yield ans[next_index], results.pop(next_index)
+            next_index += 1
+    finally:
+        for handle in handles[1:]:
+            try:
+                driver.switch_to.window(handle)
+                driver.close()
+            except Exception as e:
+                print("iter_records_in_tabs close tab : ", e)
+        driver.switch_to.window(origin)
+
+
+# 탭이 1개면 한 건씩(fetch_by_an), 여러 개면 탭 파이프라인으로 (an, record)를 목록 순서대로 yield
+def iter_records_by_an(driver: WebDriver, tab: str, ans: list, extract, tab_count: int = TAB_COUNT,
+                       retries: int = DETAIL_RETRY):
+    if tab_count > 1:
+        yield from iter_records_in_tabs(driver, tab, ans, extract, tab_count, retries)
+        return
+    for an in ans:
+        yield an, fetch_by_an(driver, tab, an, extract, retries)
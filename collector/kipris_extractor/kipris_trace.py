@@ -0,0 +1,166 @@
+import os
+import time
+import threading
+from contextlib import contextmanager
+from selenium.webdriver.remote.webdriver import WebDriver
+
+"""
+WebDriver 왕복(command) 계측
+driver.execute를 감싸서 모든 WebDriver 명령(요소 명령 포함)의 횟수와 소요 시간을
+현재 열린 범위(section / extractor)마다 누적하고 실행이 끝나면 요약을 출력한다.
+카드는 한 건씩 따로 재서 카테고리별 카드당 분포(건수, 평균, 최대, 가장 느린 출원번호)로 요약한다.
+"""
+
+TRACE_WEBDRIVER = os.getenv("KIPRIS_TRACE_WEBDRIVER", "1") == "1"
+
+# (kind, name) -> {"count": 범위 진입 횟수, "commands": 명령 수, "command_time": 명령 시간, "wall": 범위 전체 시간}
+# kind : section(섹션 제목), extractor(추출 함수), command(명령 이름)
+DRIVER_STATS = {}
+
+# category -> 카드당 분포 {"count", "commands", "command_time", "wall",
+#                          "max_commands", "max_command_time", "max_wall", "slowest_an"}
+CARD_STATS = {}
+
+_local = threading.local()
+_stats_lock = threading.Lock()
+
+
+def _scopes() -> list:
+    if not hasattr(_local, "scopes"):
+        _local.scopes = []
+    return _local.scopes
+
+
+def _get_stat(key: tuple) -> dict:
+    stat = DRIVER_STATS.get(key)
+    if stat is None:
+        stat = DRIVER_STATS.setdefault(key, {"count": 0, "commands": 0, "command_time": 0.0, "wall": 0.0})
+    return stat
+
+
+# 드라이버의 모든 명령을 계측 (여러 번 호출해도 한 번만 감쌈)
+def instrument_driver(driver: WebDriver) -> WebDriver:
+    if not TRACE_WEBDRIVER or getattr(driver, "_kipris_traced", False):
+        return driver
+    execute = driver.execute
+
+    def traced_execute(driver_command, params=None):
+        start = time.perf_counter()
+        try:
+            return execute(driver_command, params)
+        finally:
+            elapsed = time.perf_counter() - start
+            keys = [("command", driver_command)] + _scopes()
+            # 현재 카드의 명령은 스레드별 카드 누적값에 더함 (다른 스레드의 카드와 섞이지 않음)
+            card = getattr(_local, "card", None)
+            if card is not None:
+                card["commands"] += 1
+                card["command_time"] += elapsed
+            with _stats_lock:
+                for key in keys:
+                    stat = _get_stat(key)
+                    stat["commands"] += 1
+                    stat["command_time"] += elapsed
+
+    driver.execute = traced_execute
+    driver._kipris_traced = True
+    return driver
+
+
+# with trace_scope("section", title): 범위 안에서 실행된 명령을 (kind, name)에 누적
+@contextmanager
+def trace_scope(kind: str, name: str | None):
+    key = (kind, name or "")
+    scopes = _scopes()
+    scopes.append(key)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        scopes.pop()
+        with _stats_lock:
+            stat = _get_stat(key)
+            stat["count"] += 1
+            stat["wall"] += time.perf_counter() - start
+
+
+def _add_card(category: str, an: str, commands: int, command_time: float, wall: float):
+    stat = CARD_STATS.get(category)
+    if stat is None:
+        stat = CARD_STATS[category] = {"count": 0, "commands": 0, "command_time": 0.0, "wall": 0.0,
+                                       "max_commands": 0, "max_command_time": 0.0, "max_wall": 0.0,
+                                       "slowest_an": None}
+    stat["count"] += 1
+    stat["commands"] += commands
+    stat["command_time"] += command_time
+    stat["wall"] += wall
+    stat["max_commands"] = max(stat["max_commands"], commands)
+    stat["max_command_time"] = max(stat["max_command_time"], command_time)
+    if wall >= stat["max_wall"]:
+        stat["max_wall"] = wall
+        stat["slowest_an"] = an
+
+
+# with trace_card(category, an): 카드 한 건의 명령 수/명령 시간/전체 시간을 따로 재서 카드당 분포에 추가
+@contextmanager
+def trace_card(category: str, an: str):
+    card = {"commands": 0, "command_time": 0.0}
+    previous = getattr(_local, "card", None)
+    _local.card = card
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        wall = time.perf_counter() - start
+        _local.card = previous
+        with _stats_lock:
+            _add_card(category, an, card["commands"], card["command_time"], wall)
+
+
+# 추출 함수를 section(섹션 제목) / extractor(함수 이름) 범위로 감싸서 실행
+def run_extractor(title: str | None, extractor, *args):
+    with trace_scope("section", title), trace_scope("extractor", extractor.__name__):
+        return extractor(*args)
+
+
+def get_driver_summary() -> dict:
+    summary = {}
+    with _stats_lock:
+        for (kind, name), stat in DRIVER_STATS.items():
+            count = stat["count"] or 1
+            summary.setdefault(kind, {})[name] = {
+                "count": stat["count"],
+                "commands": stat["commands"],
+                "commands_per_call": round(stat["commands"] / count, 1),
+                "command_time": round(stat["command_time"], 3),
+                "wall": round(stat["wall"], 3),
+            }
+        for category, stat in CARD_STATS.items():
+            count = stat["count"] or 1
+            summary.setdefault("card", {})[category] = {
+                "count": stat["count"],
+                "mean_commands": round(stat["commands"] / count, 1),
+                "max_commands": stat["max_commands"],
+                "mean_command_time": round(stat["command_time"] / count, 3),
+                "max_command_time": round(stat["max_command_time"], 3),
+                "mean_wall": round(stat["wall"] / count, 3),
+                "max_wall": round(stat["max_wall"], 3),
+                "slowest_an": stat["slowest_an"],
+            }
+    return summary
+
+
+def print_driver_summary():
+    summary = get_driver_summary()
+    for category, stat in sorted(summary.get("card", {}).items()):
+        print(f"[DRIVER] card {category} : {stat['count']}건, 카드당 명령 평균 {stat['mean_commands']}개"
+              f"(최대 {stat['max_commands']}개), 명령 시간 평균 {stat['mean_command_time']}초"
+              f"(최대 {stat['max_command_time']}초), 전체 평균 {stat['mean_wall']}초"
+              f"(최대 {stat['max_wall']}초, {stat['slowest_an']})")
+    for kind in ("section", "extractor"):
+        for name, stat in sorted(summary.get(kind, {}).items(), key=lambda item: -item[1]["command_time"]):
+            print(f"[DRIVER] {kind} {name} : {stat['count']}회, 명령 {stat['commands']}개"
+                  f"(회당 {stat['commands_per_call']}개), 명령 시간 {stat['command_time']}초, 전체 {stat['wall']}초")
+    commands = sorted(summary.get("command", {}).items(), key=lambda item: -item[1]["command_time"])
+    for name, stat in commands[:10]:
+        print(f"[DRIVER] command {name} : {stat['commands']}개, {stat['command_time']}초")
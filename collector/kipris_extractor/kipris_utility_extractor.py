@@ -71,7 +71,7 @@ def extract_patent_bibliography(info_div):
                     td_list = td_text.split(" ")
                     date_str = td_list[1]
                     cleand = date_str.strip("()")
-                    date = datetime.strptime(cleand, "%Y.%m.%d").strftime("%Y-%m-%d")
+                    date = dotted_to_iso(cleand)
                     bib[field_name[0]] = td_list[0]
                     bib[field_name[1]] = date
                 else:
@@ -162,7 +162,7 @@ def extract_citations(info_div):
                 field_name = mapping_table[header]
                 if header == "공보일자" or header == "출원 연월일":
                     date = text_without_em(td)
-                    date = datetime.strptime(date, "%Y.%m.%d").strftime("%Y-%m-%d")
+                    date = dotted_to_iso(date)
                     row[field_name] = date
                 elif header == "IPC":
                     ipc = text_without_em(td).replace(" ", "")
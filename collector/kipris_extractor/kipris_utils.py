@@ -1,5 +1,8 @@
+import os
 import re
+import functools
 from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
 import undetected_chromedriver as uc
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.remote.webdriver import WebElement
@@ -7,6 +10,10 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from httpcore import TimeoutException
 from datetime import datetime
+from collector.date_utils import dotted_to_iso
+from collector.kipris_extractor.kipris_wait import *
+from collector.kipris_extractor.kipris_network import *
+from collector.kipris_extractor.kipris_trace import *
 
 """
 kipris_extractor에 사용되는 기본 유틸 함수들
@@ -41,13 +48,15 @@ def text_without_em(td_el) -> str:
 def js_click(driver:WebDriver, el:WebElement):
     driver.execute_script("arguments[0].click();", el)
 
-# 제목 정규화
+# 제목 정규화 : 모든 공백과 특수문자 제거(한글/영문/숫자/슬래시만 남김)
+# 섹션 제목은 종류가 적으므로 결과를 캐시
+TITLE_STRIP_RE = re.compile(r"[^0-9A-Za-z가-힣/]+")
+
+@functools.lru_cache(maxsize=1024)
 def normalize_title(s: str) -> str:
     if not s:
         return ""
-    s = re.sub(r"\s+", "", s)                    # 모든 공백 제거
-    s = re.sub(r"[^0-9A-Za-z가-힣/]", "", s)      # 특수문자 제거(한글/영문/숫자/슬래시)
-    return s.lower()
+    return TITLE_STRIP_RE.sub("", s).lower()
 
 # 제목 포함 여부
 def title_contains(norm_title: str, *keywords: str) -> bool:
@@ -57,17 +66,84 @@ def title_contains(norm_title: str, *keywords: str) -> bool:
 def get_section_title(section: WebElement) -> str | None:
     """section 내부에서 h4 또는 h5 제목을 찾아 정규화 후 반환"""
     try:
-        elem = section.find_element(By.CSS_SELECTOR, ".title-box h4.title, .title-box h5.title")
-        title = (elem.text or "").strip()
+        with trace_scope("extractor", "get_section_title"):
+            elem = section.find_element(By.CSS_SELECTOR, ".title-box h4.title, .title-box h5.title")
+            title = (elem.text or "").strip()
         return normalize_title(title) if title else None
     except Exception:
         return None
 
+"""
+상세정보 섹션 선택
+full : 모든 섹션 (주간 전체 수집), bibliography : 서지정보만 (일일 증분 수집)
+또는 "bibliography,people" 처럼 섹션 키를 나열
+섹션 키 : bibliography, people, citations, family, rnd, vienna
+"""
+SECTION_PRESETS = {
+    "full": None,
+    "bibliography": {"bibliography"},
+}
+# None이면 모든 섹션 추출
+SELECTED_SECTIONS = None
+
+def set_selected_sections(value: str | None):
+    global SELECTED_SECTIONS
+    value = (value or "full").strip()
+    if value in SECTION_PRESETS:
+        SELECTED_SECTIONS = SECTION_PRESETS[value]
+    else:
+        SELECTED_SECTIONS = {v.strip() for v in value.split(",") if v.strip()}
+
+def section_selected(key: str) -> bool:
+    return SELECTED_SECTIONS is None or key in SELECTED_SECTIONS
+
+# 선택된 섹션이 모두 keys 안에 있는지 (full이면 False)
+def sections_within(keys: set) -> bool:
+    return SELECTED_SECTIONS is not None and SELECTED_SECTIONS <= keys
+
+# 카테고리에 있는 섹션(available) 중 선택된 섹션을 모두 처리했는지 여부
+# True면 나머지 섹션은 제목도 읽지 않고 종료
+def sections_done(done: set, available: set) -> bool:
+    if SELECTED_SECTIONS is None:
+        return False
+    return (SELECTED_SECTIONS & available) <= done
+
+set_selected_sections(os.getenv("KIPRIS_SECTIONS", "full"))
+
 """
 웹 브라우저 조작 유틸 함수들
 """
+# lean 모드 : 추출에 쓰지 않는 리소스(이미지, 미디어, 폰트, 외부 분석 스크립트) 차단
+LEAN_BROWSER = os.getenv("KIPRIS_LEAN_BROWSER", "1") == "1"
+
+# Network.setBlockedURLs 패턴 (CSS는 클릭 가능 여부 판단에 레이아웃이 필요하므로 차단하지 않음)
+BLOCKED_URL_PATTERNS = [
+    # 이미지
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.bmp", "*.svg", "*.ico",
+    # 미디어
+    "*.mp4", "*.webm", "*.mp3", "*.wav", "*.avi",
+    # 폰트
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    # 외부 분석/광고 호스트
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*facebook.net*", "*facebook.com/tr*", "*wcs.naver.net*", "*wcs.naver.com*",
+    "*clarity.ms*", "*hotjar.com*",
+]
+
+# 콘텐츠 설정 prefs (2 = 차단)
+LEAN_PREFS = {
+    "profile.managed_default_content_settings.images": 2,
+    "profile.managed_default_content_settings.media_stream": 2,
+    "profile.default_content_setting_values.notifications": 2,
+    "profile.default_content_setting_values.geolocation": 2,
+}
+
 # kipris 접속 함수
-def open_browser(category: str) -> WebDriver:
+# driver_executable_path : 패치된 chromedriver 경로 (없으면 매번 다운로드/패치)
+# user_data_dir : 재사용할 브라우저 프로필 경로, debug_port : None이면 빈 포트 자동 할당
+def open_browser(category: str, lean: bool = False, capture_network: bool = False,
+                 driver_executable_path: str | None = None, user_data_dir: str | None = None,
+                 debug_port: int | None = 9222) -> WebDriver:
     opts = uc.ChromeOptions()
     opts.add_argument("--headless=new")
 
@@ -76,7 +152,8 @@ def open_browser(category: str) -> WebDriver:
     opts.add_argument("--disable-dev-shm-usage")  # /dev/shm 공간 부족 방지
     opts.add_argument("--disable-gpu")  # GPU 없는 서버에서 필수
     opts.add_argument("--disable-software-rasterizer")
-    opts.add_argument("--remote-debugging-port=9222")  # 충돌 방지
+    if debug_port:
+        opts.add_argument(f"--remote-debugging-port={debug_port}")  # 충돌 방지
     opts.add_argument("--single-process")  # 일부 환경에서 안정성 증가
     opts.add_argument("--disable-infobars")
     opts.add_argument("--disable-extensions")
@@ -84,11 +161,34 @@ def open_browser(category: str) -> WebDriver:
     opts.add_argument("--start-maximized")
     opts.add_argument("--disable-popup-blocking")
 
-    driver = uc.Chrome(options=opts)
+    if lean:
+        opts.add_argument("--blink-settings=imagesEnabled=false")
+        opts.add_argument("--autoplay-policy=user-gesture-required")
+        opts.add_experimental_option("prefs", LEAN_PREFS)
+    if capture_network:
+        enable_performance_log(opts)
+
+    driver = uc.Chrome(options=opts, driver_executable_path=driver_executable_path, user_data_dir=user_data_dir)
+    # WebDriver 명령 횟수/시간 계측 (KIPRIS_TRACE_WEBDRIVER=0이면 계측하지 않음)
+    instrument_driver(driver)
+    # 이후 로드되는 모든 문서에 XHR/결과영역 변경 감지 훅 등록
+    register_ready_hooks(driver)
+    if lean:
+        block_heavy_resources(driver)
+    if capture_network:
+        start_network_capture(driver)
     driver.get(f"https://www.kipris.or.kr/khome/search/searchResult.do?tab={category}")
 
     return driver
 
+# CDP 네트워크 차단 설정 (브라우저 세션 단위로 유지됨)
+def block_heavy_resources(driver: WebDriver, patterns: list | None = None):
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns or BLOCKED_URL_PATTERNS})
+    except Exception as e:
+        print("block_heavy_resources : ", e)
+
 # 회사명으로 특허검색 (특허,실용신안)
 def search_by_ap(driver:WebDriver,btn:str, comp_name:str):
     try:
@@ -124,15 +224,15 @@ def sort_by_application_an(driver:WebDriver):
         }
         """)
 
-        # 함수 실행 
+        # 함수 실행 후 결과 영역이 다시 그려질 때까지 대기
+        before = get_mutation_count(driver)
         driver.execute_script("optionSearch();")
+        wait_for_result_update(driver, before, "sort")
     except Exception as e:
         raise
 
 # 건수를 구하는 함수
 def get_total_num(driver:WebDriver, category:str) -> int:
-    wait = WebDriverWait(driver, 10)
-
     """
     특허, 실용신안 : patent
     디자인 : design
@@ -141,8 +241,8 @@ def get_total_num(driver:WebDriver, category:str) -> int:
     기타문헌 : etc
     """
     try:
-        wait.until(lambda d: d.find_element(By.ID, f'{category}TotalCount').text.strip().isdigit())
-        nums = int(driver.find_element(By.ID, f'{category}TotalCount').text)
+        # 검색 요청이 끝나고 건수가 채워질 때까지 대기
+        nums = wait_for_total_count(driver, category)
     except Exception as e:
         raise
 
@@ -152,23 +252,141 @@ def get_total_num(driver:WebDriver, category:str) -> int:
 def go_next_page(driver: WebDriver):
     try:
         wait = WebDriverWait(driver, 10)
-        old_card = driver.find_element(By.CSS_SELECTOR, "article,result-item")
         btn_next = wait.until(
             EC.element_to_be_clickable((By.CSS_SELECTOR, '.btn-navi.next'))
         )
+        before = get_mutation_count(driver)
         btn_next.click()
 
-        wait.until(EC.staleness_of(old_card))
-
-        wait.until(
-            EC.presence_of_element_located((By.ID, 'resultSection'))
-        )
-        wait.until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR, 'button.link.under'))
-        )
+        # 결과 영역이 다시 그려지고 XHR이 끝날 때까지 대기
+        wait_for_result_update(driver, before, "next_page")
     except Exception as e:
         raise
 
+# 결과 목록 한 페이지당 건수 : 화면에서 고를 수 있는 값 중 이 값 이하의 최댓값으로 설정
+RESULTS_PER_PAGE = int(os.getenv("KIPRIS_RESULTS_PER_PAGE", "90"))
+DEFAULT_RESULTS_PER_PAGE = 30
+# 결과 영역의 페이지당 건수 선택(select) id
+RESULTS_PER_PAGE_SELECT = os.getenv("KIPRIS_RESULTS_PER_PAGE_SELECT", "sortCondition02")
+
+# 페이지당 건수 select의 옵션 중 요청 값 이하의 최댓값을 선택하고 선택된 건수를 반환
+# select가 없거나 옵션이 모두 건수(30, 60개 ...)가 아니면 0 (선택하지 않음)
+# 검색은 다시 실행하지 않으므로 이후 sort_by_application_an(optionSearch)에서 함께 적용된다
+RESULTS_PER_PAGE_SCRIPT = """
+const sel = document.getElementById(arguments[0]);
+const wanted = arguments[1];
+if (!sel || sel.tagName !== 'SELECT' || sel.options.length === 0) { return 0; }
+const sizes = Array.from(sel.options).map(function (o) {
+    const match = /^\\s*(\\d+)\\s*(개|건)?\\s*$/.exec(o.text);
+    return match ? parseInt(match[1], 10) : null;
+});
+if (sizes.some(function (size) { return size === null; })) { return 0; }
+let best = -1;
+for (let i = 0; i < sizes.length; i++) {
+    if (sizes[i] <= wanted && (best < 0 || sizes[i] > sizes[best])) { best = i; }
+}
+if (best < 0) { return 0; }
+sel.selectedIndex = best;
+sel.dispatchEvent(new Event('change'));
+return sizes[best];
+"""
+
+def set_results_per_page(driver: WebDriver, size: int = RESULTS_PER_PAGE) -> int:
+    try:
+        selected = driver.execute_script(RESULTS_PER_PAGE_SCRIPT, RESULTS_PER_PAGE_SELECT, size)
+    except Exception as e:
+        print("set_results_per_page : ", e)
+        selected = 0
+    return int(selected) if selected else DEFAULT_RESULTS_PER_PAGE
+
+# 검색 후 1페이지에 표시된 카드 수로 페이지당 건수 확인
+# 카드 수가 min(page_size, total)과 다르면 건수 변경이 적용되지 않은 것으로 보고 기본 건수 사용
+# (페이지당 건수가 실제보다 크면 페이지 수가 작게 계산되어 뒤 페이지를 수집하지 못함)
+def verify_results_per_page(driver: WebDriver, page_size: int, total: int) -> int:
+    if page_size == DEFAULT_RESULTS_PER_PAGE:
+        return page_size
+    card_count = len(driver.find_elements(By.CSS_SELECTOR, "#resultSection article.result-item"))
+    if card_count == min(page_size, total):
+        return page_size
+    print(f"[WARN] 페이지당 건수 {page_size} 적용 안 됨 (1페이지 {card_count}건) → {DEFAULT_RESULTS_PER_PAGE}건으로 계산")
+    return DEFAULT_RESULTS_PER_PAGE
+
+# 전체 건수와 페이지당 건수로 정확한 페이지 수 계산 (30건이면 1페이지)
+def get_page_count(total: int, page_size: int) -> int:
+    return max(1, -(-total // page_size))
+
+# 페이지 번호로 바로 이동하는 스크립트 : 화면의 페이지 이동 함수 또는 페이지 번호 버튼을 사용
+GO_TO_PAGE_SCRIPT = """
+const page = arguments[0];
+for (const name of ['goPage', 'movePage', 'fnGoPage', 'goSearchPage']) {
+    if (typeof window[name] === 'function') { window[name](page); return true; }
+}
+const buttons = document.querySelectorAll('.pagination a, .pagination button, .paging a, .paging button, .btn-navi-num');
+for (const btn of buttons) {
+    if ((btn.innerText || btn.textContent || '').trim() === String(page)) { btn.click(); return true; }
+}
+return false;
+"""
+
+# 페이지 목록에서 현재 페이지 번호 요소 선택자 (화면이 바뀌면 환경변수로 변경)
+ACTIVE_PAGE_SELECTOR = os.getenv(
+    "KIPRIS_ACTIVE_PAGE_SELECTOR",
+    ".btn-navi-num.active, .btn-navi-num.on, .pagination .active, .pagination .on, .paging .active, "
+    ".paging .on, .paging strong, [aria-current='page']",
+)
+
+# 선택자에 맞는 요소 중 숫자만 있는 첫 요소의 번호 (없으면 null)
+ACTIVE_PAGE_SCRIPT = """
+for (const el of document.querySelectorAll(arguments[0])) {
+    const text = (el.innerText || el.textContent || '').trim();
+    if (/^\\d+$/.test(text)) { return parseInt(text, 10); }
+}
+return null;
+"""
+
+class PageNavigationError(Exception):
+    pass
+
+# 화면에 표시된 현재 페이지 번호 (읽지 못하면 None)
+def get_active_page(driver: WebDriver) -> int | None:
+    try:
+        page = driver.execute_script(ACTIVE_PAGE_SCRIPT, ACTIVE_PAGE_SELECTOR)
+    except Exception as e:
+        print("get_active_page : ", e)
+        return None
+    return int(page) if page else None
+
+# page_no 페이지로 바로 이동 (current_page : 현재 페이지)
+# 페이지 번호로 이동한 뒤에는 화면의 현재 페이지 번호를 읽어 확인하고,
+# 다른 페이지이면 그 페이지부터 "다음" 버튼으로 이동 (이미 지나쳤거나 번호를 읽을 수 없으면 PageNavigationError)
+# 페이지 번호로 이동할 수 없으면 "다음" 버튼으로 이동
+def go_to_page(driver: WebDriver, page_no: int, current_page: int):
+    if page_no == current_page:
+        return
+    if page_no == current_page + 1:
+        go_next_page(driver)
+        return
+
+    before = get_mutation_count(driver)
+    if driver.execute_script(GO_TO_PAGE_SCRIPT, page_no):
+        wait_for_result_update(driver, before, "go_to_page")
+        active = get_active_page(driver)
+        if active == page_no:
+            return
+        if active is None:
+            raise PageNavigationError(f"{page_no}페이지 이동 후 현재 페이지 번호를 확인할 수 없음")
+        print(f"[WARN] {page_no}페이지로 이동했지만 현재 {active}페이지 → 다음 버튼으로 이동")
+        current_page = active
+
+    if current_page > page_no:
+        raise PageNavigationError(f"{page_no}페이지로 이동할 수 없음 (현재 {current_page}페이지)")
+    while current_page < page_no:
+        go_next_page(driver)
+        current_page += 1
+    active = get_active_page(driver)
+    if active is not None and active != page_no:
+        raise PageNavigationError(f"{page_no}페이지로 이동하지 못함 (현재 {active}페이지)")
+
 # 검색 결과가 있으면 결과 리스트를 반환하는 함수
 def has_result(driver:WebDriver) -> tuple[bool,list]:
     wait = WebDriverWait(driver, 10)
@@ -212,6 +430,140 @@ def open_card(driver:WebDriver, card:WebElement):
         print("e : ", e)
         raise
 
+"""
+출원번호 기반 직접 이동 함수들
+결과 리스트에서 출원번호만 먼저 모은 뒤, 상세정보는 출원번호 검색으로 하나씩 직접 연다.
+리스트 위치와 무관하므로 실패한 건만 재시도할 수 있다.
+"""
+# list : 결과 리스트에서 카드를 차례로 클릭, direct : 출원번호 수집 후 상세정보 직접 열기
+NAVIGATION_MODE = os.getenv("KIPRIS_NAVIGATION_MODE", "list")
+DETAIL_RETRY = 2
+
+SEARCH_URL = "https://www.kipris.or.kr/khome/search/searchResult.do"
+# 메인 검색창 : KIPRIS 검색식(AN=[출원번호])을 입력
+MAIN_SEARCH_INPUT = "#inputQuery"
+
+# 결과 카드에서 출원번호 추출 ("1020200012345(2020.01.01)" -> "1020200012345")
+def get_card_an(card: WebElement, an_locator: tuple) -> str:
+    an_text = card.find_element(*an_locator).text.strip()
+    return re.sub(r'\((.*?)\)', "", an_text)
+
+# 결과 목록 한 페이지의 카드 메타데이터를 한 번의 execute_script로 읽는 스크립트
+# arguments[0] : 출원번호 요소 CSS 선택자
+CARD_METADATA_SCRIPT = """
+const anSelector = arguments[0];
+const textOf = function (card, selector) {
+    const el = card.querySelector(selector);
+    return el ? (el.innerText || el.textContent || '').trim() : null;
+};
+return Array.from(document.querySelectorAll('#resultSection article.result-item')).map(function (card, index) {
+    const anText = textOf(card, anSelector) || '';
+    const anDate = anText.match(/\\((.*?)\\)/);
+    return {
+        index: index,
+        an: anText.replace(/\\((.*?)\\)/g, '').trim(),
+        an_date: anDate ? anDate[1] : null,
+        title: textOf(card, 'button.link.under'),
+        status: textOf(card, '.status, .state, [class*="status"]'),
+        dates: (card.innerText || '').match(/\\d{4}\\.\\d{2}\\.\\d{2}/g) || []
+    };
+});
+"""
+
+# an_locator를 CSS 선택자로 변환 ((By.CLASS_NAME, "txt") -> ".txt")
+def locator_to_css(locator: tuple) -> str:
+    by, value = locator
+    if by == By.CLASS_NAME:
+        return f".{value}"
+    if by == By.ID:
+        return f"#{value}"
+    if by == By.CSS_SELECTOR:
+        return value
+    raise ValueError(f"CSS 선택자로 변환할 수 없는 locator : {locator}")
+
+def _to_iso_date(value: str | None) -> str | None:
+    if not value or not re.fullmatch(r"\d{4}\.\d{2}\.\d{2}", value.strip()):
+        return None
+    return value.strip().replace(".", "-")
+
+# 현재 결과 페이지의 모든 카드 메타데이터를 한 번에 수집 (카드마다 WebDriver 호출하지 않음)
+# 반환 : [{index, an, application_date, title, status, dates}] (index는 has_result 카드 순서)
+def harvest_page_metadata(driver: WebDriver, an_locator: tuple) -> list[dict]:
+    metas = driver.execute_script(CARD_METADATA_SCRIPT, locator_to_css(an_locator)) or []
+    if not metas:
+        # 결과 영역이 아직 그려지지 않았으면 카드가 나타날 때까지 기다린 뒤 한 번 더 읽음
+        has_result(driver)
+        metas = driver.execute_script(CARD_METADATA_SCRIPT, locator_to_css(an_locator)) or []
+    return [{
+        "index": meta["index"],
+        "an": meta["an"],
+        "application_date": _to_iso_date(meta.get("an_date")),
+        "title": meta.get("title"),
+        "status": meta.get("status"),
+        "dates": [_to_iso_date(d) for d in meta.get("dates") or []],
+    } for meta in metas]
+
+# 전체 결과 페이지를 돌며 출원번호만 수집 (페이지마다 메타데이터를 한 번에 읽음)
+# 반환 : ([(출원번호, 출원번호가 있던 결과 페이지 번호)], 중복을 만났는지)
+# is_dup : 출원번호를 받아 이미 적재된 건인지 반환하는 함수, 중복을 만나면 수집 중단
+# skip : 수집 목록에서 제외할 출원번호인지 반환하는 함수 (중단하지 않고 건너뜀)
+def harvest_application_numbers(driver: WebDriver, total_pages: int, an_locator: tuple,
+                                is_dup=None, skip=None) -> tuple[list, bool]:
+    ans = []
+    current_page = 1
+    while current_page <= total_pages:
+        for meta in harvest_page_metadata(driver, an_locator):
+            an = meta["an"]
+            if skip and skip(an):
+                continue
+            if is_dup and is_dup(an):
+                return ans, True
+            ans.append((an, current_page))
+        if current_page < total_pages:
+            go_next_page(driver)
+        current_page += 1
+    return ans, False
+
+# 출원번호로 검색해서 해당 건의 상세정보를 연다
+def open_detail_by_an(driver: WebDriver, tab: str, an: str):
+    driver.get(f"{SEARCH_URL}?tab={tab}")
+    wait_for_search_page(driver)
+
+    search_box = driver.find_element(By.CSS_SELECTOR, MAIN_SEARCH_INPUT)
+    driver.execute_script("arguments[0].value = arguments[1];", search_box, f"AN=[{an.strip()}]")
+    search_box.send_keys(Keys.ENTER)
+
+    if get_total_num(driver, tab) == 0:
+        raise Exception(f"출원번호 검색 결과 없음 : {an}")
+    has_result_flag, result_cards = has_result(driver)
+    open_card(driver, result_cards[0])
+
+# 출원번호 하나의 상세정보를 열어 extract(driver) 결과를 반환 (XHR 백엔드면 캡처된 응답으로 빈 서지정보 보완)
+# 실패하면 리스트 재탐색 없이 해당 출원번호만 retries회 재시도, 모두 실패하면 None
+def fetch_by_an(driver: WebDriver, tab: str, an: str, extract, retries: int = DETAIL_RETRY) -> dict | None:
+    for attempt in range(retries + 1):
+        try:
+            return extract_record(
+                driver, tab, an,
+                lambda: open_detail_by_an(driver, tab, an),
+                lambda: extract(driver)
+            )
+        except Exception as e:
+            print(f"fetch_by_an {an} ({attempt + 1}/{retries + 1}) : ", e)
+    return None
+
+# 출원번호 목록의 상세정보를 차례로 모은다
+def collect_by_an(driver: WebDriver, tab: str, ans: list, extract, retries: int = DETAIL_RETRY) -> tuple[list, list]:
+    results = []
+    failed = []
+    for an in ans:
+        record = fetch_by_an(driver, tab, an, extract, retries)
+        if record is None:
+            failed.append(an)
+        else:
+            results.append(record)
+    return results, failed
+
 class DataInsertError(Exception):
     pass
 
@@ -0,0 +1,168 @@
+import time
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.support.ui import WebDriverWait
+
+"""
+KIPRIS 화면 준비 상태 대기 함수들
+고정 sleep 대신 실제 준비 신호(결과 건수 표시, XHR 요청 종료, 결과 영역 변경)를 기다리고
+각 대기에 실제로 걸린 시간을 기록한다.
+"""
+
+WAIT_TIMEOUT = 10
+POLL_FREQUENCY = 0.1
+
+# 대기 이름 -> 실제 소요 시간(초) 리스트
+WAIT_TIMINGS = {}
+
+# XHR/fetch 진행 건수와 #resultSection 변경 횟수를 window에 기록하는 스크립트
+# 새 문서마다(CDP) 또는 현재 문서에(execute_script) 여러 번 실행해도 안전하다
+READY_HOOK_SCRIPT = """
+(function () {
+    if (!window.__kiprisHooked) {
+        window.__kiprisHooked = true;
+        window.__kiprisPending = 0;
+        window.__kiprisMutations = 0;
+
+        const origSend = XMLHttpRequest.prototype.send;
+        XMLHttpRequest.prototype.send = function () {
+            window.__kiprisPending++;
+            this.addEventListener('loadend', function () { window.__kiprisPending--; });
+            return origSend.apply(this, arguments);
+        };
+
+        if (window.fetch) {
+            const origFetch = window.fetch;
+            window.fetch = function () {
+                window.__kiprisPending++;
+                return origFetch.apply(this, arguments).finally(function () { window.__kiprisPending--; });
+            };
+        }
+    }
+
+    const observe = function () {
+        const target = document.getElementById('resultSection');
+        if (!target || window.__kiprisObserved === target) { return; }
+        window.__kiprisObserved = target;
+        new MutationObserver(function () { window.__kiprisMutations++; })
+            .observe(target, {childList: true, subtree: true});
+    };
+    if (document.readyState === 'loading') {
+        document.addEventListener('DOMContentLoaded', observe);
+    } else {
+        observe();
+    }
+})();
+"""
+
+READY_STATE_SCRIPT = """
+return {
+    ready: document.readyState,
+    pending: window.__kiprisPending || 0,
+    mutations: window.__kiprisMutations || 0,
+    replaced: !!window.__kiprisObserved && window.__kiprisObserved !== document.getElementById('resultSection')
+};
+"""
+
+
+# 브라우저 생성 시 한 번 호출 : 이후 로드되는 모든 문서에 훅 등록
+def register_ready_hooks(driver: WebDriver):
+    try:
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": READY_HOOK_SCRIPT})
+    except Exception as e:
+        print("register_ready_hooks : ", e)
+
+
+# 현재 문서에 훅이 없으면 설치 (resultSection이 새로 생긴 경우 observer 재연결)
+def ensure_ready_hooks(driver: WebDriver):
+    driver.execute_script(READY_HOOK_SCRIPT)
+
+
+def get_ready_state(driver: WebDriver) -> dict:
+    return driver.execute_script(READY_STATE_SCRIPT) or {}
+
+
+def get_mutation_count(driver: WebDriver) -> int:
+    ensure_ready_hooks(driver)
+    return int(get_ready_state(driver).get("mutations", 0))
+
+
+# 대기 시간 측정 후 WAIT_TIMINGS에 기록
+def timed_wait(name: str, driver: WebDriver, condition, timeout: float = WAIT_TIMEOUT):
+    start = time.perf_counter()
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=POLL_FREQUENCY).until(condition)
+    finally:
+        WAIT_TIMINGS.setdefault(name, []).append(time.perf_counter() - start)
+
+
+def _is_idle(state: dict) -> bool:
+    return state.get("ready") == "complete" and state.get("pending", 0) <= 0
+
+
+# 현재 문서가 로드를 마쳤고 진행 중인 XHR/fetch가 없는지 (대기하지 않고 바로 반환)
+def is_page_idle(driver: WebDriver) -> bool:
+    ensure_ready_hooks(driver)
+    return _is_idle(get_ready_state(driver))
+
+
+# 문서 로드가 끝나고 진행 중인 XHR/fetch가 없을 때까지 대기
+def wait_for_xhr_idle(driver: WebDriver, name: str = "xhr_idle", timeout: float = WAIT_TIMEOUT):
+    ensure_ready_hooks(driver)
+    return timed_wait(name, driver, lambda d: _is_idle(get_ready_state(d)), timeout)
+
+
+# driver.get(...) 이후 검색 화면(상세검색창)이 준비될 때까지 대기
+def wait_for_search_page(driver: WebDriver, timeout: float = WAIT_TIMEOUT):
+    def _ready(d):
+        if not d.find_elements(By.ID, "modalSearchDetail"):
+            return False
+        ensure_ready_hooks(d)
+        return _is_idle(get_ready_state(d))
+
+    return timed_wait("search_page", driver, _ready, timeout)
+
+
+# 결과 건수(#{category}TotalCount)가 숫자로 채워질 때까지 대기 후 반환
+def wait_for_total_count(driver: WebDriver, category: str, timeout: float = WAIT_TIMEOUT) -> int:
+    def _count(d):
+        if not _is_idle(get_ready_state(d)):
+            return False
+        # 0건도 유효한 결과이므로 숫자 문자열 그대로 반환("0"은 truthy)
+        text = d.find_element(By.ID, f"{category}TotalCount").text.strip().replace(",", "")
+        return text if text.isdigit() else False
+
+    ensure_ready_hooks(driver)
+    return int(timed_wait("total_count", driver, _count, timeout))
+
+
+# 정렬/페이지 이동 등으로 결과 영역이 다시 그려질 때까지 대기
+# before : 동작 전에 get_mutation_count로 읽은 값
+def wait_for_result_update(driver: WebDriver, before: int, name: str = "result_update",
+                           timeout: float = WAIT_TIMEOUT):
+    def _updated(d):
+        state = get_ready_state(d)
+        changed = state.get("mutations", 0) > before or state.get("replaced")
+        if not changed or not _is_idle(state):
+            return False
+        return bool(d.find_elements(By.CSS_SELECTOR, "#resultSection article.result-item"))
+
+    return timed_wait(name, driver, _updated, timeout)
+
+
+# 대기별 호출 횟수, 합계, 평균, 최대 시간 요약
+def get_wait_summary() -> dict:
+    summary = {}
+    for name, timings in WAIT_TIMINGS.items():
+        summary[name] = {
+            "count": len(timings),
+            "total": round(sum(timings), 3),
+            "avg": round(sum(timings) / len(timings), 3),
+            "max": round(max(timings), 3),
+        }
+    return summary
+
+
+def print_wait_summary():
+    for name, stat in get_wait_summary().items():
+        print(f"[WAIT] {name} : {stat['count']}회, 합계 {stat['total']}초, 평균 {stat['avg']}초, 최대 {stat['max']}초")
@@ -0,0 +1,329 @@
+from collector.kipris_engine import *
+from collections import deque
+import threading
+import time
+
+"""
+KIPRIS 병렬 수집 스케줄러 (KIPRIS_WORKERS >= 2)
+워커마다 브라우저 하나를 사용하고, 기업 작업은 검색 건수(get_total_num)로 작업량을 추정한다.
+- 페이지 수가 한 작업 분량(chunk)보다 많으면 나머지 페이지를 페이지 범위 작업으로 나눠 다른 워커가 병렬 처리
+- 워커는 기업 작업과 페이지 범위 작업을 번갈아 꺼내므로 큰 기업이 있어도 작은 기업이 오래 기다리지 않음
+- chunk 크기는 실제 페이지당 처리 시간으로 KIPRIS_CHUNK_SECONDS에 맞춰 조정
+나눠진 기업은 마지막 페이지 범위가 끝난 뒤에 완료 기록을 남긴다.
+페이지 범위는 첫 작업에서 확인한 페이지당 건수로 계산하므로, 범위 작업에서 다시 검색한 결과의
+페이지당 건수가 다르면 그 범위는 수집하지 않고 실패로 기록한다 (다음 실행에서 체크포인트로 재개).
+KIPRIS_BACKEND=api이면 브라우저 없이 기업 작업만 병렬로 처리한다.
+"""
+
+# 페이지 범위 작업 하나의 목표 처리 시간(초)
+CHUNK_SECONDS = int(os.getenv("KIPRIS_CHUNK_SECONDS", "600"))
+# 페이지당 처리 시간을 재기 전 기본 chunk 페이지 수
+DEFAULT_CHUNK_PAGES = int(os.getenv("KIPRIS_CHUNK_PAGES", "20"))
+
+
+# 범위 작업의 페이지당 건수가 페이지 범위를 계산한 건수와 다름
+class PageSizeChanged(Exception):
+    pass
+
+
+# 여러 페이지 범위로 나눠진 기업 하나의 상태
+# page_size : 페이지 범위를 계산할 때 확인된 페이지당 건수 (verify_results_per_page)
+class SplitCompany:
+    def __init__(self, spec: dict, company: dict, an_dates: dict, now: datetime, page_size: int):
+        self.spec = spec
+        self.biz_no = company["BIZ_NO"]
+        self.comp_name = company["CMP_NM"]
+        self.an_dates = an_dates
+        self.now = now
+        self.page_size = page_size
+        self.pending = 0
+        self.count = 0
+        # 중복을 만난 범위의 끝 페이지 : 이후 범위는 모두 이미 적재된 건이므로 건너뜀
+        self.stop_page = None
+        self.chunk = 0
+        self.duplicate = False
+        self.failed = False
+        self.lock = threading.Lock()
+
+    def skip(self, page_range: tuple) -> bool:
+        with self.lock:
+            return self.stop_page is not None and page_range[0] > self.stop_page
+
+    def stop(self, page_range: tuple):
+        with self.lock:
+            self.duplicate = True
+            if self.stop_page is None or page_range[1] < self.stop_page:
+                self.stop_page = page_range[1]
+
+    # 범위 하나가 끝날 때 호출, 마지막 범위이면 True
+    def finish_range(self, count: int, failed: bool) -> bool:
+        with self.lock:
+            self.count += count
+            self.failed = self.failed or failed
+            self.pending -= 1
+            return self.pending == 0
+
+
+class KiprisScheduler:
+    def __init__(self, specs: list, companies: list):
+        self.companies = deque((company, spec) for company in companies for spec in specs)
+        self.ranges = deque()
+        self.active = 0
+        self.prefer_range = False
+        self.cond = threading.Condition()
+        # 페이지당 처리 시간 (합계, 페이지 수)
+        self.page_seconds = 0.0
+        self.page_count = 0
+
+    # 기업 작업과 페이지 범위 작업을 번갈아 반환, 남은 작업이 없으면 None
+    # 실행 중인 작업이 새 범위를 만들 수 있으므로 모두 끝날 때까지 기다린다
+    def next_job(self) -> tuple | None:
+        with self.cond:
+            while True:
+                if self.ranges and (self.prefer_range or not self.companies):
+                    job = ("range", self.ranges.popleft())
+                elif self.companies:
+                    job = ("company", self.companies.popleft())
+                elif self.active > 0:
+                    self.cond.wait()
+                    continue
+                else:
+                    return None
+                self.prefer_range = not self.prefer_range
+                self.active += 1
+                return job
+
+    def done_job(self):
+        with self.cond:
+            self.active -= 1
+            self.cond.notify_all()
+
+    def add_ranges(self, split: SplitCompany, page_ranges: list):
+        with self.cond:
+            for page_range in page_ranges:
+                self.ranges.append((split, page_range))
+            self.cond.notify_all()
+
+    def record_pages(self, pages: int, seconds: float):
+        if pages <= 0:
+            return
+        with self.cond:
+            self.page_seconds += seconds
+            self.page_count += pages
+
+    # 목표 처리 시간에 맞춘 범위 작업당 페이지 수
+    def chunk_pages(self) -> int:
+        with self.cond:
+            if self.page_count == 0:
+                return DEFAULT_CHUNK_PAGES
+            return max(1, int(CHUNK_SECONDS / (self.page_seconds / self.page_count)))
+
+
+# 레코드를 페이지마다 적재하고 처리한 페이지 수를 반환
+# on_page : 페이지 적재 후 on_page(PageEnd) 호출 (체크포인트 저장)
+def write_records(records, writer: PageWriter, on_page=None) -> int:
+    pages = 0
+    for record in records:
+        if isinstance(record, PageEnd):
+            writer.flush()
+            pages += 1
+            if on_page:
+                on_page(record)
+        else:
+            writer.add(record)
+    return pages
+
+
+# 기업 작업 : 건수를 보고 페이지가 많으면 첫 범위만 직접 처리하고 나머지는 범위 작업으로 나눔
+def run_company_job(scheduler: KiprisScheduler, driver: WebDriver, es, spec: dict, company: dict):
+    # 이전 실행의 체크포인트가 있으면 나누지 않고 이어서 수집
+    if load_checkpoint(spec, company["BIZ_NO"]):
+        process_company(driver, es, spec, company)
+        return
+    if is_empty_cached(spec, company["BIZ_NO"]):
+        add_metric(spec["category"], "skipped")
+        return
+
+    biz_no = company["BIZ_NO"]
+    comp_name = company["CMP_NM"]
+    now = datetime.now()
+    add_metric(spec["category"], "companies")
+    writer = PageWriter(es, spec, biz_no)
+    split = None
+    start = time.perf_counter()
+    pages = 0
+
+    def on_total(total: int, total_pages: int, page_size: int) -> int | None:
+        nonlocal split
+        chunk = scheduler.chunk_pages()
+        if NAVIGATION_MODE != "list" or total_pages <= chunk:
+            return None
+        split = SplitCompany(spec, company, an_dates, now, page_size)
+        split.chunk = chunk
+        page_ranges = [(page, min(page + chunk - 1, total_pages)) for page in range(chunk + 1, total_pages + 1, chunk)]
+        split.pending = len(page_ranges) + 1
+        # 중간에 중단되면 다음 실행에서 이 시점 이후 적재된 출원번호를 건너뛰고 처음부터 이어서 수집
+        # (실제로 적용된 페이지당 건수로 기록해야 재개할 때 페이지 번호를 그대로 쓸 수 있음)
+        save_checkpoint(spec["data_type"], biz_no, get_page_sort_order(page_size), 1, None, now)
+        tqdm.write(f"{comp_name} - {spec['label']} : {total_pages}페이지를 {len(page_ranges) + 1}개 범위로 나눔")
+        scheduler.add_ranges(split, page_ranges)
+        return chunk
+
+    # 나누지 않은 기업은 process_company와 같이 페이지마다 체크포인트 저장
+    def on_page(page_end: PageEnd):
+        if split is None:
+            save_checkpoint(spec["data_type"], biz_no, page_end.sort_order, page_end.page_no, page_end.last_an, now)
+
+    try:
+        an_dates = get_application_an_dates(es, spec["es_data_type"], biz_no)
+        try:
+            records = iter_company_records(driver, es, spec, biz_no, comp_name, None, an_dates, on_total=on_total)
+            pages = write_records(records, writer, on_page)
+        except DuplicateError:
+            tqdm.write(f"{comp_name} : 중복")
+            add_metric(spec["category"], "duplicates")
+            writer.flush()
+            if split:
+                split.stop((1, split.chunk))
+            elif writer.count == 0:
+                return
+        scheduler.record_pages(pages, time.perf_counter() - start)
+
+        if split:
+            if split.finish_range(writer.count, False):
+                complete_split(es, split)
+        else:
+            complete_company(es, spec, biz_no, comp_name, writer, now)
+    except DataInsertError:
+        raise
+    except Exception as e:
+        add_metric(spec["category"], "errors")
+        insert_error_log("Process company", spec["data_type"], f"{comp_name}({biz_no}) 기업 처리중 오류 발생 : {e}",
+                         traceback.format_exc())
+        try:
+            writer.flush()
+        except Exception:
+            pass
+        if split and split.finish_range(writer.count, True):
+            complete_split(es, split)
+
+
+# 페이지 범위 작업 : 같은 검색을 다시 하고 시작 페이지로 바로 이동해서 끝 페이지까지 수집
+# 다시 검색한 결과의 페이지당 건수가 범위를 계산한 건수와 다르면 (페이지를 빠뜨리거나 중복 수집하므로) 실패로 처리
+def run_range_job(scheduler: KiprisScheduler, driver: WebDriver, es, split: SplitCompany, page_range: tuple):
+    spec = split.spec
+    writer = PageWriter(es, spec, split.biz_no)
+    failed = False
+    if split.skip(page_range):
+        if split.finish_range(0, False):
+            complete_split(es, split)
+        return
+
+    def on_total(total: int, total_pages: int, page_size: int) -> None:
+        if page_size != split.page_size:
+            raise PageSizeChanged(f"페이지당 건수가 {split.page_size}건에서 {page_size}건으로 바뀜")
+
+    start = time.perf_counter()
+    try:
+        records = iter_company_records(driver, es, spec, split.biz_no, split.comp_name, None, split.an_dates,
+                                       page_range=page_range, on_total=on_total)
+        pages = write_records(records, writer)
+        scheduler.record_pages(pages, time.perf_counter() - start)
+    except DuplicateError:
+        writer.flush()
+        split.stop(page_range)
+    except Exception as e:
+        failed = True
+        insert_error_log("Process company range", spec["data_type"],
+                         f"{split.comp_name}({split.biz_no}) {page_range} 처리중 오류 발생 : {e}", traceback.format_exc())
+        try:
+            writer.flush()
+        except Exception:
+            pass
+
+    if split.finish_range(writer.count, failed):
+        complete_split(es, split)
+
+
+# 나눠진 기업의 마지막 범위가 끝나면 완료 기록 (실패한 범위가 있으면 체크포인트를 남겨 다음 실행에서 재개)
+def complete_split(es, split: SplitCompany):
+    spec = split.spec
+    if split.failed:
+        add_metric(spec["category"], "errors")
+        return
+    if split.duplicate and split.count == 0:
+        delete_checkpoint(spec["data_type"], split.biz_no)
+        return
+    writer = PageWriter(es, spec, split.biz_no)
+    writer.count = split.count
+    complete_company(es, spec, split.biz_no, split.comp_name, writer, split.now, resumed=True)
+
+
+# pool이 None이면 (API 백엔드) 브라우저 없이 작업 처리
+def run_worker(scheduler: KiprisScheduler, pool: BrowserPool | None, es, progress):
+    driver = pool.acquire() if pool else None
+    try:
+        while True:
+            job = scheduler.next_job()
+            if job is None:
+                break
+            kind, payload = job
+            try:
+                if kind == "company":
+                    company, spec = payload
+                    run_company_job(scheduler, driver, es, spec, company)
+                    progress.update(1)
+                else:
+                    split, page_range = payload
+                    run_range_job(scheduler, driver, es, split, page_range)
+            except Exception as e:
+                insert_error_log("KIPRIS worker", "KIPRIS", f"작업 처리중 오류 발생 : {e}", traceback.format_exc())
+            finally:
+                scheduler.done_job()
+            if pool and not is_browser_alive(driver):
+                tqdm.write("브라우저 세션 종료 감지 : 예비 브라우저로 교체")
+                driver = pool.replace(driver)
+    finally:
+        if pool:
+            pool.release(driver)
+
+
+# KIPRIS_WORKERS개 브라우저로 categories 수집
+def run_kipris_scheduled(categories: list):
+    specs = [get_category_spec(category) for category in categories]
+    data_type = specs[0]["data_type"] if len(specs) == 1 else "KIPRIS"
+    es = None
+    pool = None
+
+    try:
+        # API 백엔드는 브라우저를 쓰지 않으므로 풀을 만들지 않음
+        if KIPRIS_BACKEND != "api":
+            pool = BrowserPool(specs[0]["tab"], size=KIPRIS_WORKERS, lean=LEAN_BROWSER,
+                               capture_network=KIPRIS_BACKEND == "xhr")
+            pool.prewarm()
+        try:
+            es = get_es_conn()
+        except Exception as e:
+            insert_error_log("Elasticsearch connection", data_type, f"Elasticsearch 연결 실패 : {e}",
+                             traceback.format_exc())
+            raise
+
+        companies = load_companies()
+        scheduler = KiprisScheduler(specs, companies)
+        desc = "kipris_" + "_".join(categories) + " 수집"
+        with tqdm(total=len(companies) * len(specs), desc=desc, unit="작업") as progress:
+            workers = [threading.Thread(target=run_worker, args=(scheduler, pool, es, progress), daemon=True)
+                       for _ in range(KIPRIS_WORKERS)]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+    except Exception as e:
+        insert_error_log("Open Browser", data_type, "Cannot Open Browser", traceback.format_exc())
+    finally:
+        print_run_summary()
+        print_startup_summary()
+        if pool:
+            pool.close()
+        if es:
+            es.close()
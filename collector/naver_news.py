@@ -8,6 +8,7 @@ from db.es import get_es_conn, insert_naver_news
 import functools
 from db.mysql import *
 from datetime import datetime, timedelta
+from collector.date_utils import convert_dates
 
 try:
     from collector.alter import send_naver_alert
@@ -18,25 +19,6 @@ DATA_TYPE = "naver_news"
 PERIOD = 365
 
 
-# -----------------------------------------------------
-# 날짜 변환 함수
-# -----------------------------------------------------
-def format_date(date: str) -> str:
-    s = date.strip()
-    # '오전'/'오후' -> 'AM'/'PM' 변환
-    s = s.replace("오전", "AM").replace("오후", "PM")
-    # 경우에 따라 날짜 뒤에 '.'이 있거나 없을 수 있으니 둘 다 시도
-    formats = ["%Y.%m.%d. %p %I:%M", "%Y.%m.%d %p %I:%M"]
-    for fmt in formats:
-        try:
-            dt = datetime.strptime(s, fmt)
-            return dt.strftime("%Y-%m-%d")
-        except ValueError:
-            continue
-    # 실패하면 명확한 에러 메시지
-    raise ValueError(f"지원하지 않는 형식입니다: {date!r}")
-
-
 # -----------------------------------------------------
 # backoff 함수
 # -----------------------------------------------------
@@ -233,11 +215,7 @@ def get_naver_news(news_url: str) -> dict[str, str | list[str] | None]:
         date_tag = soup.select_one("span._ARTICLE_DATE_TIME")
         date = date_tag.get_text().strip() if date_tag else None
 
-        # elasticsearch format 타입에 맞게 변환
-        if date:
-            date = format_date(date)
-        else:
-            date = None
+        # elasticsearch format 타입 변환은 기업 단위 목록에서 (convert_dates)
 
         # 본문
         article_tag = soup.find("article", id="dic_area")
@@ -304,11 +282,6 @@ def get_e_sport_news(news_url: str) -> dict[str, str]:
         date_tag = soup.find("em", class_="date")
         date = date_tag.get_text().strip() if date_tag else None
 
-        if date:
-            date = format_date(date)
-        else:
-            date = None
-
         article_tag = soup.find("div", class_="_article_content")
         article = article_tag.get_text().strip() if article_tag else None
 
@@ -359,11 +332,6 @@ def get_enter_sports_news(news_url: str) -> dict[str, str | None]:
         date_tag = soup.find("em", class_="date")
         date = date_tag.get_text().strip() if date_tag else None
 
-        if date:
-            date = format_date(date)
-        else:
-            date = None
-
         article_tag = soup.find("div", class_="_article_content")
         article = article_tag.get_text().strip() if article_tag else None
 
@@ -456,6 +424,9 @@ def main():
 
                 # ES 적재 시 예외 처리 추가
                 try:
+                    # 작성일('2024.05.01. 오후 3:12')을 elasticsearch format('2024-05-01')으로, 같은 값은 한 번만 변환
+                    # 변환할 수 없는 작성일은 작성일이 없는 뉴스와 같이 None
+                    convert_dates(news, {"NewsDate": "news"}, errors="none")
                     insert_naver_news(es, news, company["BIZ_NO"])
                     insert_check_log(company["BIZ_NO"], "NAVER_NEWS", now)
                     insert_cmp_data_log(company["BIZ_NO"], "NAVER_NEWS", len(news), now)
@@ -9,6 +9,7 @@ import re
 from db.es import *
 from db.mysql import *
 from collector.alter import send_naver_alert
+from collector.api_archive import *
 import datetime
 from tqdm import tqdm
 
@@ -66,7 +67,9 @@ def backoff_with_key_rotation(max_retries=5, base_delay=2, allowed_statuses=(429
                 try:
                     response = func(*args, **kwargs)
 
-                    # 정상 응답
+                    # 정상 응답 (재생 응답은 이미 dict)
+                    if isinstance(response, dict):
+                        return response
                     if response.status_code == 200:
                         return response.json()
 
@@ -89,6 +92,8 @@ def backoff_with_key_rotation(max_retries=5, base_delay=2, allowed_statuses=(429
                     else:
                         response.raise_for_status()
 
+                except ArchiveMissError:
+                    raise
                 except Exception as e:
                     if "모든 API 키가 한도에 도달했습니다" not in str(e):
                         error_log = f"NAVER TREND API 요청 중 예외 발생 {attempt} : {e}"
@@ -132,17 +137,40 @@ def call_naver_trend_api(start_date: str, end_date: str, keyword_groups: list):
         "keywordGroups": keyword_groups,
     }
 
-    return requests.post(url=url, headers=headers, json=body)
+    # API_REPLAY=1이면 보관된 응답 사용 (네트워크 사용 안 함)
+    if REPLAY:
+        return json.loads(load_archived_response("naver_trend", "datalab/search", body))
+
+    response = requests.post(url=url, headers=headers, json=body)
+    if response.status_code == 200 and ARCHIVE_DIR:
+        # 재생은 전체 기업을 한 기업씩 조회하므로 그룹(기업)별 결과를 각각 보관
+        data = response.json()
+        for group, result in zip(keyword_groups, data["results"]):
+            archive_response("naver_trend", "datalab/search", {**body, "keywordGroups": [group]},
+                             json.dumps({**data, "results": [result]}, ensure_ascii=False).encode("utf-8"))
+    return response
+
+
+# 트렌드 적재 (재생 모드면 기업의 기존 트렌드 문서를 지우고 다시 변환한 문서로 교체)
+def write_naver_trend(es, naver_trends: list, biz_no: str):
+    if REPLAY:
+        delete_source_docs(es, "naver_trend", biz_no)
+    insert_naver_trend(es, naver_trends, biz_no)
 
 
 def main():
     try:
-        company_list = get_cmp_list("NAVER_TREND")
+        # 재생할 때는 수집 기록과 상관없이 전체 기업
+        company_list = get_cmp_list("NAVER_TREND", all_companies=REPLAY)
         start_date = "2022-01-01"
         today = datetime.date.today().strftime("%Y-%m-%d")
         end_date = today
+        # 재생할 때는 보관한 날의 요청과 같은 종료일을 사용
+        if REPLAY:
+            end_date = get_replay_date("naver_trend") or today
 
-        chunk_size = 5
+        # 재생은 기업별로 보관한 응답을 사용하므로 한 기업씩
+        chunk_size = 1 if REPLAY else 5
 
         es = None
     except Exception as e:
@@ -167,7 +195,11 @@ def main():
                     "keywords": [clean_name],
                 })
 
-            result = call_naver_trend_api(start_date, end_date, keyword_groups)
+            try:
+                result = call_naver_trend_api(start_date, end_date, keyword_groups)
+            except ArchiveMissError as e:
+                print(e)
+                continue
 
             if result:
 
@@ -183,7 +215,10 @@ def main():
                     )
 
                     try:
-                        insert_naver_trend(es, naver_trends, chunk[idx]["BIZ_NO"])
+                        write_naver_trend(es, naver_trends, chunk[idx]["BIZ_NO"])
+                        # 재생은 수집 기록을 남기지 않음
+                        if REPLAY:
+                            continue
                         insert_check_log(chunk[idx]["BIZ_NO"], "NAVER_TREND", now)
                         insert_cmp_data_log(chunk[idx]["BIZ_NO"], "NAVER_TREND", len(naver_trends), now)
                         # print(f"{r['title']} - {len(naver_trends)} 저장 완료")
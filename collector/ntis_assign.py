@@ -1,75 +1,280 @@
 import requests
-import xmltodict
-import functools
+import xml.etree.ElementTree as ET
 import time
-import random
 import json
 import re
 from tqdm import tqdm
 from db.mysql import *
-from dateutil import parser
 from db.es import *
+from collector.ntis_mapping import *
+from collector.ntis_client import *
 from urllib.parse import urlencode
 
+"""
+NTIS 국가R&D 과제목록(public_project) 수집
+검색 결과를 startPosition으로 페이지마다 요청하고, 응답 XML은 HIT 단위로 iterparse해서
+과제 요소에서 바로 적재 필드로 변환하므로 메모리는 한 페이지 분량으로 제한된다.
+페이지를 적재할 때마다 다음 startPosition을 체크포인트로 남기므로, 중간에 실패하면 다음 실행에서
+그 위치부터 이어서 수집하고 중단된 실행에서 적재한 과제는 중복 중단 대신 건너뛴다.
+"""
+
+# 한 번에 요청하는 과제 수 (NTIS 최대 1000)
+NTIS_DISPLAY_CNT = int(os.getenv("NTIS_DISPLAY_CNT", "1000"))
+
+# 체크포인트 정렬 기준 (페이지 크기가 바뀌어도 startPosition은 그대로 사용할 수 있음)
+NTIS_SORT_ORDER = "DATE/DESC"
+
 class DuplicateError(Exception):
     pass
 
-def backoff_retry(max_retries=5, base_delay=2, allowed_statuses=(429,)):
-    def decorator(func):
-        @functools.wraps(func)
-        def wrapper(*args, **kwargs):
-            for attempt in range(1, max_retries + 1):
-                try:
-                    response = func(*args, **kwargs)
-
-                    # 정상 응답이면 JSON 반환
-                    if response.status_code == 200:
-                        return response
-
-                    # 허용된 상태코드(예: 429 Too Many Requests)
-                    elif response.status_code in allowed_statuses:
-                        print(f"[WARN] 상태코드 {response.status_code} 발생 → 재시도")
-
-                    else:
-                        # 나머지 상태코드는 즉시 예외 처리
-                        response.raise_for_status()
-
-                except Exception as e:
-                    error_log = f"NTIS_ASSIGN API 요청 중 예외 발생 {attempt}: {e}"
-                    insert_error_log("Failed API Requests", "NTIS_ASSIGN", error_log, "")
-
-                # 백오프 대기 시간 계산
-                delay = base_delay * (2 ** (attempt - 1)) + random.uniform(0, 1)
-                print(f"[INFO] {delay:.1f}초 대기 후 재시도 ({attempt}/{max_retries})")
-                time.sleep(delay)
-
-            error_log = "모든 재시도 실패(backoff_retry)"
-            insert_error_log("Failed All Retry", "NTIS_ASSIGN", error_log, "")
-            raise Exception("모든 재시도 실패(backoff_retry)")
-        return wrapper
-    return decorator
-
-@backoff_retry(max_retries=5, base_delay=2, allowed_statuses=(429,))
-def get_ntis_assign(comp_name: str) -> requests.Response:
-    BASE_URL = "https://www.ntis.go.kr/rndopen/openApi/public_project?"
-    API_KEY = os.getenv("NTIS_API_KEY")
+# 페이지 경계 표시 : iter_ntis_assigns가 한 페이지를 끝낼 때마다 yield
+# next_position : 다음 페이지의 startPosition
+class PageEnd:
+    def __init__(self, next_position: int):
+        self.next_position = next_position
 
+def get_ntis_assign(comp_name: str, start_position: int = 1) -> requests.Response:
     params = {
-        "apprvKey": API_KEY,
         "collection": "project",
         "addQuery": f"PB01={comp_name}",
         "searchRnkn": "DATE/DESC",
-        "startPosition": 1,
-        "displayCnt": 1000,
+        "startPosition": start_position,
+        "displayCnt": NTIS_DISPLAY_CNT,
     }
 
-    query = urlencode(params, encoding="utf-8")
-    # print(BASE_URL + query)
-    return requests.get(BASE_URL + query)
+    # 응답 본문은 iter_ntis_page에서 읽으면서 파싱
+    return ntis_get("public_project", params, "NTIS_ASSIGN", stream=True)
+
+# 한 페이지 응답에서 HIT 요소를 하나씩 yield, 끝나면 meta에 TOTALHITS를 채운다
+# 요소는 다음 HIT를 읽기 전에 비우므로 yield 받은 곳에서 바로 변환해야 한다
+def iter_ntis_page(response: requests.Response, meta: dict):
+    with response:
+        response.raw.decode_content = True
+        for event, elem in ET.iterparse(response.raw, events=("end",)):
+            if elem.tag == "HIT":
+                yield elem
+                elem.clear()
+            elif elem.tag == "TOTALHITS":
+                meta["total"] = int((elem.text or "").strip() or 0)
+
+# 기업의 과제를 최신순으로 하나씩 yield (한 페이지를 다 읽으면 PageEnd 후 다음 startPosition을 요청)
+def iter_ntis_assigns(comp_name: str, start_position: int = 1):
+    while True:
+        meta = {}
+        count = 0
+        for assign in iter_ntis_page(get_ntis_assign(comp_name, start_position), meta):
+            count += 1
+            yield assign
+
+        start_position += count
+        if count:
+            yield PageEnd(start_position)
+        if count == 0 or start_position > meta.get("total", 0):
+            return
+
+# NTIS 과제(HIT) -> 적재 필드 (ntis_mapping.FieldMapping)
+NTIS_ASSIGN_MAPPING = FieldMapping([
+    ("ProjectNo", "ProjectNumber", None),
+    ("ProjectNameKR", "ProjectTitle/Korean", None),
+    ("ProjectNameEN", "ProjectTitle/English", None),
+
+    ("MangerName", "Manager/Name", "split"),
+
+    ("ResearcherName", "Researchers/Name", "split"),
+    ("ResManCount", "Researchers/ManCount", None),
+    ("ResWmanCount", "Researchers/WomanCount", None),
+
+    ("GoalFull", "Goal/Full", None),
+    ("GaolTeaser", "Goal/Teaser", None),
+
+    ("AbstractFull", "Abstract/Full", None),
+    ("AbstractTeaser", "Abstract/Teaser", None),
+
+    ("EffectFull", "Effect/Full", None),
+    ("EffectTeaser", "Effect/Teaser", None),
+
+    ("KeywordKR", "Keyword/Korean", None),
+    ("KeywordEN", "Keyword/English", None),
+
+    ("OrderAgencyName", "OrderAgency/Name", None),
+    ("ResearchagencyName", "ResearchAgency/Name", None),
+
+    ("BudgetProjectName", "BudgetProject/Name", None),
+    ("BusinessName", "BusinessName", None),
+    ("BigprojectTitle", "BigprojectTitle", None),
+
+    ("ManageagencyName", "ManageAgency/Name", None),
+    ("MinistryName", "Ministry/Name", None),
+
+    ("ProjectYear", "ProjectYear", "year"),
+
+    ("ProjectStart", "ProjectPeriod/Start", "date"),
+    ("ProjectEnd", "ProjectPeriod/End", "date"),
+    ("ProjectToStart", "ProjectPeriod/TotalStart", "parse_date"),
+    ("ProjectToEnd", "ProjectPeriod/TotalEnd", "parse_date"),
+
+    ("OrganizationpNo", "OrganizationPNumber", None),
+
+    ("Scienceclass_New_1_Large_code", "ScienceClass[@sequence='1']/Large@code", None),
+    ("Scienceclass_New_1_Large", "ScienceClass[@sequence='1']/Large", None),
+    ("Scienceclass_Medium_1_Large_code", "ScienceClass[@sequence='1']/Medium@code", None),
+    ("Scienceclass_Medium_1_Large", "ScienceClass[@sequence='1']/Medium", None),
+    ("Scienceclass_Small_1_Large_code", "ScienceClass[@sequence='1']/Small@code", None),
+    ("Scienceclass_Small_1_Large", "ScienceClass[@sequence='1']/Small", None),
+
+    ("Ministryscience_Class_Large", "MinistryScienceClass/Large", None),
+    ("Ministryscience_Class_Medium", "MinistryScienceClass/Medium", None),
+    ("Ministryscience_Class_Small", "MinistryScienceClass/Small", None),
+
+    ("Tempscience_Class_Large", "TempScienceClass/Large", None),
+    ("Tempscience_Class_Medium", "TempScienceClass/Medium", None),
+    ("Tempscience_Class_Small", "TempScienceClass/Small", None),
+
+    ("PerformagentCode", "PerformAgent@code", None),
+    ("Performagent", "PerformAgent", None),
+
+    ("DevelopmentPhasesCode", "DevelopmentPhase@code", None),
+    ("DevelopmentPhase", "DevelopmentPhase", None),
+
+    ("TechLifecycleCode", "TechnologyLifecycle@code", None),
+    ("TechLifecycle", "TechnologyLifecycle", None),
+
+    ("RegionCode", "Region@code", None),
+    ("Region", "Region", None),
+
+    ("EconomicSocialGoal", "EconomicSocialGoal", None),
+
+    ("SixtechCode", "SixTechnology@code", None),
+    ("Sixtech", "SixTechnology", None),
+
+    ("ApplyareaFirstCode", "ApplyArea/First@code", None),
+    ("ApplyareaFirst", "ApplyArea/First", None),
+    ("ApplyareaSecondCode", "ApplyArea/Second@code", None),
+    ("ApplyareaSecond", "ApplyArea/Second", None),
+    ("ApplyareaThirdCode", "ApplyArea/Third@code", None),
+    ("ApplyareaThird", "ApplyArea/Third", None),
+
+    ("ContinuousFlag", "ContinuousFlag", None),
+    ("PolicyProjectFlag", "PolicyProjectFlag", None),
+
+    ("GovernFunds", "GovernmentFunds", None),
+    ("SbusinessFunds", "SbusinessFunds", None),
+    ("TotFunds", "TotalFunds", None),
+
+    ("CorporateRegistrationNo", "CorporateRegistrationNumber", None),
+    ("SeriesProject", "SeriesProject", None),
+])
+
+# 과제 적재 (재생 모드면 같은 과제번호 문서와 결과 없음 문서를 지우고 다시 변환한 문서로 교체)
+def write_assigns(es, results: list, biz_no: str):
+    if REPLAY:
+        delete_source_docs(es, "ntis_assign", biz_no, "ProjectNo", [r["ProjectNo"] for r in results if r["ProjectNo"]])
+        delete_source_docs(es, "ntis_assign", biz_no, empty=True)
+    insert_ntis_assign(es, results, biz_no)
 
-def get_ntis_assign_json(comp_name: str) -> dict:
-    response = get_ntis_assign(comp_name)
-    return xmltodict.parse(response.text)
+# 이전 실행의 체크포인트 (정렬 기준이 다르면 무시, 재생 모드에서는 사용하지 않음)
+def load_checkpoint(biz_no: str) -> dict | None:
+    if REPLAY:
+        return None
+    checkpoint = get_checkpoint("NTIS_ASSIGN", biz_no)
+    if checkpoint and checkpoint["SORT_ORDER"] != NTIS_SORT_ORDER:
+        delete_checkpoint("NTIS_ASSIGN", biz_no)
+        return None
+    return checkpoint
+
+# 한 기업의 과제목록 수집 (run_companies가 스레드마다 호출)
+# 과제는 페이지마다 적재하고 체크포인트를 남기므로 중간에 실패해도 다음 실행에서 이어서 수집한다
+# 재생 모드(API_REPLAY=1)는 중복에서 멈추지 않고 보관된 전체 페이지를 다시 변환해서 기존 문서를 교체한다
+def process_company(es, company: dict):
+    comp_name = ""
+    biz_no = ""
+    now = datetime.now()
+
+    try:
+        biz_no = company["BIZ_NO"]
+        comp_name = company["CMP_NM"]
+        clean_comp_name = re.sub(r'\(.*?\)', '', comp_name)
+        checkpoint = load_checkpoint(biz_no)
+        started_at = checkpoint["STARTED_AT"] if checkpoint else now
+        start_position = checkpoint["PAGE_NO"] if checkpoint else 1
+
+        # 이어서 수집하면 중단된 실행(STARTED_AT 이후)에서 적재한 과제는 건너뛰고, 그 전에 적재된 과제에서 중단
+        resumed_nos = set()
+        known_nos = None
+        if checkpoint:
+            print(f"{clean_comp_name}({biz_no}) : {start_position}번째 과제부터 이어서 수집")
+            since = started_at.strftime("%Y-%m-%d %H:%M:%S.%f")
+            no_dates = get_project_no_dates(es, "ntis_assign", biz_no)
+            resumed_nos = {no for no, search_date in no_dates.items() if search_date >= since}
+            known_nos = set(no_dates) - resumed_nos
+
+        def is_dup(no: str) -> bool:
+            if REPLAY:
+                return False
+            if known_nos is not None:
+                return no in known_nos
+            return get_project_no(es, "ntis_assign", biz_no, no)
+
+        # 과제는 한 페이지 분량씩 모아서 적재
+        results = []
+        count = 0
+        last_no = None
+        try:
+            for assign in iter_ntis_assigns(comp_name, start_position):
+                if isinstance(assign, PageEnd):
+                    # 페이지 적재 후 체크포인트 저장 (실패하면 다음 페이지부터 재개)
+                    if results:
+                        write_assigns(es, NTIS_ASSIGN_MAPPING.convert_records(results), biz_no)
+                        count += len(results)
+                        results = []
+                    if not REPLAY:
+                        save_checkpoint("NTIS_ASSIGN", biz_no, NTIS_SORT_ORDER, assign.next_position, last_no,
+                                        started_at)
+                    continue
+
+                no = (assign.findtext("ProjectNumber") or "").strip()
+                if no in resumed_nos:
+                    continue
+                if is_dup(no):
+                    tqdm.write(f"{comp_name} : 중복")
+                    raise DuplicateError
+
+                # 날짜는 페이지 단위로 변환 (convert_records)
+                results.append(NTIS_ASSIGN_MAPPING.extract(assign, dates=False))
+                last_no = no
+        except DuplicateError:
+            # 새 과제가 없으면 적재/기록하지 않음 (이어서 수집한 경우는 완료 기록)
+            if count == 0 and not results and not checkpoint:
+                return
+
+        if count == 0 and not results and not checkpoint:
+            print(f"{comp_name}({biz_no}  기업의 R&D 과제목록이 없음)")
+        NTIS_ASSIGN_MAPPING.convert_records(results)
+
+        if REPLAY:
+            # 재생은 수집 기록을 남기지 않음 (과제가 없으면 기존 문서를 그대로 둠)
+            if results:
+                write_assigns(es, results, biz_no)
+            print(f"{comp_name} - {count + len(results)}건 재생 완료")
+            return
+
+        try:
+            # 남은 과제 적재 (과제가 없으면 Data: None 문서, 이어서 수집한 경우는 이전 실행에서 적재한 건이 있으므로 제외)
+            if results or (count == 0 and not checkpoint):
+                insert_ntis_assign(es, results, biz_no)
+            count += len(results)
+            delete_checkpoint("NTIS_ASSIGN", biz_no)
+            insert_check_log(biz_no, "NTIS_ASSIGN", now)
+            insert_cmp_data_log(biz_no, "NTIS_ASSIGN", count, now)
+            print(f"{comp_name} - {count}건 저장 완료")
+        except Exception as e:
+            error_detail = traceback.format_exc()
+            insert_error_log("Insert data","NTIS_ASSIGN", f"데이터 삽입 실패({biz_no}) : {e}", error_detail)
+    except NtisQuotaError:
+        raise
+    except Exception as e:
+        error_detail = traceback.format_exc()
+        insert_error_log("Process company", "NTIS_ASSIGN", f"{comp_name}({biz_no}) 기업 처리중 오류 발생 : {e}", error_detail)
 
 def main():
     es = None
@@ -83,7 +288,7 @@ def main():
             raise
 
         try:
-            companies = get_cmp_list("NTIS_ASSIGN")
+            companies = get_cmp_list("NTIS_ASSIGN", all_companies=REPLAY)
         except Exception as e:
             insert_error_log("Get Cmp List", "NTIS_ASSIGN", f"기업 목록 조회 실패: {e}", "")
             raise
@@ -91,165 +296,7 @@ def main():
         # with open(r"/home/bax/fncsp/db/fianl_results.json", "r", encoding="utf-8") as f:
         #     companies = json.load(f)
 
-        for idx, company in enumerate(tqdm(companies, desc="기업 R&D 과제목록 수집", unit="개"), 1):
-            comp_name = ""
-            biz_no = ""
-            now = datetime.now()
-
-            try:
-                biz_no = company["BIZ_NO"]
-                comp_name = company["CMP_NM"]
-                clean_comp_name = re.sub(r'\(.*?\)', '', comp_name)
-
-                response = get_ntis_assign_json(comp_name)
-
-                ntis_assigns = []
-
-                try:
-                    ntis_assigns_raw = response["RESULT"]["RESULTSET"].get("HIT", [])
-
-                    # 리스트가 아니면 리스트로 변환
-                    ntis_assigns = ntis_assigns_raw if isinstance(ntis_assigns_raw, list) else [ntis_assigns_raw]
-                except Exception as e:
-                    print(f"{comp_name}({biz_no}  기업의 R&D 과제목록이 없음)")
-
-                results = []
-                for assign in ntis_assigns:
-                    result = {}
-
-                    result["ProjectNo"] = assign.get("ProjectNumber")
-                    dup = get_project_no(es, "ntis_assign", biz_no, result["ProjectNo"])
-                    if dup:
-                        tqdm.write(f"{comp_name} : 중복")
-                        raise DuplicateError
-
-                    result["ProjectNameKR"] = (assign.get("ProjectTitle") or {}).get("Korean")
-                    result["ProjectNameEN"] = (assign.get("ProjectTitle") or {}).get("English")
-
-                    managers = (assign.get("Manager") or {}).get("Name")
-                    result["MangerName"] = managers.split(";") if managers else None
-
-                    researchers = (assign.get("Researchers") or {}).get("Name")
-                    result["ResearcherName"] = researchers.split(";") if researchers else None
-                    result["ResManCount"] = (assign.get("Researchers") or {}).get("ManCount")
-                    result["ResWmanCount"] = (assign.get("Researchers") or {}).get("WomanCount")
-
-                    result["GoalFull"] = (assign.get("Goal") or {}).get("Full")
-                    result["GaolTeaser"] = (assign.get("Goal") or {}).get("Teaser")
-
-                    result["AbstractFull"] = (assign.get("Abstract") or {}).get("Full")
-                    result["AbstractTeaser"] = (assign.get("Abstract") or {}).get("Teaser")
-
-                    result["EffectFull"] = (assign.get("Effect") or {}).get("Full")
-                    result["EffectTeaser"] = (assign.get("Effect") or {}).get("Teaser")
-
-                    result["KeywordKR"] = (assign.get("Keyword") or {}).get("Korean")
-                    result["KeywordEN"] = (assign.get("Keyword") or {}).get("English")
-
-                    result["OrderAgencyName"] = (assign.get("OrderAgency") or {}).get("Name")
-                    result["ResearchagencyName"] = (assign.get("ResearchAgency") or {}).get("Name")
-
-                    result["BudgetProjectName"] = (assign.get("BudgetProject") or {}).get("Name")
-                    result["BusinessName"] = assign.get("BusinessName")
-                    result["BigprojectTitle"] = assign.get("BigprojectTitle")
-
-                    result["ManageagencyName"] = (assign.get("ManageAgency") or {}).get("Name")
-                    result["MinistryName"] = (assign.get("Ministry") or {}).get("Name")
-
-                    project_year = assign.get("ProjectYear")
-                    result["ProjectYear"] = datetime.strptime(project_year, "%Y").strftime(
-                        "%Y") if project_year else None
-
-                    project_start = (assign.get("ProjectPeriod") or {}).get("Start")
-                    project_end = (assign.get("ProjectPeriod") or {}).get("End")
-                    project_total_start = (assign.get("ProjectPeriod") or {}).get("TotalStart")
-                    project_total_end = (assign.get("ProjectPeriod") or {}).get("TotalEnd")
-
-                    result["ProjectStart"] = datetime.strptime(project_start, "%Y%m%d").strftime(
-                        "%Y-%m-%d") if project_start else None
-                    result["ProjectEnd"] = datetime.strptime(project_end, "%Y%m%d").strftime(
-                        "%Y-%m-%d") if project_end else None
-                    result["ProjectToStart"] = parser.parse(project_total_start).strftime(
-                        "%Y-%m-%d") if project_total_start else None
-                    result["ProjectToEnd"] = parser.parse(project_total_end).strftime(
-                        "%Y-%m-%d") if project_total_end else None
-
-                    result["OrganizationpNo"] = assign.get("OrganizationPNumber")
-
-                    seq1 = next(
-                        (item for item in assign.get("ScienceClass", []) if item.get("@sequence") == "1"),
-                        {}
-                    )
-                    result["Scienceclass_New_1_Large_code"] = (seq1.get("Large") or {}).get("@code")
-                    result["Scienceclass_New_1_Large"] = (seq1.get("Large") or {}).get("#text")
-                    result["Scienceclass_Medium_1_Large_code"] = (seq1.get("Medium") or {}).get("@code")
-                    result["Scienceclass_Medium_1_Large"] = (seq1.get("Medium") or {}).get("#text")
-                    result["Scienceclass_Small_1_Large_code"] = (seq1.get("Small") or {}).get("@code")
-                    result["Scienceclass_Small_1_Large"] = (seq1.get("Small") or {}).get("#text")
-
-                    result["Ministryscience_Class_Large"] = (assign.get("MinistryScienceClass") or {}).get("Large")
-                    result["Ministryscience_Class_Medium"] = (assign.get("MinistryScienceClass") or {}).get("Medium")
-                    result["Ministryscience_Class_Small"] = (assign.get("MinistryScienceClass") or {}).get("Small")
-
-                    result["Tempscience_Class_Large"] = (assign.get("TempScienceClass") or {}).get("Large")
-                    result["Tempscience_Class_Medium"] = (assign.get("TempScienceClass") or {}).get("Medium")
-                    result["Tempscience_Class_Small"] = (assign.get("TempScienceClass") or {}).get("Small")
-
-                    result["PerformagentCode"] = (assign.get("PerformAgent") or {}).get("@code")
-                    result["Performagent"] = (assign.get("PerformAgent") or {}).get("#text")
-
-                    result["DevelopmentPhasesCode"] = (assign.get("DevelopmentPhase") or {}).get("@code")
-                    result["DevelopmentPhase"] = (assign.get("DevelopmentPhase") or {}).get("#text")
-
-                    result["TechLifecycleCode"] = (assign.get("TechnologyLifecycle") or {}).get("@code")
-                    result["TechLifecycle"] = (assign.get("TechnologyLifecycle") or {}).get("#text")
-
-                    result["RegionCode"] = (assign.get("Region") or {}).get("@code")
-                    result["Region"] = (assign.get("Region") or {}).get("#text")
-
-                    result["EconomicSocialGoal"] = assign.get("EconomicSocialGoal")
-
-                    result["SixtechCode"] = (assign.get("SixTechnology") or {}).get("@code")
-                    result["Sixtech"] = (assign.get("SixTechnology") or {}).get("#text")
-
-                    apply_area = assign.get("ApplyArea") or {}
-                    result["ApplyareaFirstCode"] = (apply_area.get("First") or {}).get("@code")
-                    result["ApplyareaFirst"] = (apply_area.get("First") or {}).get("#text")
-                    result["ApplyareaSecondCode"] = (apply_area.get("Second") or {}).get("@code")
-                    result["ApplyareaSecond"] = (apply_area.get("Second") or {}).get("#text")
-                    result["ApplyareaThirdCode"] = (apply_area.get("Third") or {}).get("@code")
-                    result["ApplyareaThird"] = (apply_area.get("Third") or {}).get("#text")
-
-                    result["ContinuousFlag"] = assign.get("ContinuousFlag")
-                    result["PolicyProjectFlag"] = assign.get("PolicyProjectFlag")
-
-                    result["GovernFunds"] = assign.get("GovernmentFunds")
-                    result["SbusinessFunds"] = assign.get("SbusinessFunds")
-                    result["TotFunds"] = assign.get("TotalFunds")
-
-                    result["CorporateRegistrationNo"] = assign.get("CorporateRegistrationNumber")
-                    result["SeriesProject"] = assign.get("SeriesProject")
-
-                    results.append(result)
-
-                try:
-                    insert_ntis_assign(es, results, biz_no)
-                    insert_check_log(biz_no, "NTIS_ASSIGN", now)
-                    insert_cmp_data_log(biz_no, "NTIS_ASSIGN", len(results), now)
-                    print(f"{comp_name} - {len(ntis_assigns)}건 저장 완료")
-                    time.sleep(1)
-                except Exception as e:
-                    error_detail = traceback.format_exc()
-                    insert_error_log("Insert data","NTIS_ASSIGN", f"데이터 삽입 실패({biz_no}) : {e}", error_detail)
-            except DuplicateError as e:
-                if results:
-                    insert_ntis_rnd_paper(es, results, biz_no)
-                    insert_check_log(biz_no, "NTIS_RND_PAPER", now)
-                    print(f"{comp_name} - {len(results)}건 저장 완료")
-                    time.sleep(1)
-            except Exception as e:
-                error_detail = traceback.format_exc()
-                insert_error_log("Process company", "NTIS_ASSIGN", f"{comp_name}({biz_no}) 기업 처리중 오류 발생 : {e}", error_detail)
+        run_companies(lambda company: process_company(es, company), companies, "기업 R&D 과제목록 수집")
     finally:
         if es:
             es.close()
@@ -0,0 +1,235 @@
+import os
+import io
+import atexit
+import time
+import random
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import date, datetime, timezone
+from email.utils import parsedate_to_datetime
+from requests.adapters import HTTPAdapter
+from tqdm import tqdm
+from db.mysql import insert_error_log, add_api_call_count
+from collector.api_archive import *
+
+"""
+NTIS Open API 공통 클라이언트 (ntis_assign / ntis_org_paper / ntis_rnd_paper)
+- 연결을 재사용하는 세션 하나
+- 모든 수집기가 같이 쓰는 초당 요청 수 제한과 NTIS_API_KEY 일일 호출 수(api_quota 테이블, NTIS_QUOTA_BLOCK개씩 예약)
+- 429/5xx/연결 오류는 Retry-After(없으면 지수 백오프)만큼 기다린 뒤 재시도
+- run_companies : 기업별 처리 함수를 NTIS_WORKERS개 스레드로 병렬 실행
+- API_ARCHIVE_DIR이 있으면 원본 응답을 api_archive에 보관하고, API_REPLAY=1이면 보관된 응답으로 요청 없이 재생
+"""
+
+NTIS_API_URL = os.getenv("NTIS_API_URL", "https://www.ntis.go.kr/rndopen/openApi")
+NTIS_API_KEY = os.getenv("NTIS_API_KEY")
+
+# 동시에 처리하는 기업 수
+NTIS_WORKERS = int(os.getenv("NTIS_WORKERS", "4"))
+# 초당 최대 요청 수 (0이면 제한 없음)
+NTIS_RATE = float(os.getenv("NTIS_RATE", "5"))
+# NTIS_API_KEY의 하루 최대 호출 수 (0이면 제한 없음)
+NTIS_DAILY_QUOTA = int(os.getenv("NTIS_DAILY_QUOTA", "10000"))
+# 일일 호출 수를 api_quota에 한 번에 예약하는 단위 (남은 예약은 종료 시 되돌림)
+NTIS_QUOTA_BLOCK = int(os.getenv("NTIS_QUOTA_BLOCK", "20"))
+
+NTIS_MAX_RETRIES = 5
+NTIS_BASE_DELAY = 2
+NTIS_TIMEOUT = 60
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+QUOTA_API_NAME = "NTIS"
+
+
+class NtisQuotaError(Exception):
+    pass
+
+
+class RateLimiter:
+    def __init__(self, per_second: float):
+        self.interval = 1 / per_second if per_second > 0 else 0
+        self.next_time = 0.0
+        self.lock = threading.Lock()
+
+    # 직전 요청과의 간격이 interval이 될 때까지 대기
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_time)
+            self.next_time = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class DailyQuota:
+    # block : api_quota에 한 번에 미리 더해 두는 호출 수 (mysql 왕복은 block번 호출에 한 번)
+    def __init__(self, limit: int, block: int = 1):
+        self.limit = limit
+        self.block = max(block, 1)
+        self.lock = threading.Lock()
+        self.date = None
+        # 미리 더해 두었지만 아직 쓰지 않은 호출 수
+        self.remaining = 0
+        # mysql에 기록하지 못할 때 사용하는 실행 중 호출 수
+        self.local_count = 0
+
+    # 호출 한 번을 사용하고, 남은 예약이 없으면 block만큼 새로 예약
+    # 오늘 호출 수가 limit에 도달해서 예약할 수 없으면 NtisQuotaError
+    def acquire(self):
+        if self.limit <= 0:
+            return
+        today = date.today()
+        with self.lock:
+            if self.date != today:
+                self._release()
+                self.date = today
+                self.local_count = 0
+            if self.remaining == 0:
+                self._reserve(today)
+            self.remaining -= 1
+
+    # block만큼 더한 뒤 limit을 넘는 만큼은 되돌림 (다른 프로세스도 같은 api_quota를 사용)
+    def _reserve(self, today: date):
+        count = add_api_call_count(QUOTA_API_NAME, today, self.block)
+        self.local_count += self.block
+        if count is None:
+            count = self.local_count
+        available = min(self.block, self.limit - (count - self.block))
+        if available < self.block:
+            self._give_back(today, self.block - max(available, 0))
+        if available <= 0:
+            raise NtisQuotaError(f"NTIS 일일 호출 수 초과 ({count - self.block}/{self.limit})")
+        self.remaining = available
+
+    def _give_back(self, call_date: date, count: int):
+        self.local_count -= count
+        add_api_call_count(QUOTA_API_NAME, call_date, -count)
+
+    def _release(self):
+        if self.remaining:
+            self._give_back(self.date, self.remaining)
+            self.remaining = 0
+
+    # 쓰지 않은 예약을 api_quota에서 되돌림 (프로세스 종료 시)
+    def release(self):
+        if self.limit <= 0:
+            return
+        with self.lock:
+            self._release()
+
+
+_session = None
+_session_lock = threading.Lock()
+_rate_limiter = RateLimiter(NTIS_RATE)
+_quota = DailyQuota(NTIS_DAILY_QUOTA, NTIS_QUOTA_BLOCK)
+atexit.register(_quota.release)
+
+
+def get_ntis_session() -> requests.Session:
+    global _session
+    with _session_lock:
+        if _session is None:
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(NTIS_WORKERS, 1))
+            _session = requests.Session()
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+    return _session
+
+
+# Retry-After(초 또는 HTTP 날짜) -> 대기 시간, 없으면 None
+def get_retry_after(response: requests.Response) -> float | None:
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+# NTIS Open API 요청 (service : public_project, orgRndInfo ...)
+# stream=True이면 response.raw로 읽는 응답을 반환 (호출한 곳에서 닫아야 함)
+def ntis_get(service: str, params: dict, data_type: str, stream: bool = False) -> requests.Response:
+    if REPLAY:
+        return make_replay_response(load_archived_response("ntis", service, params))
+
+    url = f"{NTIS_API_URL.rstrip('/')}/{service}"
+    params = {"apprvKey": NTIS_API_KEY, **params}
+
+    for attempt in range(1, NTIS_MAX_RETRIES + 1):
+        delay = None
+        _quota.acquire()
+        _rate_limiter.wait()
+        try:
+            response = get_ntis_session().get(url, params=params, timeout=NTIS_TIMEOUT, stream=stream)
+            if response.status_code == 200:
+                if ARCHIVE_DIR:
+                    # 보관할 본문을 읽은 뒤 stream 응답은 읽은 본문으로 raw를 대신함 (한 페이지 분량)
+                    archive_response("ntis", service, params, response.content)
+                    if stream:
+                        response.raw = io.BytesIO(response.content)
+                return response
+
+            if response.status_code not in RETRY_STATUSES:
+                # 나머지 상태코드는 즉시 예외 처리
+                response.close()
+                response.raise_for_status()
+                raise requests.HTTPError(f"{response.status_code} {service}", response=response)
+
+            print(f"[WARN] 상태코드 {response.status_code} 발생 → 재시도")
+            delay = get_retry_after(response)
+            response.close()
+        except requests.HTTPError:
+            raise
+        except requests.RequestException as e:
+            error_log = f"{data_type} API 요청 중 예외 발생 {attempt}: {e}"
+            insert_error_log("Failed API Requests", data_type, error_log, "")
+
+        if attempt == NTIS_MAX_RETRIES:
+            break
+        # Retry-After가 없으면 지수 백오프
+        if delay is None:
+            delay = NTIS_BASE_DELAY * (2 ** (attempt - 1)) + random.uniform(0, 1)
+        print(f"[INFO] {delay:.1f}초 대기 후 재시도 ({attempt}/{NTIS_MAX_RETRIES})")
+        time.sleep(delay)
+
+    error_log = "모든 재시도 실패(ntis_get)"
+    insert_error_log("Failed All Retry", data_type, error_log, "")
+    raise Exception(error_log)
+
+
+# process(company)를 NTIS_WORKERS개 스레드로 실행 (대기 중인 작업은 스레드 수의 두 배까지만 유지)
+# 일일 호출 수를 넘으면 남은 기업은 실행하지 않고 NtisQuotaError
+def run_companies(process, companies: list, desc: str):
+    workers = max(NTIS_WORKERS, 1)
+    quota_error = None
+
+    def collect(futures):
+        nonlocal quota_error
+        for future in futures:
+            try:
+                future.result()
+            except NtisQuotaError as e:
+                quota_error = e
+            progress.update(1)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor, tqdm(total=len(companies), desc=desc, unit="개") as progress:
+        pending = set()
+        for company in companies:
+            if quota_error:
+                break
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+            pending.add(executor.submit(process, company))
+        collect(wait(pending)[0])
+
+    if quota_error:
+        raise quota_error
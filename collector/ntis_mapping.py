@@ -0,0 +1,175 @@
+import re
+import xml.etree.ElementTree as ET
+from collector.date_utils import to_year, compact_to_iso, parse_date, convert_dates
+
+"""
+NTIS 응답 필드 매핑
+수집기는 (적재 필드, 경로, 변환) 목록만 선언하고, FieldMapping이 import 시점에 경로와 변환 함수를
+필드마다 하나의 함수로 묶어 둔다. 같은 매핑을 ElementTree 요소(iterparse HIT)와
+dict(JSON / xmltodict 응답)에 그대로 적용한다.
+
+경로
+Tag/Child : 하위 태그 (dict는 키)
+Tag@attr : 속성 값 (dict는 '@attr' 키)
+Tag[@attr='v'] : 속성 값이 v인 태그 (dict는 list에서 '@attr'이 v인 항목)
+속성이 없는 경로는 태그의 텍스트 (dict 값이 dict이면 '#text')
+
+변환
+None : 값 그대로, 문자열 이름은 CONVERTERS, FieldMapping이면 하위 목록(list of dict)
+날짜 변환(year, date, parse_date)은 extract(dates=False)로 모은 레코드 목록을 convert_records에서
+date_utils.convert_dates로 서로 다른 값마다 한 번씩 변환할 수 있다 (extract_all)
+"""
+
+
+def _split(value) -> list:
+    return value.split(";")
+
+
+CONVERTERS = {
+    "year": to_year,
+    "date": compact_to_iso,
+    # 형식이 일정하지 않은 날짜 (2020-01-01, 2020.01.01 ...)
+    "parse_date": parse_date,
+    "split": _split,
+}
+
+# 레코드 목록 단위로 변환하는 날짜 변환
+DATE_CONVERTER_NAMES = {"year", "date", "parse_date"}
+
+STEP_RE = re.compile(r"^([^\[@]+)(?:\[@([^=]+)='([^']*)'\])?$")
+
+
+# 'Tag/Child@attr' -> (요소 경로 'Tag/Child', 속성 'attr', [(태그, 조건 속성, 조건 값)])
+def _parse_path(path: str) -> tuple:
+    attr = None
+    if "@" in path.rsplit("/", 1)[-1].split("[", 1)[0]:
+        path, attr = path.rsplit("@", 1)
+    steps = []
+    for step in path.split("/"):
+        match = STEP_RE.match(step)
+        if not match:
+            raise ValueError(f"지원하지 않는 경로 : {step}")
+        steps.append(match.groups())
+    return path, attr, steps
+
+
+def _element_getter(path: str, attr: str | None):
+    def get_text(elem: ET.Element):
+        child = elem.find(path)
+        if child is None:
+            return None
+        return (child.text or "").strip() or None
+
+    def get_attr(elem: ET.Element):
+        child = elem.find(path)
+        return None if child is None else child.get(attr)
+
+    return get_attr if attr else get_text
+
+
+def _dict_getter(steps: list, attr: str | None):
+    def get(data):
+        for tag, cond_attr, cond_value in steps:
+            if not isinstance(data, dict):
+                return None
+            data = data.get(tag)
+            if cond_attr:
+                items = data if isinstance(data, list) else [data]
+                data = next((item for item in items if isinstance(item, dict)
+                             and item.get(f"@{cond_attr}") == cond_value), None)
+        if attr:
+            return data.get(f"@{attr}") if isinstance(data, dict) else None
+        if isinstance(data, dict):
+            return data.get("#text")
+        return data
+
+    return get
+
+
+def _list_getters(path: str, steps: list):
+    def get_elements(elem: ET.Element) -> list:
+        return elem.findall(path)
+
+    def get_items(data) -> list:
+        for tag, _, _ in steps:
+            if not isinstance(data, dict):
+                return []
+            data = data.get(tag)
+        if data is None:
+            return []
+        return data if isinstance(data, list) else [data]
+
+    return get_elements, get_items
+
+
+class FieldMapping:
+    # fields : [(적재 필드, 경로, 변환)]
+    def __init__(self, fields: list):
+        self.fields = fields
+        # 적재 필드 -> 날짜 변환 함수 (convert_records에서 사용)
+        self.date_fields = {}
+        self._element_fields = []
+        self._dict_fields = []
+        # 날짜 필드는 변환하지 않는 목록 (extract(dates=False))
+        self._element_raw_fields = []
+        self._dict_raw_fields = []
+        for target, path, converter in fields:
+            find_path, attr, steps = _parse_path(path)
+            if isinstance(converter, FieldMapping):
+                get_elements, get_items = _list_getters(find_path, steps)
+                get_element_list = self._sub_list(get_elements, converter)
+                get_dict_list = self._sub_list(get_items, converter)
+                self._element_fields.append((target, get_element_list))
+                self._dict_fields.append((target, get_dict_list))
+                self._element_raw_fields.append((target, get_element_list))
+                self._dict_raw_fields.append((target, get_dict_list))
+                continue
+            convert = CONVERTERS[converter] if isinstance(converter, str) else converter
+            get_element = _element_getter(find_path, attr)
+            get_dict = _dict_getter(steps, attr)
+            get_element_converted = self._converted(get_element, convert)
+            get_dict_converted = self._converted(get_dict, convert)
+            self._element_fields.append((target, get_element_converted))
+            self._dict_fields.append((target, get_dict_converted))
+            if converter in DATE_CONVERTER_NAMES:
+                self.date_fields[target] = convert
+                self._element_raw_fields.append((target, get_element))
+                self._dict_raw_fields.append((target, get_dict))
+            else:
+                self._element_raw_fields.append((target, get_element_converted))
+                self._dict_raw_fields.append((target, get_dict_converted))
+
+    @staticmethod
+    def _converted(get, convert):
+        if convert is None:
+            return get
+
+        def get_converted(source):
+            value = get(source)
+            return convert(value) if value else None
+
+        return get_converted
+
+    @staticmethod
+    def _sub_list(get_items, mapping: "FieldMapping"):
+        def get_list(source) -> list:
+            return mapping.extract_all(get_items(source))
+
+        return get_list
+
+    # ElementTree 요소 또는 dict를 적재 형식으로 변환
+    # dates=False이면 날짜 필드는 원본 값 그대로 (convert_records로 목록 단위 변환)
+    def extract(self, source, dates: bool = True) -> dict:
+        if isinstance(source, ET.Element):
+            fields = self._element_fields if dates else self._element_raw_fields
+        else:
+            fields = self._dict_fields if dates else self._dict_raw_fields
+        return {target: get(source) for target, get in fields}
+
+    # extract(dates=False) 레코드 목록의 날짜 필드를 변환해서 덮어씀 (서로 다른 값마다 한 번씩)
+    def convert_records(self, records: list) -> list:
+        return convert_dates(records, self.date_fields)
+
+    # 여러 요소/dict를 변환 (날짜는 목록 단위로 변환)
+    def extract_all(self, sources: list) -> list:
+        return self.convert_records([self.extract(source, dates=False) for source in sources])
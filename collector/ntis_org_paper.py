@@ -1,69 +1,134 @@
 import os
 import requests
-import xmltodict
-import functools
+import xml.etree.ElementTree as ET
 import time
-import random
 import json
 import re
+import hashlib
 from tqdm import tqdm
 from db.mysql import *
-from datetime import datetime
-from dateutil import parser
+from datetime import datetime, timedelta
 from db.es import *
+from collector.ntis_mapping import *
+from collector.ntis_client import *
 from urllib.parse import urlencode
 
-def backoff_retry(max_retries=5, base_delay=2, allowed_statuses=(429,)):
-    def decorator(func):
-        @functools.wraps(func)
-        def wrapper(*args, **kwargs):
-            for attempt in range(1, max_retries + 1):
-                try:
-                    response = func(*args, **kwargs)
-
-                    # 정상 응답이면 JSON 반환
-                    if response.status_code == 200:
-                        return response
-
-                    # 허용된 상태코드(예: 429 Too Many Requests)
-                    elif response.status_code in allowed_statuses:
-                        print(f"[WARN] 상태코드 {response.status_code} 발생 → 재시도")
-
-                    else:
-                        # 나머지 상태코드는 즉시 예외 처리
-                        response.raise_for_status()
-
-                except Exception as e:
-                    error_log = f"NTIS ORG INFO API 요청 중 예외 발생 {attempt}: {e}"
-                    insert_error_log("Failed API Requests", "NTIS_ORG_INFO", error_log, "")
-
-                # 백오프 대기 시간 계산
-                delay = base_delay * (2 ** (attempt - 1)) + random.uniform(0, 1)
-                print(f"[INFO] {delay:.1f}초 대기 후 재시도 ({attempt}/{max_retries})")
-                time.sleep(delay)
-
-            error_log = "모든 재시도 실패(backoff_retry)"
-            insert_error_log("Failed All Retry", "NTIS_ORG_INFO", error_log, "")
-            raise Exception("모든 재시도 실패(backoff_retry)")
-        return wrapper
-    return decorator
-
-@backoff_retry(max_retries=5, base_delay=2, allowed_statuses=(429,))
-def get_ntis_org_info(biz_no: str) -> requests.Response:
-    BASE_URL = "https://www.ntis.go.kr/rndopen/openApi/orgRndInfo?"
-    API_KEY = os.getenv("NTIS_API_KEY")
+"""
+NTIS 수행 기관 정보(orgRndInfo) 수집
+연도별 현황은 1년에 한 번 정도만 바뀌므로 마지막 수집 후 NTIS_ORG_TTL_DAYS가 지나지 않은 기업은 요청하지 않고,
+다시 받은 내용의 해시가 이전과 같으면 문서를 새로 적재하지 않는다 (ntis_org_refresh 테이블).
+NTIS_ORG_FORCE_REFRESH=1이면 기간과 상관없이 모든 기업을 다시 받는다.
+"""
+
+NTIS_ORG_TTL_DAYS = float(os.getenv("NTIS_ORG_TTL_DAYS", "30"))
+NTIS_ORG_FORCE_REFRESH = os.getenv("NTIS_ORG_FORCE_REFRESH", "0") == "1"
+
+# BIZ_NO -> ntis_org_refresh row (main에서 한 번 조회)
+ORG_REFRESH_STATES = {}
 
+def get_ntis_org_info(biz_no: str) -> requests.Response:
     params = {
-        "apprvKey": API_KEY,
         "reqOrgBno": biz_no,
     }
 
-    query = urlencode(params, encoding="utf-8")
-    return requests.get(BASE_URL + query)
+    return ntis_get("orgRndInfo", params, "NTIS_ORG_INFO")
 
-def get_ntis_org_info_json(biz_no: str) -> dict:
+# 기관 정보 응답의 body 요소 (검색 결과가 없으면 None)
+def get_ntis_org_info_body(biz_no: str) -> ET.Element | None:
     response = get_ntis_org_info(biz_no)
-    return xmltodict.parse(response.text)
+    body = ET.fromstring(response.content).find("body")
+    if body is None or len(body) == 0:
+        return None
+    return body
+
+# 연도별 R&D 현황(rndStatusList) -> 적재 필드
+NTIS_ORG_STATUS_MAPPING = FieldMapping([
+    ("year", "year", "year"),
+    ("pjtCnt", "pjtCnt", None),
+    ("rndBudget", "rndBudget", None),
+    ("govBudget", "govBudget", None),
+    ("paperCnt", "paperCnt", None),
+    ("patentCnt", "patentCnt", None),
+    ("reportCnt", "reportCnt", None),
+])
+
+# 기관 정보(body) -> 적재 필드 (ntis_mapping.FieldMapping)
+NTIS_ORG_INFO_MAPPING = FieldMapping([
+    ("orgName", "orgName", None),
+    ("orgPageInfo", "orgPageInfo", None),
+    ("rndKorKeyword", "rndKorKeword", None),
+    ("rndEngKeyword", "rndEngKeword", None),
+    ("rndCategory", "rndCategory", None),
+    ("rndStatusList", "rndStatusList", NTIS_ORG_STATUS_MAPPING),
+])
+
+# 적재 내용의 해시 (필드 순서와 상관없이 같은 내용이면 같은 값)
+def get_content_hash(result: dict | None) -> str:
+    raw = json.dumps(result, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+# 마지막 수집 후 TTL이 지나지 않았으면 True (재생 모드에서는 항상 다시 변환)
+def is_fresh(biz_no: str, now: datetime) -> bool:
+    if NTIS_ORG_FORCE_REFRESH or REPLAY:
+        return False
+    state = ORG_REFRESH_STATES.get(biz_no)
+    return state is not None and state["FETCHED_AT"] + timedelta(days=NTIS_ORG_TTL_DAYS) > now
+
+# 한 기업의 수행 기관 정보 수집 (run_companies가 스레드마다 호출)
+def process_company(es, company: dict):
+    comp_name = ""
+    biz_no = ""
+    now = datetime.now()
+
+    try:
+        biz_no = company["BIZ_NO"]
+        comp_name = company["CMP_NM"]
+        clean_comp_name = re.sub(r'\(.*?\)', '', comp_name)
+
+        if is_fresh(biz_no, now):
+            return
+
+        org_info = get_ntis_org_info_body(biz_no)
+
+        if org_info is not None:
+            result = NTIS_ORG_INFO_MAPPING.extract(org_info)
+        else:
+            result = None
+            print(f"{comp_name} 검색결과 없음")
+
+        if REPLAY:
+            # 재생은 기존 문서를 다시 변환한 문서로 교체하고 수집 기록/갱신 상태는 남기지 않음
+            delete_source_docs(es, "ntis_org_info", biz_no)
+            insert_ntis_org_info(es, result, biz_no)
+            print(f"{comp_name} 재생 완료")
+            return
+
+        content_hash = get_content_hash(result)
+        state = ORG_REFRESH_STATES.get(biz_no)
+        if state and state["CONTENT_HASH"] == content_hash:
+            # 내용이 같으면 적재하지 않고 수집 시각만 갱신
+            save_org_refresh_state(biz_no, content_hash, now, state["CHANGED_AT"])
+            insert_check_log(biz_no, "NTIS_ORG_INFO", now)
+            print(f"{comp_name} 변경 없음")
+            return
+
+        try:
+            insert_ntis_org_info(es, result, biz_no)
+            insert_check_log(biz_no, "NTIS_ORG_INFO", now)
+            if result is None:
+                insert_cmp_data_log(biz_no, "NTIS_ORG_INFO", 0, now)
+            else:
+                insert_cmp_data_log(biz_no, "NTIS_ORG_INFO", len(result), now)
+            save_org_refresh_state(biz_no, content_hash, now, now)
+            print(f"{comp_name} 저장 완료")
+        except Exception as e:
+            error_detail = traceback.format_exc()
+            insert_error_log("Insert data", "NTIS_ORG_INFO", f"데이터 삽입 실패({biz_no}) : {e}", error_detail)
+    except NtisQuotaError:
+        raise
+    except Exception as e:
+        error_detail = traceback.format_exc()
+        insert_error_log("Process company", "NTIS_ORG_INFO", f"{comp_name}({biz_no}) 기업 처리중 오류 발생 : {e}", error_detail)
 
 def main():
     es = None
@@ -77,7 +142,7 @@ def main():
             raise
 
         try:
-            companies = get_cmp_list("NTIS_ORG_INFO")
+            companies = get_cmp_list("NTIS_ORG_INFO", all_companies=REPLAY)
         except Exception as e:
             insert_error_log("Get Cmp List", "NTIS_ORG_INFO", f"기업 목록 조회 실패: {e}", "")
             raise
@@ -85,65 +150,8 @@ def main():
         # with open(r"/home/bax/fncsp/db/fianl_results.json", "r", encoding="utf-8") as f:
         #     companies = json.load(f)
 
-        for idx, company in enumerate(tqdm(companies, desc="NTIS 수행 기관 정보 수집", unit="개"), 1):
-            comp_name = ""
-            biz_no = ""
-            now = datetime.now()
-
-            try:
-                biz_no = company["BIZ_NO"]
-                comp_name = company["CMP_NM"]
-                clean_comp_name = re.sub(r'\(.*?\)', '', comp_name)
-
-                ntis_org_info = get_ntis_org_info_json(biz_no)
-
-                result = {}
-
-                org_info = (ntis_org_info.get("response") or {}).get("body")
-
-                if org_info:
-                    result["orgName"] = org_info.get("orgName")
-                    result["orgPageInfo"] = org_info.get("orgPageInfo")
-                    result["rndKorKeyword"] = org_info.get("rndKorKeword")
-                    result["rndEngKeyword"] = org_info.get("rndEngKeword")
-                    result["rndCategory"] = org_info.get("rndCategory")
-
-                    status_list = []
-                    rnd_status = org_info.get("rndStatusList")
-                    rnd_status_list = rnd_status if isinstance(rnd_status, list) else [rnd_status]
-
-                    for rnd_status in rnd_status_list:
-                        status = {}
-                        status["year"] = datetime.strptime(rnd_status["year"], "%Y").strftime("%Y")
-                        status["pjtCnt"] = rnd_status.get("pjtCnt")
-                        status["rndBudget"] = rnd_status.get("rndBudget")
-                        status["govBudget"] = rnd_status.get("govBudget")
-                        status["paperCnt"] = rnd_status.get("paperCnt")
-                        status["patentCnt"] = rnd_status.get("patentCnt")
-                        status["reportCnt"] = rnd_status.get("reportCnt")
-
-                        status_list.append(status)
-
-                    result["rndStatusList"] = status_list
-                else:
-                    result = None
-                    print(f"{comp_name} 검색결과 없음")
-
-                try:
-                    insert_ntis_org_info(es, result, biz_no)
-                    insert_check_log(biz_no, "NTIS_ORG_INFO", now)
-                    if result is None:
-                        insert_cmp_data_log(biz_no, "NTIS_ORG_INFO", 0, now)
-                    else:
-                        insert_cmp_data_log(biz_no, "NTIS_ORG_INFO", len(result), now)
-                    print(f"{comp_name} 저장 완료")
-                    time.sleep(1)
-                except Exception as e:
-                    error_detail = traceback.format_exc()
-                    insert_error_log("Insert data", "NTIS_ORG_INFO", f"데이터 삽입 실패({biz_no}) : {e}", error_detail)
-            except Exception as e:
-                error_detail = traceback.format_exc()
-                insert_error_log("Process company", "NTIS_ORG_INFO", f"{comp_name}({biz_no}) 기업 처리중 오류 발생 : {e}", error_detail)
+        ORG_REFRESH_STATES.update(get_org_refresh_states())
+        run_companies(lambda company: process_company(es, company), companies, "NTIS 수행 기관 정보 수집")
     finally:
         if es:
             es.close()
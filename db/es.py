@@ -65,6 +65,117 @@ def get_application_an(es: Elasticsearch, data_type:str, biz_no:str, an:str) ->
 
     return response["hits"]["total"]["value"] > 0
 
+# 기업의 적재된 출원번호 전체를 적재시각(SearchDate)과 함께 한 번에 조회하는 함수
+def get_application_an_dates(es: Elasticsearch, data_type:str, biz_no:str) -> dict:
+    index_name = "source_data"
+
+    query_body = {
+        "query": {
+            "bool": {
+                "must": [
+                    {
+                        "term": {
+                            "DataType": {
+                                "value": data_type
+                            }
+                        }
+                    },
+                    {
+                        "term": {
+                            "BusinessNum": {
+                                "value": biz_no
+                            }
+                        }
+                    }
+                ]
+            }
+        },
+        "_source": ["Data.ApplicationNumber", "SearchDate"]
+    }
+
+    an_dates = {}
+    for hit in helpers.scan(es, index=index_name, query=query_body):
+        data = hit["_source"].get("Data") or {}
+        an = data.get("ApplicationNumber")
+        if an:
+            an_dates[an.strip()] = hit["_source"].get("SearchDate") or ""
+
+    return an_dates
+
+# 기업의 적재된 과제번호 전체를 적재시각(SearchDate)과 함께 한 번에 조회하는 함수
+def get_project_no_dates(es: Elasticsearch, data_type:str, biz_no:str) -> dict:
+    index_name = "source_data"
+
+    query_body = {
+        "query": {
+            "bool": {
+                "must": [
+                    {
+                        "term": {
+                            "DataType": {
+                                "value": data_type
+                            }
+                        }
+                    },
+                    {
+                        "term": {
+                            "BusinessNum": {
+                                "value": biz_no
+                            }
+                        }
+                    }
+                ]
+            }
+        },
+        "_source": ["Data.ProjectNo", "SearchDate"]
+    }
+
+    no_dates = {}
+    for hit in helpers.scan(es, index=index_name, query=query_body):
+        data = hit["_source"].get("Data") or {}
+        no = data.get("ProjectNo")
+        if no:
+            no_dates[no.strip()] = hit["_source"].get("SearchDate") or ""
+
+    return no_dates
+
+# 기업의 여러 DataType 출원번호를 한 번의 scan으로 조회하는 함수
+# 반환 : {DataType: {출원번호: SearchDate}} (적재된 건이 없는 DataType도 빈 dict로 포함)
+def get_company_an_dates(es: Elasticsearch, data_types: list, biz_no: str) -> dict:
+    index_name = "source_data"
+
+    query_body = {
+        "query": {
+            "bool": {
+                "must": [
+                    {
+                        "terms": {
+                            "DataType": list(data_types)
+                        }
+                    },
+                    {
+                        "term": {
+                            "BusinessNum": {
+                                "value": biz_no
+                            }
+                        }
+                    }
+                ]
+            }
+        },
+        "_source": ["DataType", "Data.ApplicationNumber", "SearchDate"]
+    }
+
+    an_dates = {data_type: {} for data_type in data_types}
+    for hit in helpers.scan(es, index=index_name, query=query_body):
+        source = hit["_source"]
+        data = source.get("Data") or {}
+        an = data.get("ApplicationNumber")
+        if an and source.get("DataType") in an_dates:
+            an_dates[source["DataType"]][an.strip()] = source.get("SearchDate") or ""
+
+    return an_dates
+
 # 프로젝트 번호로 중복인지 확인하는 함수
 def get_project_no(es: Elasticsearch, data_type:str, biz_no:str, no:str) -> bool:
     index_name = "source_data"
@@ -274,6 +385,61 @@ def insert_kipris_trade(es:Elasticsearch, kipris_trademark_attrs:list | None, bu
 
     success_count, errors = helpers.bulk(es, actions)
 
+# source_data 적재 action 생성 (docs가 비어 있으면 Data: None 문서 한 건)
+def build_source_actions(data_type: str, docs: list | None, business_num: str | None) -> list:
+    search_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")
+    return [{
+        "_index": "source_data",
+        "_source": {
+            "BusinessNum": business_num,
+            "DataType": data_type,
+            "SearchDate": search_date,
+            "SearchID": "autoSystem",
+            "Data": doc
+        }
+    } for doc in (docs or [None])]
+
+# 기업의 DataType 문서 삭제 (재생 모드에서 다시 변환한 문서로 교체할 때 사용)
+# field/values가 있으면 Data.{field} 값이 values에 있는 문서만, empty=True면 Data: None 문서만 삭제
+def delete_source_docs(es: Elasticsearch, data_type: str, biz_no: str, field: str | None = None,
+                       values: list | None = None, empty: bool = False):
+    index_name = "source_data"
+
+    query = {
+        "bool": {
+            "must": [
+                {
+                    "term": {
+                        "DataType": {
+                            "value": data_type
+                        }
+                    }
+                },
+                {
+                    "term": {
+                        "BusinessNum": {
+                            "value": biz_no
+                        }
+                    }
+                }
+            ]
+        }
+    }
+    if field:
+        if not values:
+            return
+        query["bool"]["must"].append({"terms": {f"Data.{field}": values}})
+    if empty:
+        query["bool"]["must_not"] = [{"exists": {"field": "Data"}}]
+
+    es.delete_by_query(index=index_name, body={"query": query}, conflicts="proceed", refresh=True)
+
+# 여러 DataType의 action을 한 번에 적재
+def insert_source_actions(es: Elasticsearch, actions: list):
+    if not actions:
+        return
+    success_count, errors = helpers.bulk(es, actions)
+
 def insert_naver_trend(es:Elasticsearch, naver_trend: list | None, business_num:str | None):
     if not naver_trend:
         actions = [{
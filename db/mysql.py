@@ -52,7 +52,8 @@ def insert_error_log(location, data_type, error_msg, error_detail):
 # -----------------------------------------------------
 # cmp_list 조회 함수
 # -----------------------------------------------------
-def get_cmp_list(data_type:str):
+# all_companies : True면 수집 여부와 상관없이 전체 기업 (API_REPLAY 재생용)
+def get_cmp_list(data_type:str, all_companies: bool = False):
     conn = None
     cursor = None
 
@@ -60,6 +61,15 @@ def get_cmp_list(data_type:str):
         conn = get_connection()
         cursor = conn.cursor()
 
+        if all_companies:
+            sql = """
+                  SELECT BIZ_NO, CMP_NM, CEO_NM
+                  FROM cmp_list
+                  ORDER BY BIZ_NO
+                  """
+            cursor.execute(sql)
+            return cursor.fetchall()
+
         sql = f"""
               SELECT BIZ_NO, CMP_NM, CEO_NM
               FROM cmp_list
@@ -153,4 +163,316 @@ def insert_cmp_data_log(biz_no: str, data_type:str, count:int, now:datetime):
         if cursor:
             cursor.close()
         if conn:
-            conn.close()
\ No newline at end of file
+            conn.close()
+
+# -----------------------------------------------------
+# 페이지 체크포인트 함수 (KIPRIS, NTIS_ASSIGN)
+# CREATE TABLE kipris_checkpoint (
+#     DATA_TYPE  VARCHAR(50) NOT NULL,
+#     BIZ_NO     VARCHAR(20) NOT NULL,
+#     SORT_ORDER VARCHAR(50) NOT NULL,
+#     PAGE_NO    INT NOT NULL,
+#     LAST_AN    VARCHAR(50),
+#     STARTED_AT DATETIME(6) NOT NULL,
+#     UPDATED_AT DATETIME(6) NOT NULL,
+#     PRIMARY KEY (DATA_TYPE, BIZ_NO)
+# )
+# -----------------------------------------------------
+def get_checkpoint(data_type: str, biz_no: str) -> dict | None:
+    conn = None
+    cursor = None
+
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        sql = """
+              SELECT DATA_TYPE, BIZ_NO, SORT_ORDER, PAGE_NO, LAST_AN, STARTED_AT, UPDATED_AT
+              FROM kipris_checkpoint
+              WHERE DATA_TYPE = %s AND BIZ_NO = %s
+              """
+        cursor.execute(sql, (data_type, biz_no))
+        return cursor.fetchone()
+
+    except Exception as e:
+        error_log = f"{data_type} mysql select checkpoint : " + str(e)
+        print(error_log)
+        if conn:
+            insert_error_log("Select checkpoint", data_type, error_log, "")
+        return None
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+
+
+# 페이지 적재가 끝날 때마다 호출 (STARTED_AT은 처음 저장할 때만 기록)
+def save_checkpoint(data_type: str, biz_no: str, sort_order: str, page_no: int, last_an: str | None,
+                    started_at: datetime):
+    conn = None
+    cursor = None
+
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        sql = """
+              INSERT INTO kipris_checkpoint (DATA_TYPE, BIZ_NO, SORT_ORDER, PAGE_NO, LAST_AN, STARTED_AT, UPDATED_AT)
+              VALUES (%s, %s, %s, %s, %s, %s, %s)
+              ON DUPLICATE KEY UPDATE
+                  SORT_ORDER = VALUES(SORT_ORDER),
+                  PAGE_NO = VALUES(PAGE_NO),
+                  LAST_AN = VALUES(LAST_AN),
+                  UPDATED_AT = VALUES(UPDATED_AT)
+              """
+        cursor.execute(sql, (data_type, biz_no, sort_order, page_no, last_an, started_at, datetime.now()))
+        conn.commit()
+
+    except Exception as e:
+        error_log = f"{data_type} mysql save checkpoint : " + str(e)
+        print(error_log)
+        if conn:
+            insert_error_log("Save checkpoint", data_type, error_log, "")
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+
+
+# 기업 수집이 끝나면 체크포인트 삭제
+def delete_checkpoint(data_type: str, biz_no: str):
+    conn = None
+    cursor = None
+
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        sql = """
+              DELETE FROM kipris_checkpoint
+              WHERE DATA_TYPE = %s AND BIZ_NO = %s
+              """
+        cursor.execute(sql, (data_type, biz_no))
+        conn.commit()
+
+    except Exception as e:
+        error_log = f"{data_type} mysql delete checkpoint : " + str(e)
+        print(error_log)
+        if conn:
+            insert_error_log("Delete checkpoint", data_type, error_log, "")
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+
+
+# -----------------------------------------------------
+# KIPRIS 검색결과 없음 캐시 함수
+# 검색 결과가 없었던 (DATA_TYPE, BIZ_NO)의 연속 횟수와 다음 확인 시각
+# CREATE TABLE kipris_empty_cache (
+#     DATA_TYPE       VARCHAR(50) NOT NULL,
+#     BIZ_NO          VARCHAR(20) NOT NULL,
+#     MISS_COUNT      INT NOT NULL,
+#     LAST_CHECKED_AT DATETIME(6) NOT NULL,
+#     NEXT_CHECK_AT   DATETIME(6) NOT NULL,
+#     PRIMARY KEY (DATA_TYPE, BIZ_NO)
+# )
+# -----------------------------------------------------
+# data_type의 전체 캐시를 한 번에 조회 : {BIZ_NO: row}
+def get_empty_results(data_type: str) -> dict:
+    conn = None
+    cursor = None
+
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        sql = """
+              SELECT BIZ_NO, MISS_COUNT, LAST_CHECKED_AT, NEXT_CHECK_AT
+              FROM kipris_empty_cache
+              WHERE DATA_TYPE = %s
+              """
+        cursor.execute(sql, (data_type,))
+        return {row["BIZ_NO"]: row for row in cursor.fetchall()}
+
+    except Exception as e:
+        error_log = f"{data_type} mysql select empty cache : " + str(e)
+        print(error_log)
+        if conn:
+            insert_error_log("Select empty cache", data_type, error_log, "")
+        return {}
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+
+
+def save_empty_result(data_type: str, biz_no: str, miss_count: int, checked_at: datetime, next_check_at: datetime):
+    conn = None
+    cursor = None
+
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        sql = """
+              INSERT INTO kipris_empty_cache (DATA_TYPE, BIZ_NO, MISS_COUNT, LAST_CHECKED_AT, NEXT_CHECK_AT)
+              VALUES (%s, %s, %s, %s, %s)
+              ON DUPLICATE KEY UPDATE
+                  MISS_COUNT = VALUES(MISS_COUNT),
+                  LAST_CHECKED_AT = VALUES(LAST_CHECKED_AT),
+                  NEXT_CHECK_AT = VALUES(NEXT_CHECK_AT)
+              """
+        cursor.execute(sql, (data_type, biz_no, miss_count, checked_at, next_check_at))
+        conn.commit()
+
+    except Exception as e:
+        error_log = f"{data_type} mysql save empty cache : " + str(e)
+        print(error_log)
+        if conn:
+            insert_error_log("Save empty cache", data_type, error_log, "")
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+
+
+# 검색 결과가 생기면 캐시 삭제
+def delete_empty_result(data_type: str, biz_no: str):
+    conn = None
+    cursor = None
+
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        sql = """
+              DELETE FROM kipris_empty_cache
+              WHERE DATA_TYPE = %s AND BIZ_NO = %s
+              """
+        cursor.execute(sql, (data_type, biz_no))
+        conn.commit()
+
+    except Exception as e:
+        error_log = f"{data_type} mysql delete empty cache : " + str(e)
+        print(error_log)
+        if conn:
+            insert_error_log("Delete empty cache", data_type, error_log, "")
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+
+
+# -----------------------------------------------------
+# 외부 API 일일 호출 수 함수
+# CREATE TABLE api_quota (
+#     API_NAME   VARCHAR(50) NOT NULL,
+#     CALL_DATE  DATE NOT NULL,
+#     CALL_COUNT INT NOT NULL,
+#     UPDATED_AT DATETIME(6) NOT NULL,
+#     PRIMARY KEY (API_NAME, CALL_DATE)
+# )
+# -----------------------------------------------------
+# 호출 수를 count만큼 늘리고 늘어난 오늘 호출 수를 반환 (실패하면 None)
+def add_api_call_count(api_name: str, call_date, count: int = 1) -> int | None:
+    conn = None
+    cursor = None
+
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        sql = """
+              INSERT INTO api_quota (API_NAME, CALL_DATE, CALL_COUNT, UPDATED_AT)
+              VALUES (%s, %s, %s, %s)
+              ON DUPLICATE KEY UPDATE
+                  CALL_COUNT = CALL_COUNT + VALUES(CALL_COUNT),
+                  UPDATED_AT = VALUES(UPDATED_AT)
+              """
+        cursor.execute(sql, (api_name, call_date, count, datetime.now()))
+        cursor.execute("SELECT CALL_COUNT FROM api_quota WHERE API_NAME = %s AND CALL_DATE = %s",
+                       (api_name, call_date))
+        row = cursor.fetchone()
+        conn.commit()
+        return row["CALL_COUNT"] if row else None
+
+    except Exception as e:
+        error_log = f"{api_name} mysql add api call count : " + str(e)
+        print(error_log)
+        if conn:
+            insert_error_log("Add api call count", api_name, error_log, "")
+        return None
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+
+
+# -----------------------------------------------------
+# NTIS 기관 정보 갱신 상태 함수
+# 기업별 마지막 수집 시각과 적재한 내용의 해시
+# CREATE TABLE ntis_org_refresh (
+#     BIZ_NO       VARCHAR(20) NOT NULL,
+#     CONTENT_HASH CHAR(64) NOT NULL,
+#     FETCHED_AT   DATETIME(6) NOT NULL,
+#     CHANGED_AT   DATETIME(6) NOT NULL,
+#     PRIMARY KEY (BIZ_NO)
+# )
+# -----------------------------------------------------
+# 전체 상태를 한 번에 조회 : {BIZ_NO: row}
+def get_org_refresh_states() -> dict:
+    conn = None
+    cursor = None
+
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        sql = """
+              SELECT BIZ_NO, CONTENT_HASH, FETCHED_AT, CHANGED_AT
+              FROM ntis_org_refresh
+              """
+        cursor.execute(sql)
+        return {row["BIZ_NO"]: row for row in cursor.fetchall()}
+
+    except Exception as e:
+        error_log = "NTIS_ORG_INFO mysql select refresh state : " + str(e)
+        print(error_log)
+        if conn:
+            insert_error_log("Select refresh state", "NTIS_ORG_INFO", error_log, "")
+        return {}
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+
+
+def save_org_refresh_state(biz_no: str, content_hash: str, fetched_at: datetime, changed_at: datetime):
+    conn = None
+    cursor = None
+
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        sql = """
+              INSERT INTO ntis_org_refresh (BIZ_NO, CONTENT_HASH, FETCHED_AT, CHANGED_AT)
+              VALUES (%s, %s, %s, %s)
+              ON DUPLICATE KEY UPDATE
+                  CONTENT_HASH = VALUES(CONTENT_HASH),
+                  FETCHED_AT = VALUES(FETCHED_AT),
+                  CHANGED_AT = VALUES(CHANGED_AT)
+              """
+        cursor.execute(sql, (biz_no, content_hash, fetched_at, changed_at))
+        conn.commit()
+
+    except Exception as e:
+        error_log = "NTIS_ORG_INFO mysql save refresh state : " + str(e)
+        print(error_log)
+        if conn:
+            insert_error_log("Save refresh state", "NTIS_ORG_INFO", error_log, "")
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
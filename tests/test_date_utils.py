@@ -0,0 +1,121 @@
+from datetime import datetime
+import pytest
+from dateutil import parser
+from collector import date_utils
+from collector.date_utils import to_year, dotted_to_iso, compact_to_iso, parse_date, news_date_to_iso, convert_dates
+
+"""
+date_utils 테스트
+정규식 빠른 경로의 결과와 오류가 기존 변환(strptime / dateutil parser.parse)과 같은지 비교한다.
+"""
+
+
+# 기존 변환 (date_utils 이전 수집기 코드)
+def old_year(value: str) -> str:
+    return datetime.strptime(value, "%Y").strftime("%Y")
+
+
+def old_dotted(value: str) -> str:
+    return datetime.strptime(value, "%Y.%m.%d").strftime("%Y-%m-%d")
+
+
+def old_compact(value: str) -> str:
+    return datetime.strptime(value, "%Y%m%d").strftime("%Y-%m-%d")
+
+
+def old_parse(value: str) -> str:
+    return parser.parse(value).strftime("%Y-%m-%d")
+
+
+def old_news(value: str) -> str:
+    s = value.strip().replace("오전", "AM").replace("오후", "PM")
+    for fmt in ("%Y.%m.%d. %p %I:%M", "%Y.%m.%d %p %I:%M"):
+        try:
+            return datetime.strptime(s, fmt).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    raise ValueError(value)
+
+
+# 기존 변환의 결과 또는 ValueError
+def outcome(convert, value: str):
+    try:
+        return convert(value)
+    except (ValueError, OverflowError):
+        return ValueError
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    for convert in (date_utils._to_year, dotted_to_iso, compact_to_iso, parse_date, news_date_to_iso):
+        convert.cache_clear()
+
+
+@pytest.mark.parametrize("value", ["2021", "1999", "0999", "0000", "202", "20211", "2021 ", "abcd", ""])
+def test_to_year_matches_strptime(value):
+    assert outcome(to_year, value) == outcome(old_year, value)
+
+
+@pytest.mark.parametrize("value", [
+    "2021.03.05", "2021.3.5", "2021.12.31", "2024.02.29", "2023.02.29", "2021.13.01", "2021.00.10",
+    "2021.01.32", "2021.1.001", "2021.03.05.", "2021-03-05", "21.03.05", "2021.03", "0999.03.05", "0000.03.05",
+    "",
+])
+def test_dotted_to_iso_matches_strptime(value):
+    assert outcome(dotted_to_iso, value) == outcome(old_dotted, value)
+
+
+@pytest.mark.parametrize("value", [
+    "20210305", "20241231", "20240229", "20230229", "20211301", "20210100", "2021035", "202103051",
+    "2021-03-05", "09990305", "00000305", "",
+])
+def test_compact_to_iso_matches_strptime(value):
+    assert outcome(compact_to_iso, value) == outcome(old_compact, value)
+
+
+@pytest.mark.parametrize("value", [
+    # 빠른 경로 (YYYYMMDD, 구분자 + 선택적인 시각)
+    "20210305", "2021-03-05", "2021.03.05", "2021/03/05", "2021-3-5", "2021.3.5.", " 2021-03-05 ",
+    "2021-03-05 12:30", "2021-03-05T12:30:45", "2021-03-05 09:05:07.123", "2021.03.05 23:59",
+    "2021.3.5. 7:05", "2021-03-05 00:00:59.5",
+    # 유효하지 않은 날짜
+    "2021-02-30", "2021-13-01", "20211301", "2021.00.05",
+    # dateutil로 넘어가는 형식
+    "2021-03.05", "2021-03-05 24:00", "2021-03-05 23:60", "2021-03-05 12:30:60", "0999-03-05",
+    "Mar 5 2021", "2021년 3월 5일",
+])
+def test_parse_date_matches_dateutil(value):
+    assert outcome(parse_date, value) == outcome(old_parse, value)
+
+
+@pytest.mark.parametrize("value", [
+    "2021.03.05. 오후 3:12", "2021.03.05. 오전 11:59", "2021.3.5. 오후 12:00", "2021.03.05 오후 3:12",
+    " 2021.03.05. 오전 9:01 ", "2021.03.05. PM 3:12", "2021.02.30. 오후 3:12", "2021.03.05. 오후 13:12",
+    "2021.03.05. 오후 0:12", "2021.03.05. 오후 3:60", "2021.03.05", "2021-03-05 오후 3:12",
+    "0999.03.05. 오후 3:12",
+])
+def test_news_date_to_iso_matches_strptime(value):
+    assert outcome(news_date_to_iso, value) == outcome(old_news, value)
+
+
+def test_convert_dates_converts_each_value_once():
+    calls = []
+
+    def convert(value):
+        calls.append(value)
+        return compact_to_iso(value)
+
+    records = [{"Start": "20210305"}, {"Start": "20210305"}, {"Start": ""}, {"Start": None}, {"Other": 1}]
+    assert convert_dates(records, {"Start": convert}) is records
+    assert records == [{"Start": "2021-03-05"}, {"Start": "2021-03-05"}, {"Start": None}, {"Start": None},
+                       {"Other": 1}]
+    assert calls == ["20210305"]
+
+
+def test_convert_dates_errors():
+    with pytest.raises(ValueError):
+        convert_dates([{"NewsDate": "2021.03.05. 오후 3:12"}, {"NewsDate": "어제"}], {"NewsDate": "news"})
+
+    records = convert_dates([{"NewsDate": "2021.03.05. 오후 3:12"}, {"NewsDate": "어제"}], {"NewsDate": "news"},
+                            errors="none")
+    assert [record["NewsDate"] for record in records] == ["2021-03-05", None]
@@ -0,0 +1,147 @@
+import json
+import os
+import pytest
+import collector.kipris_extractor.kipris_network as network
+from collector.kipris_extractor.kipris_snapshot import load_snapshot
+from collector.kipris_extractor.kipris_utils import By
+from benchmarks.kipris_extractor_bench import extract_snapshot
+
+"""
+XHR 백엔드 테스트
+benchmarks/snapshots의 응답 항목({category}_{출원번호}.json, archive_payload_snapshot 형식)을
+performance 로그로 흘려보내는 가짜 WebDriver로 응답 매핑과 DOM 추출 결과를 비교한다.
+"""
+
+SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "benchmarks", "snapshots")
+
+SNAPSHOTS = {
+    "patent": "1020240000001",
+    "design": "3020240000001",
+    "trademark": "4020240000001",
+}
+
+
+class FakeDriver:
+    session_id = "test-session"
+
+    def __init__(self):
+        self.logs = []
+        self.bodies = {}
+
+    # 결과 리스트 응답 한 건을 performance 로그에 추가
+    def respond(self, payload):
+        request_id = str(len(self.bodies))
+        self.bodies[request_id] = json.dumps(payload, ensure_ascii=False)
+        message = {"method": "Network.responseReceived",
+                   "params": {"requestId": request_id, "response": {"mimeType": "application/json"}}}
+        self.logs.append({"message": json.dumps({"message": message})})
+
+    def get_log(self, log_type):
+        logs, self.logs = self.logs, []
+        return logs
+
+    def execute_cdp_cmd(self, cmd, params):
+        return {"body": self.bodies[params["requestId"]]}
+
+
+def load_payload(category: str) -> dict:
+    with open(os.path.join(SNAPSHOT_DIR, f"{category}_{SNAPSHOTS[category]}.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+# 상세화면 DOM 추출 결과 (서지정보 섹션 + 상세화면 명칭)
+def load_dom_record(category: str) -> dict:
+    file_name = f"{category}_{SNAPSHOTS[category]}.html"
+    root = load_snapshot(os.path.join(SNAPSHOT_DIR, file_name))
+    title = root.find_element(By.TAG_NAME, "h2").text
+    if category == "patent":
+        title += " " + root.find_element(By.CSS_SELECTOR, ".title-area p").text
+    record = {"InventionTitle": title}
+    for (_, name, _), output in extract_snapshot(category, root, file_name).items():
+        if name.endswith("_bibliography"):
+            record.update(output)
+    return record
+
+
+@pytest.fixture
+def xhr(monkeypatch):
+    monkeypatch.setattr(network, "KIPRIS_BACKEND", "xhr")
+    monkeypatch.setattr(network, "XHR_VERIFY_CARDS", 1)
+    monkeypatch.setattr(network, "CAPTURED_RECORDS", {})
+    monkeypatch.setattr(network, "PAYLOAD_VERIFIED", {})
+
+
+@pytest.mark.parametrize("category", ["design", "trademark"])
+def test_payload_record_matches_dom(category):
+    captured = network.map_payload_item(category, load_payload(category))
+    dom_record = load_dom_record(category)
+
+    assert network.payload_covers(category)
+    assert network.payload_mismatches(category, dom_record, captured) == []
+    assert network.payload_record(category, captured) == {k: v for k, v in dom_record.items() if v is not None}
+
+
+def test_patent_payload_mismatches_are_reported():
+    captured = network.map_payload_item("patent", load_payload("patent"))
+
+    assert captured["IPCNumber"] == ["H04W72/04", "H04L5/00"]
+    assert captured["ExaminationCount"] == 12
+    # 응답 명칭에는 영문 명칭이 없고, 출원인은 DOM 추출(공백 분리)과 형태가 다름
+    assert network.payload_mismatches("patent", load_dom_record("patent"), captured) == [
+        "InventionTitle", "ApplicantName",
+    ]
+
+
+@pytest.mark.parametrize("category", ["design", "trademark"])
+def test_verified_payload_skips_detail_page(xhr, category):
+    driver = FakeDriver()
+    an = SNAPSHOTS[category]
+    dom_record = load_dom_record(category)
+    opened = []
+
+    # 첫 카드는 상세화면을 열어 DOM 결과와 비교
+    driver.respond({"resultList": [load_payload(category)]})
+    record = network.extract_record(driver, category, an, lambda: opened.append(an), lambda: dict(dom_record),
+                                    payload_only=True)
+    assert opened == [an]
+    assert record == dom_record
+    assert network.payload_verified(category)
+
+    # 확인된 뒤에는 상세화면을 열지 않고 응답으로 같은 레코드를 만든다
+    driver.respond({"resultList": [load_payload(category)]})
+    record = network.extract_record(driver, category, an, lambda: opened.append(an),
+                                    lambda: pytest.fail("DOM 추출을 하면 안 됨"), payload_only=True)
+    assert opened == [an]
+    assert record == {k: v for k, v in dom_record.items() if v is not None}
+
+
+def test_mismatch_falls_back_to_dom(xhr):
+    driver = FakeDriver()
+    an = SNAPSHOTS["patent"]
+    dom_record = load_dom_record("patent")
+    opened = []
+
+    for _ in range(2):
+        driver.respond({"resultList": [load_payload("patent")]})
+        record = network.extract_record(driver, "patent", an, lambda: opened.append(an), lambda: dict(dom_record),
+                                        payload_only=True)
+        assert record == dom_record
+
+    assert opened == [an, an]
+    assert network.PAYLOAD_VERIFIED["patent"] is False
+
+
+def test_other_sections_always_open_detail(xhr):
+    driver = FakeDriver()
+    an = SNAPSHOTS["design"]
+    network.PAYLOAD_VERIFIED["design"] = 10
+    opened = []
+
+    driver.respond({"resultList": [load_payload("design")]})
+    record = network.extract_record(driver, "design", an, lambda: opened.append(an), lambda: {"Inventor": ["홍길동"]},
+                                    payload_only=False)
+
+    assert opened == [an]
+    # DOM에 없는 서지정보 필드는 응답 값으로 채움
+    assert record["Inventor"] == ["홍길동"]
+    assert record["ApplicationDate"] == "2024-01-05"
@@ -0,0 +1,158 @@
+import gzip
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import pytest
+import collector.kipris_extractor.kipris_openapi as openapi
+
+"""
+KIPRIS Plus Open API 수집 함수(iter_api_page / iter_api_records) 테스트
+로컬 http.server를 KIPRIS_API_URL 대신 사용한다. 네트워크는 사용하지 않는다.
+"""
+
+
+def make_item(an: str, **fields) -> str:
+    item = {"applicationNumber": an, "applicationDate": "20240101", "registerStatus": "공개",
+            "inventionTitle": f"발명 {an}", **fields}
+    return "<item>" + "".join(f"<{k}>{v}</{k}>" for k, v in item.items() if v is not None) + "</item>"
+
+
+def make_response(items: list, total: int, result_code: str = "00", result_msg: str = "NORMAL SERVICE.") -> bytes:
+    return (f"<?xml version=\"1.0\" encoding=\"UTF-8\"?><response>"
+            f"<header><resultCode>{result_code}</resultCode><resultMsg>{result_msg}</resultMsg></header>"
+            f"<body><items>{''.join(items)}</items><count><totalCount>{total}</totalCount></count></body>"
+            f"</response>").encode("utf-8")
+
+
+class StandInServer:
+    def __init__(self):
+        # pageNo -> 응답 본문
+        self.pages = {}
+        # 응답 전에 먼저 보낼 (상태코드, 헤더) 목록
+        self.failures = []
+        self.gzip = False
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                params = {k: v[0] for k, v in parse_qs(url.query).items()}
+                server.requests.append((url.path, params))
+                if server.failures:
+                    status, headers = server.failures.pop(0)
+                    self.send_response(status)
+                    for key, value in headers.items():
+                        self.send_header(key, value)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                body = server.pages.get(int(params.get("pageNo", 1)), make_response([], 0))
+                self.send_response(200)
+                self.send_header("Content-Type", "application/xml; charset=utf-8")
+                if server.gzip:
+                    body = gzip.compress(body)
+                    self.send_header("Content-Encoding", "gzip")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/kipo-api/kipi"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def page_numbers(self) -> list:
+        return [int(params["pageNo"]) for _, params in self.requests]
+
+
+@pytest.fixture
+def server(monkeypatch):
+    stand_in = StandInServer()
+    stand_in.thread.start()
+    monkeypatch.setattr(openapi, "KIPRIS_API_URL", stand_in.url)
+    monkeypatch.setattr(openapi, "KIPRIS_API_KEY", "test-key")
+    monkeypatch.setattr(openapi, "API_PAGE_SIZE", 2)
+    # 테스트마다 새 세션 (재시도 설정도 새로 적용)
+    monkeypatch.setattr(openapi, "_session", None)
+    yield stand_in
+    stand_in.httpd.shutdown()
+    stand_in.httpd.server_close()
+
+
+def test_iter_api_page_streams_items_and_fills_meta(server):
+    server.pages[1] = make_response([make_item("1020240000001"), make_item("1020240000002")], total=2)
+
+    meta = {}
+    items = list(openapi.iter_api_page("patent", "1234567890", 1, meta))
+
+    assert [item["applicationNumber"] for item in items] == ["1020240000001", "1020240000002"]
+    assert meta == {"result_code": "00", "result_msg": "NORMAL SERVICE.", "total": 2}
+    path, params = server.requests[0]
+    assert path.endswith("/patUtiModInfoSearchSevice/getAdvancedSearch")
+    assert params["applicant"] == "1234567890"
+    assert params["patent"] == "true" and params["utility"] == "false"
+    assert params["numOfRows"] == "2" and params["ServiceKey"] == "test-key"
+
+
+def test_iter_api_page_decodes_gzip_stream(server):
+    server.gzip = True
+    server.pages[1] = make_response([make_item("3020240000001")], total=1)
+
+    items = list(openapi.iter_api_page("design", "1234567890", 1, {}))
+
+    assert [item["applicationNumber"] for item in items] == ["3020240000001"]
+    assert server.requests[0][1]["applicantName"] == "1234567890"
+
+
+def test_iter_api_page_raises_on_error_result_code(server):
+    server.pages[1] = make_response([], total=0, result_code="30", result_msg="SERVICE KEY IS NOT REGISTERED")
+
+    with pytest.raises(openapi.KiprisApiError):
+        list(openapi.iter_api_page("patent", "1234567890", 1, {}))
+
+
+def test_iter_api_page_retries_after_429(server):
+    server.failures = [(429, {"Retry-After": "0"}), (503, {"Retry-After": "0"})]
+    server.pages[1] = make_response([make_item("1020240000001")], total=1)
+
+    items = list(openapi.iter_api_page("patent", "1234567890", 1, {}))
+
+    assert len(items) == 1
+    assert len(server.requests) == 3
+
+
+def test_iter_api_records_pages_until_total(server):
+    server.pages[1] = make_response([make_item("1020240000005"), make_item("1020240000004")], total=5)
+    server.pages[2] = make_response([make_item("1020240000003"), make_item(None)], total=5)
+    server.pages[3] = make_response([make_item("1020240000001", ipcNumber="G06F 17/30(2006.01)|H04L 9/00")], total=5)
+
+    records = list(openapi.iter_api_records("patent", "1234567890"))
+
+    # 출원번호 없는 항목은 제외하고 페이지 번호와 함께 반환
+    assert [(page_no, record["ApplicationNumber"]) for page_no, record in records] == [
+        (1, "1020240000005"), (1, "1020240000004"), (2, "1020240000003"), (3, "1020240000001"),
+    ]
+    assert records[0][1]["ApplicationDate"] == "2024-01-01"
+    assert records[-1][1]["IPCNumber"] == ["G06F17/30", "H04L9/00"]
+    assert server.page_numbers() == [1, 2, 3]
+
+
+def test_iter_api_records_resumes_from_start_page(server):
+    server.pages[2] = make_response([make_item("1020240000002")], total=3)
+
+    records = list(openapi.iter_api_records("trademark", "1234567890", start_page=2))
+
+    assert [record["ApplicationNumber"] for _, record in records] == ["1020240000002"]
+    assert server.page_numbers() == [2]
+
+
+def test_iter_api_records_stops_on_empty_page(server):
+    server.pages[1] = make_response([make_item("1020240000002"), make_item("1020240000001")], total=10)
+
+    records = list(openapi.iter_api_records("utility", "1234567890"))
+
+    assert len(records) == 2
+    assert server.page_numbers() == [1, 2]
@@ -0,0 +1,117 @@
+import threading
+from datetime import datetime
+import pytest
+import collector.kipris_scheduler as kipris_scheduler
+from collector.kipris_scheduler import KiprisScheduler, SplitCompany
+
+"""
+KIPRIS 병렬 수집 스케줄러 테스트
+작업 순서(next_job), 페이지 범위 완료(finish_range), 중복 이후 범위 건너뛰기(stop/skip)와
+범위 작업의 페이지당 건수 확인을 브라우저/ES 없이 확인한다.
+"""
+
+SPEC = {"category": "patent", "data_type": "KIPRIS_PATENT", "es_data_type": "kipris_patent", "label": "특허"}
+
+
+def make_split(pending: int = 0, page_size: int = 90) -> SplitCompany:
+    split = SplitCompany(SPEC, {"BIZ_NO": "1234567890", "CMP_NM": "예시전자"}, {}, datetime(2024, 1, 1), page_size)
+    split.pending = pending
+    return split
+
+
+def test_next_job_alternates_companies_and_ranges():
+    companies = [{"BIZ_NO": str(i), "CMP_NM": f"기업{i}"} for i in range(3)]
+    scheduler = KiprisScheduler([SPEC], companies)
+    split = make_split()
+    scheduler.add_ranges(split, [(21, 40), (41, 60), (61, 80)])
+
+    kinds = []
+    while True:
+        job = scheduler.next_job()
+        if job is None:
+            break
+        kinds.append(job[0])
+        scheduler.done_job()
+
+    assert kinds == ["company", "range", "company", "range", "company", "range"]
+
+
+def test_next_job_waits_for_running_job_to_add_ranges():
+    scheduler = KiprisScheduler([SPEC], [{"BIZ_NO": "1", "CMP_NM": "기업1"}])
+    assert scheduler.next_job()[0] == "company"
+
+    jobs = []
+    waiter = threading.Thread(target=lambda: jobs.append(scheduler.next_job()))
+    waiter.start()
+    # 실행 중인 기업 작업이 범위를 추가하면 기다리던 워커가 받음
+    scheduler.add_ranges(make_split(), [(21, 40)])
+    waiter.join(timeout=5)
+
+    assert jobs and jobs[0][0] == "range"
+
+
+def test_finish_range_completes_exactly_once():
+    split = make_split(pending=50)
+    results = []
+    barrier = threading.Barrier(50)
+
+    def finish(index: int):
+        barrier.wait()
+        results.append(split.finish_range(1, index == 7))
+
+    threads = [threading.Thread(target=finish, args=(i,)) for i in range(50)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results.count(True) == 1
+    assert split.count == 50
+    assert split.failed
+
+
+def test_stop_page_skips_later_ranges():
+    split = make_split()
+    split.stop((41, 60))
+
+    assert not split.skip((21, 40))
+    assert not split.skip((41, 60))
+    assert split.skip((61, 80))
+
+    # 앞쪽 범위에서 중복을 만나면 더 앞에서 멈춤
+    split.stop((21, 40))
+    assert split.skip((41, 60))
+    assert split.stop_page == 40
+    assert split.duplicate
+
+
+def test_range_job_fails_when_page_size_changed(monkeypatch):
+    collected = []
+    errors = []
+    completed = []
+
+    def iter_company_records(driver, es, spec, biz_no, comp_name, checkpoint, an_dates, page_range=None,
+                             on_total=None):
+        on_total(300, 10, 30)
+        collected.append(page_range)
+        yield from ()
+
+    class Writer:
+        def __init__(self, es, spec, biz_no):
+            self.count = 0
+
+        def flush(self):
+            pass
+
+    monkeypatch.setattr(kipris_scheduler, "iter_company_records", iter_company_records)
+    monkeypatch.setattr(kipris_scheduler, "PageWriter", Writer)
+    monkeypatch.setattr(kipris_scheduler, "insert_error_log", lambda *args: errors.append(args))
+    monkeypatch.setattr(kipris_scheduler, "complete_split", lambda es, split: completed.append(split))
+
+    split = make_split(pending=1, page_size=90)
+    kipris_scheduler.run_range_job(KiprisScheduler([SPEC], []), None, None, split, (21, 40))
+
+    assert collected == []
+    assert split.failed
+    assert completed == [split]
+    assert "페이지당 건수" in errors[0][2]
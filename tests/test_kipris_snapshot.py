@@ -0,0 +1,128 @@
+import os
+import shutil
+import pytest
+from collector.kipris_extractor.kipris_snapshot import SnapshotElement, load_snapshot
+from benchmarks.kipris_extractor_bench import find_snapshots, extract_snapshot
+
+"""
+benchmarks/snapshots의 상세정보 HTML 샘플을 SnapshotElement로 읽어서
+섹션 추출 함수가 적재 필드를 그대로 반환하는지 확인한다. 네트워크는 사용하지 않는다.
+"""
+
+SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "benchmarks", "snapshots")
+
+
+def extract(category: str, an: str) -> dict:
+    file_name = f"{category}_{an}.html"
+    root = load_snapshot(os.path.join(SNAPSHOT_DIR, file_name))
+    assert isinstance(root, SnapshotElement)
+    return {(name.split(".", 1)[1], title): output
+            for (_, name, title), output in extract_snapshot(category, root, file_name).items()}
+
+
+def test_snapshot_corpus_has_every_category():
+    categories = {category for category, _ in find_snapshots(SNAPSHOT_DIR)}
+    assert categories == {"patent", "utility", "design", "trademark"}
+
+
+def test_patent_extractors_on_snapshot():
+    outputs = extract("patent", "1020240000001")
+
+    assert outputs[("extract_patent_bibliography", "서지정보")] == {
+        "IPCNumber": ["H04W72/04", "H04L5/00"],
+        "CPCNumber": ["H04W72/0453"],
+        "ApplicationNumber": "1020240000001",
+        "ApplicationDate": "2024-01-05",
+        "ApplicantName": ["주식회사", "예시전자"],
+        "RegisterNumber": "1029990000001",
+        "RegisterDate": "2024-06-10",
+        "OpenNumber": "1020240011111",
+        "OpenDate": "2024-02-01",
+        "RegisterStatus": "등록",
+        "ExaminationCount": 12,
+        "AstrtCont": "본 발명은 무선 통신 장치에 관한 것으로, 자원 할당을 제어하는 방법을 제공한다.",
+    }
+    assert outputs[("extract_patent_people_info", "인명정보")] == {"InventorCount": 2}
+    assert outputs[("extract_citations", "인용/피인용")] == {
+        "BackwardCitation": [{"FCCountry": "KR", "FCNumber": "1020190012345", "FCDate": "2019-03-02",
+                              "FCTitle": "무선 자원 할당 방법", "FCIPC": "H04W72/04"}],
+        "ForwardCitation": None,
+    }
+    assert outputs[("extract_family_info", "패밀리정보")] == {
+        "Family": [{"FamilyNumber": "US20250012345", "FamilyCountrycode": "US", "FamilyCountryname": "미국",
+                    "FamilyType": "공개"}],
+        "DOCDBFamily": None,
+    }
+    assert outputs[("extract_national_rnd", "국가연구개발사업")] == {
+        "ResearchData": {"ResearchDepartment": "과학기술정보통신부", "ResearchInstitution": "주식회사 예시전자",
+                         "ResearchBusiness": "정보통신방송기술개발", "ResearchProject": "차세대 무선 자원 관리 기술 개발"},
+    }
+
+
+def test_utility_extractors_on_snapshot():
+    outputs = extract("utility", "2020240000001")
+
+    bibliography = outputs[("extract_patent_bibliography", "서지정보")]
+    assert bibliography["ApplicationNumber"] == "2020240000001"
+    assert bibliography["ExaminationCount"] == 3
+    # 실용신안은 인용을 ForwardCitation으로 적재
+    citations = outputs[("extract_citations", "인용/피인용")]
+    assert citations["ForwardCitation"][0]["FCNumber"] == "1020190012345"
+    assert citations["BackwardCitation"] is None
+
+
+def test_design_extractors_on_snapshot():
+    outputs = extract("design", "3020240000001")
+
+    assert outputs[("extract_design_bibliography", "서지정보")] == {
+        "RegisterStatus": "등록",
+        "DesignClass": "H5-22",
+        "LocarnoClass": "14-03",
+        "ApplicationNumber": "3020240000001",
+        "ApplicationDate": "2024-01-05",
+        "RegisterNumber": "3012340000001",
+        "RegisterDate": "2024-05-20",
+        "OpenNumber": "3020240000555",
+        "OpenDate": "2024-02-15",
+    }
+    assert outputs[("extract_design_people_info", "인명정보")] == {"Applicant": ["주식회사 예시디자인"]}
+    assert outputs[("extract_design_people_info", "창작자")] == {"Inventor": ["홍길동", "김영희"]}
+    assert outputs[("extract_design_people_info", "대리인")] == {"Agent": ["특허법인 예시"]}
+
+
+def test_trademark_extractors_on_snapshot():
+    outputs = extract("trademark", "4020240000001")
+
+    assert outputs[("extract_trademark_bibliography", "서지정보")] == {
+        "RegisterStatus": "출원",
+        "Classification": "09",
+        "ApplicationNumber": "4020240000001",
+        "ApplicationDate": "2024-01-05",
+        "RegisterNumber": None,
+        "RegisterDate": None,
+        "AppIPubINumber": "4020240077777",
+        "AppIPubIDate": "2024-04-01",
+    }
+    assert outputs[("extract_trademark_people_info", "인명정보")] == {
+        "Applicant": ["주식회사 예시전자"], "Agent": ["특허법인 예시"],
+    }
+    assert outputs[("extract_trademark_vienna", "도형분류비엔나코드")] == {"ViennaCode": ["270501", "261101"]}
+
+
+# Chrome이 설치된 환경에서만 : 같은 스냅샷을 file://로 열어 WebDriver 추출 결과와 비교
+@pytest.mark.skipif(not (shutil.which("google-chrome") or shutil.which("chromium")), reason="Chrome 없음")
+def test_snapshot_matches_selenium():
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+
+    opts = webdriver.ChromeOptions()
+    opts.add_argument("--headless=new")
+    driver = webdriver.Chrome(options=opts)
+    try:
+        for category, path in find_snapshots(SNAPSHOT_DIR):
+            file_name = os.path.basename(path)
+            driver.get("file://" + os.path.abspath(path))
+            selenium = extract_snapshot(category, driver.find_element(By.ID, "mainResultDetail"), file_name)
+            assert extract_snapshot(category, load_snapshot(path), file_name) == selenium
+    finally:
+        driver.quit()
@@ -0,0 +1,43 @@
+import pytest
+import collector.kipris_extractor.kipris_trace as kipris_trace
+
+"""
+WebDriver 명령 계측 테스트 : 카드는 출원번호 한 건씩 따로 재서 카드당 분포로 요약하는지
+"""
+
+
+class CommandDriver:
+    def execute(self, driver_command, params=None):
+        return {"value": None}
+
+
+@pytest.fixture
+def driver(monkeypatch):
+    monkeypatch.setattr(kipris_trace, "TRACE_WEBDRIVER", True)
+    monkeypatch.setattr(kipris_trace, "DRIVER_STATS", {})
+    monkeypatch.setattr(kipris_trace, "CARD_STATS", {})
+    return kipris_trace.instrument_driver(CommandDriver())
+
+
+def test_card_distribution_is_per_card(driver):
+    for an, commands in (("1020240000001", 2), ("1020240000002", 6), ("1020240000003", 4)):
+        with kipris_trace.trace_card("patent", an):
+            for _ in range(commands):
+                driver.execute("findElement")
+    # 카드 밖의 명령은 카드 분포에 포함하지 않음
+    driver.execute("executeScript")
+
+    card = kipris_trace.get_driver_summary()["card"]["patent"]
+    assert card["count"] == 3
+    assert card["mean_commands"] == 4.0
+    assert card["max_commands"] == 6
+    assert card["slowest_an"] in {"1020240000001", "1020240000002", "1020240000003"}
+
+
+def test_section_scope_counts_commands_inside_card(driver):
+    with kipris_trace.trace_card("design", "3020240000001"):
+        kipris_trace.run_extractor("서지정보", lambda: driver.execute("findElements"))
+
+    summary = kipris_trace.get_driver_summary()
+    assert summary["section"]["서지정보"]["commands"] == 1
+    assert summary["card"]["design"]["max_commands"] == 1
@@ -0,0 +1,56 @@
+import pytest
+import collector.kipris_extractor.kipris_utils as kipris_utils
+
+"""
+go_to_page 테스트 : 페이지 번호 이동 후 화면의 현재 페이지 번호로 확인하는지
+페이지 이동 스크립트와 현재 페이지 번호를 흉내 내는 가짜 WebDriver를 사용한다.
+"""
+
+
+class PagingDriver:
+    # jump : 페이지 번호 이동 스크립트가 실제로 이동시키는 페이지 (요청 페이지 -> 이동한 페이지)
+    def __init__(self, page: int, jump, readable: bool = True):
+        self.page = page
+        self.jump = jump
+        self.readable = readable
+
+    def execute_script(self, script, *args):
+        if script == kipris_utils.GO_TO_PAGE_SCRIPT:
+            self.page = self.jump(args[0])
+            return True
+        if script == kipris_utils.ACTIVE_PAGE_SCRIPT:
+            return self.page if self.readable else None
+        raise AssertionError(script)
+
+
+@pytest.fixture(autouse=True)
+def paging(monkeypatch):
+    def go_next_page(driver):
+        driver.page += 1
+
+    monkeypatch.setattr(kipris_utils, "go_next_page", go_next_page)
+    monkeypatch.setattr(kipris_utils, "get_mutation_count", lambda driver: 0)
+    monkeypatch.setattr(kipris_utils, "wait_for_result_update", lambda *args: None)
+
+
+def test_go_to_page_jumps_directly():
+    driver = PagingDriver(1, lambda page: page)
+    kipris_utils.go_to_page(driver, 7, 1)
+    assert driver.page == 7
+
+
+@pytest.mark.parametrize("landed", [1, 3])
+def test_go_to_page_continues_with_next_when_jump_falls_short(landed):
+    driver = PagingDriver(1, lambda page: landed)
+    kipris_utils.go_to_page(driver, 5, 1)
+    assert driver.page == 5
+
+
+def test_go_to_page_raises_when_jump_overshoots():
+    with pytest.raises(kipris_utils.PageNavigationError):
+        kipris_utils.go_to_page(PagingDriver(1, lambda page: 9), 5, 1)
+
+
+def test_go_to_page_raises_when_active_page_is_unknown():
+    with pytest.raises(kipris_utils.PageNavigationError):
+        kipris_utils.go_to_page(PagingDriver(1, lambda page: page, readable=False), 5, 1)
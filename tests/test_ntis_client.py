@@ -0,0 +1,209 @@
+import threading
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import pytest
+import requests
+import collector.ntis_client as ntis_client
+
+"""
+NTIS Open API 공통 클라이언트(ntis_get / DailyQuota / run_companies) 테스트
+로컬 http.server를 NTIS_API_URL 대신, dict를 api_quota 테이블 대신 사용한다. 네트워크와 mysql은 사용하지 않는다.
+"""
+
+
+class StandInServer:
+    def __init__(self):
+        # 응답 전에 먼저 보낼 (상태코드, 헤더) 목록
+        self.failures = []
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                server.requests.append((url.path, {k: v[0] for k, v in parse_qs(url.query).items()}))
+                status, headers = server.failures.pop(0) if server.failures else (200, {})
+                body = b"<RESULT><TOTALHITS>0</TOTALHITS></RESULT>" if status == 200 else b""
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/rndopen/openApi"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+
+class QuotaTable:
+    # api_quota 테이블 대신 (API_NAME, CALL_DATE) -> CALL_COUNT
+    def __init__(self):
+        self.counts = {}
+        self.calls = []
+
+    def add(self, api_name: str, call_date, count: int = 1) -> int:
+        self.calls.append(count)
+        key = (api_name, call_date)
+        self.counts[key] = self.counts.get(key, 0) + count
+        return self.counts[key]
+
+    def today(self) -> int:
+        return self.counts.get((ntis_client.QUOTA_API_NAME, date.today()), 0)
+
+
+@pytest.fixture
+def quota_table(monkeypatch):
+    table = QuotaTable()
+    monkeypatch.setattr(ntis_client, "add_api_call_count", table.add)
+    return table
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+    monkeypatch.setattr(ntis_client.time, "sleep", delays.append)
+    return delays
+
+
+@pytest.fixture
+def server(monkeypatch, quota_table):
+    stand_in = StandInServer()
+    stand_in.thread.start()
+    monkeypatch.setattr(ntis_client, "NTIS_API_URL", stand_in.url)
+    monkeypatch.setattr(ntis_client, "NTIS_API_KEY", "test-key")
+    monkeypatch.setattr(ntis_client, "REPLAY", False)
+    monkeypatch.setattr(ntis_client, "ARCHIVE_DIR", "")
+    monkeypatch.setattr(ntis_client, "_session", None)
+    monkeypatch.setattr(ntis_client, "_rate_limiter", ntis_client.RateLimiter(0))
+    monkeypatch.setattr(ntis_client, "_quota", ntis_client.DailyQuota(0))
+    monkeypatch.setattr(ntis_client, "insert_error_log", lambda *args: None)
+    yield stand_in
+    stand_in.httpd.shutdown()
+    stand_in.httpd.server_close()
+
+
+def test_ntis_get_waits_retry_after_on_429(server, sleeps):
+    server.failures = [(429, {"Retry-After": "3"})]
+
+    response = ntis_client.ntis_get("public_project", {"query": "1234567890"}, "NTIS_ASSIGN")
+
+    assert response.status_code == 200
+    assert len(server.requests) == 2
+    assert sleeps == [3.0]
+    path, params = server.requests[1]
+    assert path.endswith("/public_project")
+    assert params == {"apprvKey": "test-key", "query": "1234567890"}
+
+
+def test_ntis_get_backs_off_without_retry_after(server, sleeps):
+    server.failures = [(503, {}), (503, {})]
+
+    ntis_client.ntis_get("public_project", {}, "NTIS_ASSIGN")
+
+    assert len(server.requests) == 3
+    base = ntis_client.NTIS_BASE_DELAY
+    assert base <= sleeps[0] < base + 1
+    assert base * 2 <= sleeps[1] < base * 2 + 1
+
+
+def test_ntis_get_raises_on_other_status(server, sleeps):
+    server.failures = [(404, {})]
+
+    with pytest.raises(requests.HTTPError):
+        ntis_client.ntis_get("public_project", {}, "NTIS_ASSIGN")
+
+    assert len(server.requests) == 1
+    assert sleeps == []
+
+
+def test_ntis_get_gives_up_after_max_retries(server, sleeps):
+    server.failures = [(429, {"Retry-After": "0"})] * ntis_client.NTIS_MAX_RETRIES
+
+    with pytest.raises(Exception, match="모든 재시도 실패"):
+        ntis_client.ntis_get("public_project", {}, "NTIS_ASSIGN")
+
+    assert len(server.requests) == ntis_client.NTIS_MAX_RETRIES
+
+
+def test_quota_exhaustion_stops_requests(server, quota_table, monkeypatch):
+    monkeypatch.setattr(ntis_client, "_quota", ntis_client.DailyQuota(5, block=2))
+
+    for _ in range(5):
+        ntis_client.ntis_get("public_project", {}, "NTIS_ASSIGN")
+    with pytest.raises(ntis_client.NtisQuotaError):
+        ntis_client.ntis_get("public_project", {}, "NTIS_ASSIGN")
+
+    assert len(server.requests) == 5
+    # limit을 넘게 예약한 만큼은 되돌림
+    assert quota_table.today() == 5
+
+
+def test_quota_counts_retries(server, quota_table, sleeps, monkeypatch):
+    monkeypatch.setattr(ntis_client, "_quota", ntis_client.DailyQuota(2, block=1))
+    server.failures = [(429, {"Retry-After": "0"}), (429, {"Retry-After": "0"})]
+
+    # 재시도도 호출 수에 포함
+    with pytest.raises(ntis_client.NtisQuotaError):
+        ntis_client.ntis_get("public_project", {}, "NTIS_ASSIGN")
+
+    assert len(server.requests) == 2
+
+
+def test_quota_shared_with_other_processes(quota_table):
+    quota = ntis_client.DailyQuota(10, block=4)
+    # 다른 프로세스가 이미 8건 사용
+    quota_table.add(ntis_client.QUOTA_API_NAME, date.today(), 8)
+
+    quota.acquire()
+    quota.acquire()
+    with pytest.raises(ntis_client.NtisQuotaError):
+        quota.acquire()
+
+    assert quota_table.today() == 10
+
+
+def test_quota_reserves_blocks_and_releases_unused(quota_table):
+    quota = ntis_client.DailyQuota(100, block=4)
+
+    for _ in range(10):
+        quota.acquire()
+
+    # 10번 호출에 mysql 왕복 3번
+    assert quota_table.calls == [4, 4, 4]
+    assert quota_table.today() == 12
+
+    quota.release()
+    assert quota_table.today() == 10
+    quota.release()
+    assert quota_table.today() == 10
+
+
+def test_quota_uses_local_count_without_mysql(monkeypatch):
+    monkeypatch.setattr(ntis_client, "add_api_call_count", lambda *args: None)
+    quota = ntis_client.DailyQuota(3, block=2)
+
+    for _ in range(3):
+        quota.acquire()
+    with pytest.raises(ntis_client.NtisQuotaError):
+        quota.acquire()
+
+
+def test_run_companies_stops_after_quota_error(server, monkeypatch):
+    monkeypatch.setattr(ntis_client, "NTIS_WORKERS", 1)
+    monkeypatch.setattr(ntis_client, "_quota", ntis_client.DailyQuota(3, block=2))
+    processed = []
+
+    def process(company):
+        ntis_client.ntis_get("public_project", {"query": company}, "NTIS_ASSIGN")
+        processed.append(company)
+
+    with pytest.raises(ntis_client.NtisQuotaError):
+        ntis_client.run_companies(process, [str(i) for i in range(10)], "NTIS 과제")
+
+    assert processed == ["0", "1", "2"]
+    assert len(server.requests) == 3
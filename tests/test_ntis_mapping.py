@@ -0,0 +1,136 @@
+import xml.etree.ElementTree as ET
+import xmltodict
+from collector.ntis_assign import NTIS_ASSIGN_MAPPING
+from collector.ntis_org_paper import NTIS_ORG_INFO_MAPPING
+
+"""
+ntis_mapping.FieldMapping 테스트
+같은 XML 레코드를 ElementTree 요소(iterparse HIT)와 xmltodict dict로 각각 변환해서
+두 경로의 적재 레코드가 같은지, 변환(year, date, parse_date, split)과 속성/조건 경로를 확인한다.
+"""
+
+HIT_XML = """
+<HIT>
+  <ProjectNumber>1711000001</ProjectNumber>
+  <ProjectTitle>
+    <Korean>차세대 무선 자원 관리 기술 개발</Korean>
+    <English>Next generation radio resource management</English>
+  </ProjectTitle>
+  <Manager><Name>홍길동</Name></Manager>
+  <Researchers>
+    <Name>홍길동;김영희;이철수</Name>
+    <ManCount>2</ManCount>
+    <WomanCount>1</WomanCount>
+  </Researchers>
+  <Goal><Full>  무선 자원 할당 최적화  </Full><Teaser/></Goal>
+  <Keyword><Korean>무선;자원</Korean></Keyword>
+  <ProjectYear>2023</ProjectYear>
+  <ProjectPeriod>
+    <Start>20230101</Start>
+    <End>20231231</End>
+    <TotalStart>2021-03-01</TotalStart>
+    <TotalEnd>2024.12.31</TotalEnd>
+  </ProjectPeriod>
+  <ScienceClass sequence="2">
+    <Large code="LB">생명과학</Large>
+  </ScienceClass>
+  <ScienceClass sequence="1">
+    <Large code="EE">정보/통신</Large>
+    <Medium code="EE01">이동통신</Medium>
+    <Small code="EE0101">무선자원관리</Small>
+  </ScienceClass>
+  <PerformAgent code="03">중소기업</PerformAgent>
+  <DevelopmentPhase code="2">응용연구</DevelopmentPhase>
+  <Region code="11">서울</Region>
+  <ApplyArea><First code="A01">정보통신</First></ApplyArea>
+  <GovernmentFunds>120000000</GovernmentFunds>
+  <TotalFunds>150000000</TotalFunds>
+  <CorporateRegistrationNumber>1101110000001</CorporateRegistrationNumber>
+</HIT>
+"""
+
+ORG_XML = """
+<body>
+  <orgName>주식회사 예시전자</orgName>
+  <rndKorKeword>무선;통신</rndKorKeword>
+  <rndStatusList><year>2022</year><pjtCnt>3</pjtCnt><rndBudget>500</rndBudget></rndStatusList>
+  <rndStatusList><year>2023</year><pjtCnt>5</pjtCnt><paperCnt>1</paperCnt></rndStatusList>
+</body>
+"""
+
+
+def extract_both(mapping, xml: str) -> tuple:
+    elem = ET.fromstring(xml)
+    data = xmltodict.parse(xml)[elem.tag]
+    return mapping.extract(elem), mapping.extract(data)
+
+
+def test_assign_element_and_dict_records_match():
+    from_element, from_dict = extract_both(NTIS_ASSIGN_MAPPING, HIT_XML)
+
+    assert from_element == from_dict
+    assert list(from_element) == [target for target, _, _ in NTIS_ASSIGN_MAPPING.fields]
+
+
+def test_assign_converters_and_paths():
+    record, _ = extract_both(NTIS_ASSIGN_MAPPING, HIT_XML)
+
+    assert record["ProjectNo"] == "1711000001"
+    assert record["ProjectNameEN"] == "Next generation radio resource management"
+    # split
+    assert record["MangerName"] == ["홍길동"]
+    assert record["ResearcherName"] == ["홍길동", "김영희", "이철수"]
+    # year / date / parse_date
+    assert record["ProjectYear"] == "2023"
+    assert record["ProjectStart"] == "2023-01-01"
+    assert record["ProjectEnd"] == "2023-12-31"
+    assert record["ProjectToStart"] == "2021-03-01"
+    assert record["ProjectToEnd"] == "2024-12-31"
+    # 조건 경로는 sequence='1' 항목만 (문서 순서와 상관없이)
+    assert record["Scienceclass_New_1_Large_code"] == "EE"
+    assert record["Scienceclass_New_1_Large"] == "정보/통신"
+    assert record["Scienceclass_Small_1_Large_code"] == "EE0101"
+    # 속성과 텍스트를 함께 가진 태그
+    assert record["PerformagentCode"] == "03"
+    assert record["Performagent"] == "중소기업"
+    assert record["ApplyareaFirstCode"] == "A01"
+    # 앞뒤 공백, 빈 태그, 없는 태그
+    assert record["GoalFull"] == "무선 자원 할당 최적화"
+    assert record["GaolTeaser"] is None
+    assert record["MinistryName"] is None
+    assert record["ApplyareaSecondCode"] is None
+
+
+def test_org_info_sub_list_matches():
+    from_element, from_dict = extract_both(NTIS_ORG_INFO_MAPPING, ORG_XML)
+
+    assert from_element == from_dict
+    assert from_element["orgName"] == "주식회사 예시전자"
+    assert [status["year"] for status in from_element["rndStatusList"]] == ["2022", "2023"]
+    assert from_element["rndStatusList"][1]["paperCnt"] == "1"
+    assert from_element["rndStatusList"][0]["paperCnt"] is None
+
+
+def test_single_sub_item_is_a_list():
+    xml = "<body><orgName>예시</orgName><rndStatusList><year>2023</year></rndStatusList></body>"
+    from_element, from_dict = extract_both(NTIS_ORG_INFO_MAPPING, xml)
+
+    assert from_element == from_dict
+    assert len(from_element["rndStatusList"]) == 1
+
+
+def test_extract_all_converts_dates_per_list():
+    elem = ET.fromstring(HIT_XML)
+    data = xmltodict.parse(HIT_XML)["HIT"]
+
+    raw = NTIS_ASSIGN_MAPPING.extract(elem, dates=False)
+    assert raw["ProjectStart"] == "20230101"
+    assert raw["ProjectToEnd"] == "2024.12.31"
+    assert raw["ResearcherName"] == ["홍길동", "김영희", "이철수"]
+    assert set(NTIS_ASSIGN_MAPPING.date_fields) == {
+        "ProjectYear", "ProjectStart", "ProjectEnd", "ProjectToStart", "ProjectToEnd",
+    }
+
+    expected = NTIS_ASSIGN_MAPPING.extract(elem)
+    assert NTIS_ASSIGN_MAPPING.extract_all([elem, data]) == [expected, expected]
+    assert NTIS_ASSIGN_MAPPING.convert_records([raw]) == [expected]